@@ -99,6 +99,9 @@ class ConfigManager:
                 'max_scale_factor': 1.2,
                 'min_scale_factor': 0.8
             },
+            'pixel_detector': {
+                'tolerance': 10
+            },
             'web': {
                 'host': '127.0.0.1',
                 'port': 5000,
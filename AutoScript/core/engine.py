@@ -15,6 +15,8 @@ from core.config_manager import ConfigManager
 from core.template_matcher import TemplateMatcher
 from core.ocr_engine import OCREngine
 from core.script_queue import ScriptQueueManager
+from core.script_executor import ScriptExecutor
+from core.pixel_detector import PixelDetector
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +29,8 @@ class AutoScriptEngine:
         self.game_manager = None
         self.template_matcher = None
         self.ocr_engine = None
+        self.pixel_detector = None
+        self.script_executor = None
         self.queue_manager = None
         self.initialized = False
         
@@ -71,8 +75,17 @@ class AutoScriptEngine:
             templates_dir = self.config_manager.get('games.templates_dir', 'AutoScript/templates')
             self.game_manager = GameManager(games_dir, templates_dir)
             
+            # 初始化像素特征检测器
+            self.pixel_detector = PixelDetector(self.config_manager.get('pixel_detector.tolerance', 10))
+            
+            # 初始化脚本执行器
+            self.script_executor = ScriptExecutor(
+                self.plugin_manager, self.template_matcher, self.ocr_engine,
+                pixel_detector=self.pixel_detector, game_manager=self.game_manager
+            )
+            
             # 初始化队列管理器
-            self.queue_manager = ScriptQueueManager(None)  # 稍后设置script_executor
+            self.queue_manager = ScriptQueueManager(self.script_executor)
             
             # 为所有现有游戏创建队列
             for game_id, game in self.game_manager.games.items():
@@ -141,6 +154,9 @@ class AutoScriptEngine:
         if self.queue_manager:
             self.queue_manager.cleanup()
         
+        if self.script_executor:
+            self.script_executor.stop_all_scripts()
+        
         if self.plugin_manager:
             self.plugin_manager.cleanup_all()
         
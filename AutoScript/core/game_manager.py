@@ -11,6 +11,8 @@ from dataclasses import dataclass, asdict, field
 from datetime import datetime
 import logging
 
+from core.scene_index import SceneIndex, SceneMatch
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -37,6 +39,7 @@ class GameInfo:
     icon_path: str = ""
     scripts: Dict[str, ScriptInfo] = field(default_factory=dict)
     templates_dir: str = ""
+    scenes: List[str] = field(default_factory=list)  # 场景索引中的场景名称，指纹保存在游戏目录的 scenes.json
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
     updated_at: str = field(default_factory=lambda: datetime.now().isoformat())
     enabled: bool = True
@@ -48,6 +51,7 @@ class GameManager:
         self.games_dir = games_dir
         self.templates_dir = templates_dir
         self.games: Dict[str, GameInfo] = {}
+        self.scene_indexes: Dict[str, SceneIndex] = {}
         self._ensure_directories()
         self.load_games()
     
@@ -297,6 +301,62 @@ class GameManager:
         
         return sorted(scripts, key=lambda x: x.created_at)
     
+    def get_scene_index(self, game_id: str) -> Optional[SceneIndex]:
+        """获取游戏的场景索引（首次使用时从 scenes.json 加载）"""
+        if game_id not in self.games:
+            return None
+        
+        if game_id not in self.scene_indexes:
+            index_file = os.path.join(self.games_dir, game_id, "scenes.json")
+            try:
+                self.scene_indexes[game_id] = SceneIndex.load(index_file) if os.path.exists(index_file) else SceneIndex()
+            except Exception as e:
+                logger.error(f"加载场景索引失败 {index_file}: {str(e)}")
+                self.scene_indexes[game_id] = SceneIndex()
+        return self.scene_indexes[game_id]
+    
+    def rebuild_scene_index(self, game_id: str, samples_dir: str = None) -> int:
+        """从样本截图重建场景索引（默认样本目录为游戏目录下的 scene_samples/<场景名称>/）"""
+        index = self.get_scene_index(game_id)
+        if index is None:
+            return 0
+        
+        samples_dir = samples_dir or os.path.join(self.games_dir, game_id, "scene_samples")
+        count = index.build_from_samples(samples_dir)
+        self.save_scene_index(game_id)
+        return count
+    
+    def add_scene(self, game_id: str, name: str, images: List[Any], rois: List[Any] = None) -> bool:
+        """注册场景（样本为截图路径或图像）"""
+        index = self.get_scene_index(game_id)
+        if index is None:
+            return False
+        
+        index.add_scene(name, images, rois)
+        self.save_scene_index(game_id)
+        return name in index.scenes
+    
+    def classify_scene(self, game_id: str, image: Any) -> Optional[SceneMatch]:
+        """识别截图所处的场景，未知场景返回 None"""
+        index = self.get_scene_index(game_id)
+        if index is None:
+            return None
+        return index.classify(image)
+    
+    def save_scene_index(self, game_id: str):
+        """保存场景索引，并同步游戏信息中的场景列表"""
+        index = self.scene_indexes.get(game_id)
+        if index is None or game_id not in self.games:
+            return
+        
+        game_dir = os.path.join(self.games_dir, game_id)
+        os.makedirs(game_dir, exist_ok=True)
+        index.save(os.path.join(game_dir, "scenes.json"))
+        
+        self.games[game_id].scenes = list(index.scenes)
+        self.games[game_id].updated_at = datetime.now().isoformat()
+        self.save_game(game_id)
+    
     def save_game(self, game_id: str):
         """保存游戏信息到文件"""
         if game_id not in self.games:
@@ -357,14 +417,20 @@ class GameManager:
                 if os.path.exists(game_file):
                     zipf.write(game_file, "game.json")
                 
-                # 添加模板文件
-                templates_dir = os.path.join(game_dir, "templates")
-                if os.path.exists(templates_dir):
-                    for root, dirs, files in os.walk(templates_dir):
-                        for file in files:
-                            file_path = os.path.join(root, file)
-                            arc_path = os.path.relpath(file_path, game_dir)
-                            zipf.write(file_path, arc_path)
+                # 添加场景索引
+                scenes_file = os.path.join(game_dir, "scenes.json")
+                if os.path.exists(scenes_file):
+                    zipf.write(scenes_file, "scenes.json")
+                
+                # 添加模板文件和场景样本
+                for sub_dir in ("templates", "scene_samples"):
+                    source_dir = os.path.join(game_dir, sub_dir)
+                    if os.path.exists(source_dir):
+                        for root, dirs, files in os.walk(source_dir):
+                            for file in files:
+                                file_path = os.path.join(root, file)
+                                arc_path = os.path.relpath(file_path, game_dir)
+                                zipf.write(file_path, arc_path)
             
             logger.info(f"导出游戏: {game.name} 到 {export_path}")
             return True
@@ -395,8 +461,8 @@ class GameManager:
             with open(game_file, 'r', encoding='utf-8') as f:
                 game_data = json.load(f)
             
-                         # 生成新的游戏ID
-             new_id = str(uuid.uuid4())
+            # 生成新的游戏ID
+            new_id = str(uuid.uuid4())
             game_data['id'] = new_id
             game_data['updated_at'] = datetime.now().isoformat()
             
@@ -452,6 +518,7 @@ class GameManager:
             
             # 从内存中删除
             del self.games[game_id]
+            self.scene_indexes.pop(game_id, None)
             
             logger.info(f"删除游戏: {game_name}")
             return True
@@ -0,0 +1,182 @@
+"""
+像素颜色特征检测 - 用少量 (x, y, 颜色, 容差) 检查点判断界面状态
+"""
+import threading
+import logging
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Sequence, Tuple, Union
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def parse_color(color: Union[str, Sequence[int], int]) -> Tuple[int, int, int]:
+    """
+    解析颜色
+    
+    Args:
+        color: '#RRGGBB' 十六进制字符串（RGB顺序）、[b, g, r] 列表（与截图相同的BGR顺序）或灰度值
+    
+    Returns:
+        (b, g, r)
+    """
+    if isinstance(color, str):
+        value = color.lstrip('#')
+        r, g, b = int(value[0:2], 16), int(value[2:4], 16), int(value[4:6], 16)
+        return b, g, r
+    if isinstance(color, (int, np.integer)):
+        return int(color), int(color), int(color)
+    b, g, r = color
+    return int(b), int(g), int(r)
+
+@dataclass
+class PixelSignature:
+    """像素颜色特征（一组检查点）"""
+    xs: np.ndarray
+    ys: np.ndarray
+    colors: np.ndarray       # (N, 3) BGR
+    tolerances: np.ndarray   # (N,) 每通道允许的最大误差
+    min_matches: Optional[int] = None  # 至少多少个点符合才算命中，None 表示全部
+    
+    @classmethod
+    def from_points(cls, points: Sequence[Any], tolerance: int = 10,
+                    min_matches: Optional[int] = None) -> 'PixelSignature':
+        """
+        由检查点列表创建特征
+        
+        Args:
+            points: 检查点列表，元素为 (x, y, color) / (x, y, color, tolerance)
+                    或 {'x': x, 'y': y, 'color': color, 'tolerance': tolerance}
+            tolerance: 未单独指定时的容差
+            min_matches: 至少多少个点符合才算命中，None 表示全部
+        """
+        xs, ys, colors, tolerances = [], [], [], []
+        for point in points:
+            if isinstance(point, dict):
+                x, y, color = point['x'], point['y'], point['color']
+                point_tolerance = point.get('tolerance', tolerance)
+            else:
+                x, y, color = point[:3]
+                point_tolerance = point[3] if len(point) > 3 else tolerance
+            xs.append(int(x))
+            ys.append(int(y))
+            colors.append(parse_color(color))
+            tolerances.append(int(point_tolerance))
+        
+        return cls(xs=np.array(xs, dtype=np.intp), ys=np.array(ys, dtype=np.intp),
+                   colors=np.array(colors, dtype=np.int16).reshape(-1, 3),
+                   tolerances=np.array(tolerances, dtype=np.int16), min_matches=min_matches)
+    
+    def evaluate(self, frame: np.ndarray, origin: Tuple[int, int] = (0, 0)) -> Dict[str, Any]:
+        """
+        在一帧上检查所有点
+        
+        Args:
+            frame: BGR 或灰度图像
+            origin: 检查点坐标的原点在图像中的位置
+        
+        Returns:
+            {'matched': 是否命中, 'matches': 符合的点数, 'total': 总点数, 'errors': 每个点的最大通道误差}
+            （超出图像范围的点误差为 -1，视为不符合）
+        """
+        xs = self.xs + origin[0]
+        ys = self.ys + origin[1]
+        height, width = frame.shape[:2]
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        
+        errors = np.full(len(xs), -1, dtype=np.int16)
+        if inside.any():
+            pixels = frame[ys[inside], xs[inside]].astype(np.int16)
+            if pixels.ndim == 1:
+                # 灰度图与颜色的亮度比较（与 cv2.COLOR_BGR2GRAY 相同的权重）
+                pixels = pixels[:, None]
+                colors = np.rint(self.colors[inside] @ np.array([0.114, 0.587, 0.299]))[:, None]
+            else:
+                colors = self.colors[inside]
+            errors[inside] = np.abs(pixels - colors).max(axis=1)
+        
+        ok = inside & (errors <= self.tolerances)
+        matches = int(np.count_nonzero(ok))
+        required = len(xs) if self.min_matches is None else self.min_matches
+        return {
+            'matched': matches >= required,
+            'matches': matches,
+            'total': len(xs),
+            'errors': errors.tolist()
+        }
+
+class PixelDetector:
+    """像素颜色特征检测器"""
+    
+    def __init__(self, tolerance: int = 10):
+        """
+        Args:
+            tolerance: 检查点未指定容差时使用的默认容差
+        """
+        self.tolerance = tolerance
+        self.signatures: Dict[str, PixelSignature] = {}
+        self._lock = threading.Lock()
+    
+    def register_signature(self, name: str, points: Sequence[Any], tolerance: Optional[int] = None,
+                           min_matches: Optional[int] = None) -> PixelSignature:
+        """注册命名特征"""
+        signature = self._build(points, tolerance, min_matches)
+        with self._lock:
+            self.signatures[name] = signature
+        return signature
+    
+    def unregister_signature(self, name: str):
+        """注销命名特征"""
+        with self._lock:
+            self.signatures.pop(name, None)
+    
+    def get_signature(self, signature: Union[str, PixelSignature, Sequence[Any], Dict[str, Any]]) -> PixelSignature:
+        """
+        解析特征
+        
+        Args:
+            signature: 特征名称、PixelSignature、检查点列表，
+                       或 {'points': [...], 'tolerance': t, 'min_matches': n}
+        """
+        if isinstance(signature, PixelSignature):
+            return signature
+        if isinstance(signature, str):
+            with self._lock:
+                found = self.signatures.get(signature)
+            if found is None:
+                raise ValueError(f"未注册的像素特征: {signature}")
+            return found
+        if isinstance(signature, dict):
+            return self._build(signature['points'], signature.get('tolerance'), signature.get('min_matches'))
+        return self._build(signature, None, None)
+    
+    def evaluate(self, signature: Union[str, PixelSignature, Sequence[Any], Dict[str, Any]],
+                 image: Union[str, np.ndarray, None] = None, origin: Tuple[int, int] = (0, 0)) -> Dict[str, Any]:
+        """
+        检查像素特征并返回详细结果
+        
+        Args:
+            signature: 特征，见 get_signature
+            image: 截图路径或图像数组
+            origin: 检查点坐标的原点
+        
+        Returns:
+            检查结果，见 PixelSignature.evaluate；读取图像失败时 matched 为 False
+        """
+        signature = self.get_signature(signature)
+        frame = cv2.imread(image) if isinstance(image, str) else image
+        if frame is None:
+            logger.error(f"无法加载图像: {image}")
+            return {'matched': False, 'matches': 0, 'total': len(signature.xs), 'errors': []}
+        return signature.evaluate(frame, origin)
+    
+    def check(self, signature: Union[str, PixelSignature, Sequence[Any], Dict[str, Any]], **kwargs) -> bool:
+        """检查像素特征是否命中"""
+        try:
+            return self.evaluate(signature, **kwargs)['matched']
+        except Exception as e:
+            logger.error(f"像素特征检查失败: {str(e)}")
+            return False
+    
+    def _build(self, points: Sequence[Any], tolerance: Optional[int], min_matches: Optional[int]) -> PixelSignature:
+        return PixelSignature.from_points(points, self.tolerance if tolerance is None else tolerance, min_matches)
@@ -0,0 +1,271 @@
+"""
+场景指纹索引 - 用感知哈希一次判断当前处于哪个游戏界面
+"""
+import os
+import json
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple, Union
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+ROIS_FILENAME = 'rois.json'
+
+# 0-255 每个字节中 1 的个数，用于计算汉明距离
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint16)
+
+@dataclass
+class SceneMatch:
+    """场景识别结果"""
+    name: str
+    distance: float  # 0 为完全相同，1 为完全不同
+    roi_distance: Optional[float] = None
+
+def compute_hash(image: np.ndarray, hash_size: int = 16,
+                 region: Optional[Tuple[float, float, float, float]] = None) -> np.ndarray:
+    """
+    计算差值哈希（dHash）
+    
+    Args:
+        image: BGR 或灰度图像
+        hash_size: 哈希边长，指纹为 hash_size * hash_size 位
+        region: 归一化区域 (x, y, w, h)，取值 0-1，与分辨率无关
+    
+    Returns:
+        打包后的指纹（uint8 数组）
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    if region:
+        height, width = image.shape[:2]
+        x, y, w, h = region
+        x0, y0 = int(x * width), int(y * height)
+        image = image[y0:max(int((y + h) * height), y0 + 1), x0:max(int((x + w) * width), x0 + 1)]
+    
+    small = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    return np.packbits(small[:, 1:] > small[:, :-1])
+
+class SceneIndex:
+    """场景指纹索引"""
+    
+    def __init__(self, hash_size: int = 16, roi_hash_size: int = 8, max_distance: float = 0.2):
+        """
+        Args:
+            hash_size: 整帧指纹边长
+            roi_hash_size: 局部区域指纹边长
+            max_distance: 最近场景的距离超过该值时视为未知场景
+        """
+        self.hash_size = hash_size
+        self.roi_hash_size = roi_hash_size
+        self.max_distance = max_distance
+        self.clear()
+    
+    def clear(self):
+        """清空所有场景"""
+        self.scenes: List[str] = []
+        self.hashes = np.zeros((0, self.hash_size * self.hash_size // 8), dtype=np.uint8)
+        self.labels = np.zeros(0, dtype=np.intp)  # 每个样本所属场景在 scenes 中的下标
+        # 场景 -> [{'region': 归一化区域, 'hashes': 各样本在该区域的指纹}]
+        self.rois: Dict[str, List[Dict[str, Any]]] = {}
+    
+    def __len__(self) -> int:
+        return len(self.scenes)
+    
+    def add_scene(self, name: str, images: List[Union[str, np.ndarray]],
+                  rois: Optional[List[Tuple[int, int, int, int]]] = None):
+        """
+        注册场景
+        
+        Args:
+            name: 场景名称
+            images: 样本截图（路径或图像）
+            rois: 区分相似场景的局部区域 (x, y, w, h)，坐标为样本截图的像素坐标
+        """
+        self.remove_scene(name)
+        images = [image for image in (self._load(image) for image in images) if image is not None]
+        if not images:
+            logger.warning(f"场景 {name} 没有可用的样本")
+            return
+        
+        if rois:
+            height, width = images[0].shape[:2]
+            self.rois[name] = [{'region': (x / width, y / height, w / width, h / height), 'hashes': []}
+                               for x, y, w, h in rois]
+        
+        self.scenes.append(name)
+        for image in images:
+            self.add_sample(name, image)
+    
+    def add_sample(self, name: str, image: Union[str, np.ndarray]):
+        """为已注册的场景追加样本截图"""
+        image = self._load(image)
+        if image is None:
+            return
+        if name not in self.scenes:
+            self.scenes.append(name)
+        
+        self.hashes = np.vstack([self.hashes, compute_hash(image, self.hash_size)])
+        self.labels = np.append(self.labels, self.scenes.index(name))
+        for roi in self.rois.get(name, []):
+            roi['hashes'].append(compute_hash(image, self.roi_hash_size, roi['region']))
+    
+    def remove_scene(self, name: str):
+        """删除场景及其样本"""
+        if name not in self.scenes:
+            return
+        
+        index = self.scenes.index(name)
+        keep = self.labels != index
+        self.hashes = self.hashes[keep]
+        self.labels = self.labels[keep]
+        self.labels[self.labels > index] -= 1
+        self.scenes.pop(index)
+        self.rois.pop(name, None)
+    
+    def classify(self, image: Union[str, np.ndarray]) -> Optional[SceneMatch]:
+        """
+        识别截图所处的场景
+        
+        整帧指纹与所有样本一次性比较汉明距离；候选场景注册了局部区域时，
+        再比较这些区域的指纹，用于区分只有局部差异的界面。
+        
+        Args:
+            image: 截图（路径或图像）
+        
+        Returns:
+            最近的场景，未知场景返回 None
+        """
+        image = self._load(image)
+        if image is None or not self.scenes:
+            return None
+        
+        bits = self.hashes.shape[1] * 8
+        distances = _POPCOUNT[np.bitwise_xor(self.hashes, compute_hash(image, self.hash_size))].sum(axis=1) / bits
+        
+        # 每个场景取最近样本的距离
+        scene_distances = np.full(len(self.scenes), np.inf)
+        np.minimum.at(scene_distances, self.labels, distances)
+        
+        best: Optional[SceneMatch] = None
+        best_score = np.inf
+        for index in np.argsort(scene_distances):
+            distance = float(scene_distances[index])
+            if distance > self.max_distance:
+                break
+            
+            name = self.scenes[index]
+            roi_distance = self._roi_distance(image, self.rois.get(name))
+            score = distance if roi_distance is None else (distance + roi_distance) / 2
+            if score < best_score:
+                best, best_score = SceneMatch(name, distance, roi_distance), score
+        
+        if best is None or best_score > self.max_distance:
+            return None
+        return best
+    
+    def build_from_samples(self, samples_dir: str) -> int:
+        """
+        从样本目录重建索引
+        
+        目录结构为 <samples_dir>/<场景名称>/*.png，可选的 rois.json 为 {场景名称: [[x, y, w, h], ...]}
+        
+        Args:
+            samples_dir: 样本目录
+        
+        Returns:
+            场景数量
+        """
+        self.clear()
+        if not os.path.isdir(samples_dir):
+            logger.warning(f"场景样本目录不存在: {samples_dir}")
+            return 0
+        
+        rois = {}
+        rois_file = os.path.join(samples_dir, ROIS_FILENAME)
+        if os.path.exists(rois_file):
+            with open(rois_file, 'r', encoding='utf-8') as f:
+                rois = json.load(f)
+        
+        for name in sorted(os.listdir(samples_dir)):
+            scene_dir = os.path.join(samples_dir, name)
+            if not os.path.isdir(scene_dir):
+                continue
+            images = [os.path.join(scene_dir, file) for file in sorted(os.listdir(scene_dir))
+                      if os.path.splitext(file)[1].lower() in IMAGE_EXTENSIONS]
+            self.add_scene(name, images, rois.get(name))
+        
+        logger.info(f"场景索引重建完成: {len(self.scenes)} 个场景, {len(self.labels)} 个样本")
+        return len(self.scenes)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可保存的字典"""
+        return {
+            'hash_size': self.hash_size,
+            'roi_hash_size': self.roi_hash_size,
+            'max_distance': self.max_distance,
+            'scenes': {
+                name: {
+                    'hashes': [row.tobytes().hex() for row in self.hashes[self.labels == index]],
+                    'rois': [{'region': list(roi['region']), 'hashes': [h.tobytes().hex() for h in roi['hashes']]}
+                             for roi in self.rois.get(name, [])]
+                }
+                for index, name in enumerate(self.scenes)
+            }
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SceneIndex':
+        """从字典创建索引"""
+        index = cls(data.get('hash_size', 16), data.get('roi_hash_size', 8), data.get('max_distance', 0.2))
+        hashes, labels = [], []
+        for name, scene in data.get('scenes', {}).items():
+            index.scenes.append(name)
+            for value in scene.get('hashes', []):
+                hashes.append(np.frombuffer(bytes.fromhex(value), dtype=np.uint8))
+                labels.append(len(index.scenes) - 1)
+            if scene.get('rois'):
+                index.rois[name] = [{'region': tuple(roi['region']),
+                                     'hashes': [np.frombuffer(bytes.fromhex(h), dtype=np.uint8)
+                                                for h in roi['hashes']]}
+                                    for roi in scene['rois']]
+        
+        if hashes:
+            index.hashes = np.vstack(hashes)
+            index.labels = np.array(labels, dtype=np.intp)
+        return index
+    
+    def save(self, path: str):
+        """保存到 JSON 文件"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+    
+    @classmethod
+    def load(cls, path: str) -> 'SceneIndex':
+        """从 JSON 文件加载"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+    
+    def _roi_distance(self, image: np.ndarray, rois: Optional[List[Dict[str, Any]]]) -> Optional[float]:
+        """局部区域的平均距离（每个区域取最近样本）"""
+        if not rois:
+            return None
+        
+        bits = self.roi_hash_size * self.roi_hash_size
+        distances = []
+        for roi in rois:
+            if not roi['hashes']:
+                continue
+            current = compute_hash(image, self.roi_hash_size, roi['region'])
+            distances.append(min(int(_POPCOUNT[np.bitwise_xor(h, current)].sum()) for h in roi['hashes']) / bits)
+        return sum(distances) / len(distances) if distances else None
+    
+    def _load(self, image: Union[str, np.ndarray]) -> Optional[np.ndarray]:
+        if isinstance(image, str):
+            loaded = cv2.imread(image)
+            if loaded is None:
+                logger.error(f"无法加载图像: {image}")
+            return loaded
+        return image
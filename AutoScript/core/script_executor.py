@@ -26,6 +26,8 @@ class ExecutionContext:
     start_time: datetime
     last_action_time: datetime
     exception_script_id: Optional[str] = None
+    pixel_detector: Any = None
+    scene_index: Any = None
 
 class ActionResult:
     """动作执行结果"""
@@ -38,10 +40,15 @@ class ActionResult:
 class ScriptExecutor:
     """脚本执行器"""
     
-    def __init__(self, plugin_manager, template_matcher, ocr_engine):
+    def __init__(self, plugin_manager, template_matcher, ocr_engine, pixel_detector=None,
+                 game_manager=None, scene_index=None):
         self.plugin_manager = plugin_manager
         self.template_matcher = template_matcher
         self.ocr_engine = ocr_engine
+        self.pixel_detector = pixel_detector
+        # 场景索引：scene_index 为所有脚本共用的索引；未指定时按脚本所属游戏从 game_manager 获取
+        self.game_manager = game_manager
+        self.scene_index = scene_index
         
         self.running_scripts: Dict[str, threading.Thread] = {}
         self.execution_contexts: Dict[str, ExecutionContext] = {}
@@ -84,7 +91,9 @@ class ScriptExecutor:
             execution_id=execution_id,
             start_time=datetime.now(),
             last_action_time=datetime.now(),
-            exception_script_id=exception_script_id
+            exception_script_id=exception_script_id,
+            pixel_detector=self.pixel_detector,
+            scene_index=self.get_scene_index(game_id)
         )
         
         self.execution_contexts[execution_id] = context
@@ -103,6 +112,14 @@ class ScriptExecutor:
         logger.info(f"开始执行脚本: {execution_id}")
         return execution_id
     
+    def get_scene_index(self, game_id: str) -> Any:
+        """获取脚本使用的场景索引"""
+        if self.scene_index is not None:
+            return self.scene_index
+        if self.game_manager is not None:
+            return self.game_manager.get_scene_index(game_id)
+        return None
+    
     def _execute_script_thread(self, execution_id: str, script_content: Dict[str, Any]):
         """在线程中执行脚本"""
         try:
@@ -212,27 +229,74 @@ class ScriptExecutor:
                     context.variables['match_y'] = match_result['y']
                     context.variables['match_confidence'] = match_result['confidence']
         
-                 elif condition_type == 'variable_compare':
-             var_name = action.get('variable')
-             compare_value = action.get('value')
-             operator = action.get('operator', '==')
-             
-             if var_name:
-                 var_value = context.variables.get(var_name)
-                 
-                 if operator == '==':
-                     condition_result = var_value == compare_value
-                 elif operator == '!=':
-                     condition_result = var_value != compare_value
-                 elif operator == '>' and var_value is not None and compare_value is not None:
-                     condition_result = var_value > compare_value
-                 elif operator == '<' and var_value is not None and compare_value is not None:
-                     condition_result = var_value < compare_value
-                 elif operator == '>=' and var_value is not None and compare_value is not None:
-                     condition_result = var_value >= compare_value
-                 elif operator == '<=' and var_value is not None and compare_value is not None:
-                     condition_result = var_value <= compare_value
+        elif condition_type == 'pixel_signature':
+            # 像素颜色特征：signature 为已注册的特征名称或检查点列表 [[x, y, color, tolerance], ...]
+            signature = action.get('signature') or action.get('points')
+            input_image = action.get('input_image')
+            
+            if input_image and input_image.startswith('$'):
+                var_name = input_image[1:]
+                input_image = context.variables.get(var_name)
+            
+            if context.pixel_detector is None:
+                return ActionResult(False, error="像素特征检测器不可用")
+            
+            if signature:
+                if not isinstance(signature, str) and (action.get('tolerance') is not None or
+                                                       action.get('min_matches') is not None):
+                    signature = {'points': signature, 'tolerance': action.get('tolerance'),
+                                 'min_matches': action.get('min_matches')}
+                pixel_result = context.pixel_detector.evaluate(
+                    signature, image=input_image, origin=tuple(action.get('origin', (0, 0)))
+                )
+                condition_result = pixel_result['matched']
+                context.variables['pixel_matches'] = pixel_result['matches']
         
+        elif condition_type == 'scene':
+            # 场景判断：用游戏的场景索引识别截图，scene 为期望的场景名称或名称列表（为空时只要求是已知场景）
+            expected = action.get('scene')
+            input_image = action.get('input_image')
+            
+            if input_image and input_image.startswith('$'):
+                var_name = input_image[1:]
+                input_image = context.variables.get(var_name)
+            
+            if context.scene_index is None:
+                return ActionResult(False, error="场景索引不可用，无法识别场景")
+            
+            if input_image:
+                scene_match = context.scene_index.classify(input_image)
+                current_scene = scene_match.name if scene_match else None
+                context.variables['current_scene'] = current_scene
+                
+                if isinstance(expected, (list, tuple)):
+                    condition_result = current_scene in expected
+                elif expected:
+                    condition_result = current_scene == expected
+                else:
+                    condition_result = current_scene is not None
+        
+        elif condition_type == 'variable_compare':
+            var_name = action.get('variable')
+            compare_value = action.get('value')
+            operator = action.get('operator', '==')
+            
+            if var_name:
+                var_value = context.variables.get(var_name)
+                
+                if operator == '==':
+                    condition_result = var_value == compare_value
+                elif operator == '!=':
+                    condition_result = var_value != compare_value
+                elif operator == '>' and var_value is not None and compare_value is not None:
+                    condition_result = var_value > compare_value
+                elif operator == '<' and var_value is not None and compare_value is not None:
+                    condition_result = var_value < compare_value
+                elif operator == '>=' and var_value is not None and compare_value is not None:
+                    condition_result = var_value >= compare_value
+                elif operator == '<=' and var_value is not None and compare_value is not None:
+                    condition_result = var_value <= compare_value
+       
         # 执行对应的动作序列
         actions_to_execute = on_true if condition_result else on_false
         
@@ -323,17 +387,17 @@ class ScriptExecutor:
         if not input_image:
             return ActionResult(False, error="缺少输入图像")
         
-                 try:
-             # 执行OCR（这里需要根据实际的OCR引擎实现）
-             text = context.ocr_engine.extract_text(input_image, region)
-             
-             if store_result:
-                 context.variables[store_result] = text
-             
-             return ActionResult(True, {'text': text})
-             
-         except Exception as e:
-             return ActionResult(False, error=str(e))
+        try:
+            # 执行OCR（这里需要根据实际的OCR引擎实现）
+            text = context.ocr_engine.extract_text(input_image, region)
+            
+            if store_result:
+                context.variables[store_result] = text
+            
+            return ActionResult(True, {'text': text})
+            
+        except Exception as e:
+            return ActionResult(False, error=str(e))
     
     def _execute_wait(self, context: ExecutionContext, action: Dict[str, Any]) -> ActionResult:
         """执行等待"""
@@ -0,0 +1,63 @@
+"""
+匹配缓冲池内存分配基准
+用 tracemalloc 统计 wait_for_template 式轮询中每次匹配分配的内存，
+对比关闭 / 开启 template_matcher.reuse_buffers 的差异
+
+用法:
+    python benchmarks/bench_buffers.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core.template_matcher import TemplateMatcher
+from core.match_buffers import MatchBufferPool
+
+
+def make_matcher(reuse_buffers: bool) -> TemplateMatcher:
+    """只初始化匹配路径用到的属性，不需要引擎和模板目录"""
+    matcher = TemplateMatcher.__new__(TemplateMatcher)
+    matcher.engine = type('Engine', (), {'get_config': staticmethod(lambda key, default=None: default)})()
+    matcher.reuse_buffers = reuse_buffers
+    matcher.match_buffers = MatchBufferPool()
+    return matcher
+
+
+def bench(reuse_buffers: bool, frame: np.ndarray, template: np.ndarray, max_results: int, polls: int = 50):
+    matcher = make_matcher(reuse_buffers)
+    method = cv2.TM_CCOEFF_NORMED
+    
+    # 预热：让缓冲池和 OpenCV 内部状态就绪
+    matcher._match_template(frame, template, method, 0.9, max_results, backend='spatial')
+    
+    tracemalloc.start()
+    allocated = 0
+    start = time.perf_counter()
+    for _ in range(polls):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        matcher._match_template(frame, template, method, 0.9, max_results, backend='spatial')
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - before
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    
+    label = '复用缓冲' if reuse_buffers else '每次分配'
+    print(f"  {label}: 每次匹配峰值分配 {allocated / polls / 1024:10.1f} KB | "
+          f"轮询 {polls} 次共 {allocated / 1024 / 1024:8.1f} MB | 平均 {elapsed / polls * 1000:6.1f} ms")
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    frame = cv2.GaussianBlur(rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8), (5, 5), 0)
+    template = frame[500:548, 900:964].copy()
+    for max_results in (1, 10):
+        print(f"1920x1080 截图, 64x48 模板, max_results={max_results}")
+        for reuse in (False, True):
+            bench(reuse, frame, template, max_results)
@@ -0,0 +1,65 @@
+"""
+屏幕截图后端基准
+对比 pyautogui（PIL -> numpy -> cvtColor）与 X11 共享内存截图的耗时，并校验两者像素一致
+
+用法（无桌面环境时可在 Xvfb 下运行）:
+    xvfb-run -s "-screen 0 1920x1080x24" python benchmarks/bench_capture.py
+"""
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core.x11_capture import X11Capture, is_x11_available
+
+
+def best_time(func, repeat: int = 20) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def pyautogui_grab(region=None):
+    import pyautogui
+    
+    screenshot = pyautogui.screenshot(region=region) if region else pyautogui.screenshot()
+    return cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+
+
+def main():
+    if not is_x11_available():
+        print("需要X11显示（设置 DISPLAY 或使用 xvfb-run）")
+        return 1
+    
+    capture = X11Capture()
+    width, height = capture.screen_size
+    print(f"屏幕 {width}x{height}, XShm: {capture.use_shm}")
+    
+    regions = [None, (width // 4, height // 4, 400, 300), (10, 10, 64, 64)]
+    for region in regions:
+        label = 'full' if region is None else f"{region[2]}x{region[3]}"
+        
+        reference = pyautogui_grab(region)
+        frame = capture.grab(region)
+        assert frame.shape == reference.shape, (frame.shape, reference.shape)
+        assert np.array_equal(frame, reference), "X11截图与pyautogui截图不一致"
+        
+        legacy = best_time(lambda: pyautogui_grab(region))
+        x11 = best_time(lambda: capture.grab(region))
+        reused = best_time(lambda: capture.grab(region, copy=False))
+        print(f"{label:>9}: pyautogui {legacy * 1000:7.2f} ms | X11 {x11 * 1000:7.2f} ms | "
+              f"X11复用缓冲 {reused * 1000:7.2f} ms | 加速 {legacy / x11:5.1f}x")
+    
+    capture.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
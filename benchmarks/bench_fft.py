@@ -0,0 +1,62 @@
+"""
+模板匹配后端交叉点基准
+对比空间域 cv2.matchTemplate 与频域实现在不同模板/截图尺寸下的耗时，
+用于确定 template_matcher.fft_area_ratio 的取值
+
+用法:
+    python benchmarks/bench_fft.py
+"""
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core.fft_matcher import match_template_fft
+
+
+FRAME_SIZES = ((480, 854), (720, 1280), (1080, 1920))
+TEMPLATE_SIDES = (16, 32, 64, 128, 256, 384)
+
+
+def make_frame(height: int, width: int, channels: int, seed: int = 0) -> np.ndarray:
+    """生成带纹理的随机截图"""
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    frame = cv2.GaussianBlur(frame, (5, 5), 0)
+    return frame if channels == 3 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+
+def best_time(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench(channels: int, method: int = cv2.TM_CCOEFF_NORMED, repeat: int = 3):
+    print(f"== {'BGR' if channels == 3 else '灰度'} ==")
+    for height, width in FRAME_SIZES:
+        frame = make_frame(height, width, channels)
+        crossover = None
+        for side in TEMPLATE_SIDES:
+            template = frame[height // 4:height // 4 + side, width // 4:width // 4 + side].copy()
+            spatial = best_time(lambda: cv2.matchTemplate(frame, template, method), repeat)
+            fft = best_time(lambda: match_template_fft(frame, template, method), repeat)
+            ratio = side * side / (height * width)
+            if crossover is None and fft < spatial:
+                crossover = ratio
+            print(f"{width}x{height} 模板 {side:>3}x{side:<3} 面积比 {ratio:.5f}: "
+                  f"空间域 {spatial * 1000:7.1f} ms | 频域 {fft * 1000:7.1f} ms | {spatial / fft:5.2f}x")
+        print(f"  -> 频域开始更快的面积比: {crossover if crossover is not None else '无'}")
+
+
+if __name__ == '__main__':
+    print(f"OpenCV {cv2.__version__}, 线程数 {cv2.getNumThreads()}")
+    for channels in (1, 3):
+        bench(channels)
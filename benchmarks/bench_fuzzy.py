@@ -0,0 +1,83 @@
+"""
+模糊文本匹配性能基准
+对比旧的纯Python动态规划编辑距离与 core.fuzzy_match（长度剪枝 + 位并行 + 提前结束）
+在多个目标 x 多个OCR单词下的耗时
+
+用法:
+    python benchmarks/bench_fuzzy.py
+"""
+import os
+import sys
+import time
+from typing import List
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core import fuzzy_match
+
+
+def legacy_levenshtein(s1: str, s2: str) -> int:
+    """旧实现：逐格动态规划"""
+    if len(s1) < len(s2):
+        return legacy_levenshtein(s2, s1)
+    if len(s2) == 0:
+        return len(s1)
+    previous_row = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1):
+        current_row = [i + 1]
+        for j, c2 in enumerate(s2):
+            insertions = previous_row[j + 1] + 1
+            deletions = current_row[j] + 1
+            substitutions = previous_row[j] + (c1 != c2)
+            current_row.append(min(insertions, deletions, substitutions))
+        previous_row = current_row
+    return previous_row[-1]
+
+
+def legacy_similarity(text1: str, text2: str) -> float:
+    text1 = text1.lower().strip()
+    text2 = text2.lower().strip()
+    if not text1 or not text2:
+        return 0.0
+    return max(0.0, 1 - legacy_levenshtein(text1, text2) / max(len(text1), len(text2)))
+
+
+def make_words(count: int, seed: int = 0) -> List[str]:
+    """模拟OCR单词：长度 1-16，含中英文"""
+    rng = np.random.default_rng(seed)
+    alphabet = list('abcdefghijklmnopqrstuvwxyz0123456789') + list('开始游戏继续领取确定取消')
+    lengths = rng.integers(1, 17, count)
+    return [''.join(rng.choice(alphabet, length)) for length in lengths]
+
+
+def bench(targets: int, words: int, threshold: float = 0.8, repeat: int = 3):
+    candidates = make_words(words, seed=1)
+    # 目标取自候选并加入一个错字，保证有命中
+    wanted = [word[:-1] + 'x' if len(word) > 4 else word + 'xy' for word in candidates[:targets]]
+    
+    start = time.perf_counter()
+    legacy = np.array([[legacy_similarity(t, c) for c in candidates] for t in wanted])
+    legacy_time = time.perf_counter() - start
+    legacy[legacy < threshold] = 0.0
+    
+    scalar_time = vector_time = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        scalar = np.array([[fuzzy_match.similarity(t, c, threshold) for c in candidates] for t in wanted])
+        scalar_time = min(scalar_time, time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        vector = fuzzy_match.similarity_matrix(wanted, candidates, threshold)
+        vector_time = min(vector_time, time.perf_counter() - start)
+    
+    assert np.allclose(scalar, legacy) and np.allclose(vector, legacy)
+    print(f"{targets:>3} 目标 x {words:>5} 单词: 旧实现 {legacy_time * 1000:9.1f} ms | "
+          f"逐对 {scalar_time * 1000:8.2f} ms ({legacy_time / scalar_time:5.1f}x) | "
+          f"向量化 {vector_time * 1000:8.2f} ms ({legacy_time / vector_time:5.1f}x)")
+
+
+if __name__ == '__main__':
+    for t, w in ((1, 50), (5, 200), (20, 2000)):
+        bench(t, w)
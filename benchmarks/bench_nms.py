@@ -0,0 +1,80 @@
+"""
+非极大值抑制性能基准
+对比旧的纯Python逐对比较实现与数组化实现在 1万 / 10万 候选点下的耗时
+
+用法:
+    python benchmarks/bench_nms.py
+"""
+import os
+import sys
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core.template_matcher import TemplateMatcher
+
+
+def legacy_non_max_suppression(points: List[Tuple[int, int, float]], width: int, height: int,
+                               overlap_threshold: float = 0.5) -> List[Tuple[int, int, float]]:
+    """旧实现：列表 + pop(0) + 逐对计算重叠度"""
+    boxes = [[x, y, x + width, y + height, c] for x, y, c in points]
+    boxes.sort(key=lambda b: b[4], reverse=True)
+    keep = []
+    while boxes:
+        best = boxes.pop(0)
+        keep.append(best)
+        remaining = []
+        for box in boxes:
+            x1 = max(best[0], box[0])
+            y1 = max(best[1], box[1])
+            x2 = min(best[2], box[2])
+            y2 = min(best[3], box[3])
+            if x2 <= x1 or y2 <= y1:
+                overlap = 0.0
+            else:
+                intersection = (x2 - x1) * (y2 - y1)
+                union = 2 * width * height - intersection
+                overlap = intersection / union
+            if overlap < overlap_threshold:
+                remaining.append(box)
+        boxes = remaining
+    return [(b[0], b[1], b[4]) for b in keep]
+
+
+def make_candidates(count: int, width: int, height: int, seed: int = 0):
+    """模拟纹理屏幕：候选点聚集在若干真实匹配附近"""
+    rng = np.random.default_rng(seed)
+    centers = rng.integers(0, [2560 - width, 1440 - height], size=(max(count // 500, 1), 2))
+    picks = centers[rng.integers(0, len(centers), count)]
+    jitter = rng.integers(-width // 2, width // 2 + 1, size=(count, 2))
+    xy = np.clip(picks + jitter, 0, None)
+    scores = rng.uniform(0.8, 1.0, count).astype(np.float32)
+    return xy[:, 0], xy[:, 1], scores
+
+
+def bench(count: int, width: int = 64, height: int = 48, repeat: int = 3):
+    xs, ys, scores = make_candidates(count, width, height)
+    matcher = TemplateMatcher.__new__(TemplateMatcher)
+    
+    points = sorted(zip(xs.tolist(), ys.tolist(), scores.tolist()), key=lambda p: p[2], reverse=True)
+    start = time.perf_counter()
+    legacy = legacy_non_max_suppression(points, width, height)
+    legacy_time = time.perf_counter() - start
+    
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        keep = matcher._non_max_suppression(xs, ys, scores, width, height)
+        best = min(best, time.perf_counter() - start)
+    
+    assert len(keep) == len(legacy), (len(keep), len(legacy))
+    print(f"{count:>7} 候选: 旧实现 {legacy_time * 1000:9.1f} ms | 数组化 {best * 1000:8.2f} ms | "
+          f"加速 {legacy_time / best:6.1f}x | 保留 {len(keep)}")
+
+
+if __name__ == '__main__':
+    for n in (10_000, 100_000):
+        bench(n)
@@ -0,0 +1,168 @@
+"""
+X11 截图正确性检查
+在根窗口上绘制已知像素，校验 X11Capture 的整屏、区域、复用缓冲区截图与绘制内容逐像素一致，
+并检查共享内存段在淘汰缓冲区和 close() 后被释放
+
+用法（需要X显示，无桌面环境时在 Xvfb 下运行）:
+    xvfb-run -s "-screen 0 1280x720x24" python benchmarks/check_x11_capture.py
+"""
+import os
+import sys
+import ctypes
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core.x11_capture import X11Capture, _load_libs, is_x11_available
+
+
+CELL = 40
+
+
+def live_shm_ids() -> set:
+    """当前系统中存在的 SysV 共享内存段编号"""
+    with open('/proc/sysvipc/shm') as f:
+        next(f)
+        return {int(line.split()[1]) for line in f if line.strip()}
+
+
+def buffer_ids(capture: X11Capture) -> set:
+    return {shm.info.shmid for shm in capture._buffers.values()}
+
+
+class Painter:
+    """在根窗口上绘制像素（TrueColor 24/32 位，像素值为 0xRRGGBB）"""
+    
+    def __init__(self):
+        self.xlib = _load_libs()[0]
+        display_p = ctypes.c_void_p
+        for func, argtypes, restype in [
+            (self.xlib.XCreateGC, [display_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_void_p], ctypes.c_void_p),
+            (self.xlib.XFreeGC, [display_p, ctypes.c_void_p], ctypes.c_int),
+            (self.xlib.XSetForeground, [display_p, ctypes.c_void_p, ctypes.c_ulong], ctypes.c_int),
+            (self.xlib.XFillRectangle, [display_p, ctypes.c_ulong, ctypes.c_void_p, ctypes.c_int, ctypes.c_int,
+                                        ctypes.c_uint, ctypes.c_uint], ctypes.c_int),
+            (self.xlib.XDrawPoint, [display_p, ctypes.c_ulong, ctypes.c_void_p, ctypes.c_int, ctypes.c_int],
+             ctypes.c_int),
+        ]:
+            func.argtypes, func.restype = argtypes, restype
+        
+        self.display = self.xlib.XOpenDisplay(None)
+        screen = self.xlib.XDefaultScreen(self.display)
+        self.root = self.xlib.XRootWindow(self.display, screen)
+        self.width = self.xlib.XDisplayWidth(self.display, screen)
+        self.height = self.xlib.XDisplayHeight(self.display, screen)
+        self.gc = self.xlib.XCreateGC(self.display, self.root, 0, None)
+    
+    def paint(self, seed: int) -> np.ndarray:
+        """绘制随机颜色的方格和单个像素点，返回预期的 BGR 图像"""
+        rng = np.random.default_rng(seed)
+        expected = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        for y in range(0, self.height, CELL):
+            for x in range(0, self.width, CELL):
+                b, g, r = (int(value) for value in rng.integers(0, 256, 3))
+                self._fill(x, y, CELL, CELL, b, g, r)
+                expected[y:y + CELL, x:x + CELL] = (b, g, r)
+        
+        # 单像素点检查行列偏移和字节顺序
+        for _ in range(500):
+            x, y = int(rng.integers(0, self.width)), int(rng.integers(0, self.height))
+            b, g, r = (int(value) for value in rng.integers(0, 256, 3))
+            self.xlib.XSetForeground(self.display, self.gc, (r << 16) | (g << 8) | b)
+            self.xlib.XDrawPoint(self.display, self.root, self.gc, x, y)
+            expected[y, x] = (b, g, r)
+        
+        self.xlib.XSync(self.display, 0)
+        return expected
+    
+    def _fill(self, x: int, y: int, width: int, height: int, b: int, g: int, r: int):
+        self.xlib.XSetForeground(self.display, self.gc, (r << 16) | (g << 8) | b)
+        self.xlib.XFillRectangle(self.display, self.root, self.gc, x, y, width, height)
+    
+    def close(self):
+        self.xlib.XFreeGC(self.display, self.gc)
+        self.xlib.XCloseDisplay(self.display)
+
+
+def check_capture(capture: X11Capture, painter: Painter):
+    width, height = capture.screen_size
+    regions = [
+        (0, 0, width, height),
+        (width // 4, height // 4, 400, 300),
+        (13, 7, 61, 37),
+        (width - 50, height - 30, 100, 100),   # 超出右下角，应裁到屏幕内
+        (-20, -10, 60, 40),                    # 超出左上角
+    ]
+    
+    expected = painter.paint(seed=1)
+    frame = capture.grab()
+    assert frame.shape == expected.shape, (frame.shape, expected.shape)
+    assert np.array_equal(frame, expected), "整屏截图与绘制内容不一致"
+    
+    for x, y, w, h in regions:
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, width), min(y + h, height)
+        region_frame = capture.grab((x, y, w, h))
+        assert np.array_equal(region_frame, expected[y0:y1, x0:x1]), f"区域截图不一致: {(x, y, w, h)}"
+    
+    # copy=False 返回同一个输出缓冲区，下一次同尺寸截图原地覆盖
+    region = regions[1]
+    x, y, w, h = region
+    first = capture.grab(region, copy=False)
+    assert np.array_equal(first, expected[y:y + h, x:x + w])
+    copied = capture.grab(region)
+    assert not np.shares_memory(copied, first), "copy=True 不应返回复用的缓冲区"
+    
+    expected = painter.paint(seed=2)
+    second = capture.grab(region, copy=False)
+    assert second is first or np.shares_memory(second, first), "copy=False 没有复用输出缓冲区"
+    assert np.array_equal(first, expected[y:y + h, x:x + w]), "复用缓冲区未更新为新画面"
+    assert not np.array_equal(copied, first), "copy=True 的结果被后续截图覆盖"
+
+
+def check_release():
+    before = live_shm_ids()
+    capture = X11Capture(max_buffers=2)
+    if not capture.use_shm:
+        capture.close()
+        print("X服务器不支持MIT-SHM，跳过共享内存释放检查")
+        return
+    
+    capture.grab((0, 0, 10, 10))
+    evicted = buffer_ids(capture)
+    capture.grab((0, 0, 20, 20))
+    capture.grab((0, 0, 30, 30))
+    assert not evicted & buffer_ids(capture)
+    assert not evicted & live_shm_ids(), "淘汰的共享内存段没有释放"
+    
+    held = buffer_ids(capture)
+    assert held <= live_shm_ids()
+    capture.close()
+    assert not held & live_shm_ids(), "close() 后共享内存段没有释放"
+    assert not (live_shm_ids() - before), "检查结束后仍有新建的共享内存段"
+    print("共享内存释放: ok")
+
+
+def main():
+    if not is_x11_available():
+        print("需要X11显示（设置 DISPLAY 或使用 xvfb-run）")
+        return 1
+    
+    painter = Painter()
+    try:
+        for use_shm in (True, False):
+            capture = X11Capture(use_shm=use_shm)
+            try:
+                check_capture(capture, painter)
+                print(f"{'XShmGetImage' if capture.use_shm else 'XGetImage'}: ok")
+            finally:
+                capture.close()
+        check_release()
+    finally:
+        painter.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
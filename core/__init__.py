@@ -11,6 +11,7 @@ from .script_queue import ScriptQueue
 from .config_manager import ConfigManager
 from .template_matcher import TemplateMatcher
 from .ocr_engine import OCREngine
+from .pixel_detector import PixelDetector
 
 __all__ = [
     'AutoScriptEngine',
@@ -18,5 +19,6 @@ __all__ = [
     'ScriptQueue',
     'ConfigManager',
     'TemplateMatcher',
-    'OCREngine'
+    'OCREngine',
+    'PixelDetector'
 ]
\ No newline at end of file
@@ -95,6 +95,9 @@ class ConfigManager:
         """获取默认配置"""
         return {
             'engine': {
+                'capture_backend': 'pyautogui',
+                'frame_max_age': 0.1,
+                'frame_source': 'desktop',
                 'max_workers': 4,
                 'queue_size': 100,
                 'timeout': 30
@@ -102,12 +105,49 @@ class ConfigManager:
             'template_matcher': {
                 'threshold': 0.8,
                 'method': 'cv2.TM_CCOEFF_NORMED',
-                'max_results': 10
+                'max_results': 10,
+                'search_mode': 'full',
+                'pyramid_scale': 0.5,
+                'pyramid_min_size': 8,
+                'pyramid_margin': 0.15,
+                'cache_max_mb': 256,
+                'cache_check_interval': 1.0,
+                'use_pack': True,
+                'color_mode': 'bgr',
+                'use_hints': False,
+                'hint_padding': 32,
+                'hint_cell_size': 64,
+                'hints_file': 'configs/location_hints.json',
+                'skip_unchanged': True,
+                'change_threshold': 3.0,
+                'multi_scale': False,
+                'scale_range': [0.5, 2.0],
+                'scale_step': 0.1,
+                'scale_miss_ttl': 2.0,
+                'backend': 'auto',
+                'fft_area_ratio': 0.005,
+                'reuse_buffers': True,
+                'buffer_pool_entries': 32,
+                'exact_tolerance': 0,
+                'exact_max_candidates': 4096,
+                'composite_margin': 16
             },
             'ocr': {
-                'engine': 'tesseract',
+                'engine': 'auto',
                 'lang': 'chi_sim+eng',
-                'config': '--psm 8'
+                'config': '--psm 8',
+                'tessdata_path': '',
+                'cache_enabled': True,
+                'cache_size': 512,
+                'cache_ttl': 30.0
+            },
+            'pixel_detector': {
+                'tolerance': 10
+            },
+            'vision_watch': {
+                'interval': 0.1,
+                'skip_unchanged': True,
+                'change_threshold': 3.0
             },
             'web': {
                 'host': '0.0.0.0',
@@ -2,7 +2,8 @@
 AutoScript 主引擎
 负责协调各个模块的工作，提供统一的API接口
 """
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Union
+from contextlib import contextmanager
 import threading
 import time
 from loguru import logger
@@ -12,6 +13,10 @@ from .script_queue import ScriptQueue
 from .config_manager import ConfigManager
 from .template_matcher import TemplateMatcher
 from .ocr_engine import OCREngine
+from .pixel_detector import PixelDetector
+from .vision_watch import VisionWatch, WatchResult
+from .frame_source import FrameSource, DesktopFrameSource
+from .frame_store import FrameStore
 
 
 class AutoScriptEngine:
@@ -27,8 +32,17 @@ class AutoScriptEngine:
         self.config_manager = ConfigManager(config_path)
         self.plugin_manager = PluginManager(self)
         self.script_queue = ScriptQueue(self)
+        self.frame_store = FrameStore(max_age=self.get_config('engine.frame_max_age', 0.1))
         self.template_matcher = TemplateMatcher(self)
         self.ocr_engine = OCREngine(self)
+        self.pixel_detector = PixelDetector(self)
+        self.vision_watch = VisionWatch(self)
+        
+        # 画面来源注册表，任务线程可绑定各自的画面来源
+        self.frame_sources: Dict[str, FrameSource] = {
+            'desktop': DesktopFrameSource(self.get_config('engine.capture_backend', 'pyautogui'))
+        }
+        self._task_context = threading.local()
         
         self._running = False
         self._main_thread = None
@@ -51,6 +65,9 @@ class AutoScriptEngine:
         self._running = False
         if self._main_thread:
             self._main_thread.join(timeout=5)
+        self.vision_watch.stop()
+        self.template_matcher.shutdown()
+        self.ocr_engine.close()
         logger.info("AutoScript引擎已停止")
     
     def _main_loop(self):
@@ -92,18 +109,182 @@ class AutoScriptEngine:
         """
         return self.template_matcher.find_template(template_name, **kwargs)
     
-    def recognize_text(self, image_path: str = None, region: tuple = None) -> str:
+    def find_templates(self, templates: List[Any], **kwargs) -> Dict[str, Any]:
+        """
+        批量查找模板（共用一帧截图并行匹配）
+        
+        Args:
+            templates: 模板名称或参数字典列表
+            **kwargs: 共用参数
+            
+        Returns:
+            {模板名称: 匹配结果}
+        """
+        return self.template_matcher.find_templates(templates, **kwargs)
+    
+    def find_composite(self, composite: Any, **kwargs) -> Dict[str, Any]:
+        """
+        查找组合模板（只全帧搜索锚点，子模板在相对锚点的预期位置验证）
+        
+        Args:
+            composite: 组合模板名称或定义字典
+            **kwargs: 共用参数
+            
+        Returns:
+            {键名: 匹配结果}
+        """
+        return self.template_matcher.find_composite(composite, **kwargs)
+    
+    def check_pixels(self, signature: Any, **kwargs) -> bool:
+        """
+        检查像素颜色特征（少量检查点的颜色比较，远快于模板匹配）
+        
+        Args:
+            signature: 已注册的特征名称、检查点列表 [(x, y, color, tolerance)] 或特征字典
+            **kwargs: image / origin / frame_source / min_version
+            
+        Returns:
+            是否命中
+        """
+        return self.pixel_detector.check(signature, **kwargs)
+    
+    def watch(self, kind: str, target: Any, interval: Optional[float] = None, **kwargs) -> str:
+        """
+        登记持续检测，由监视列表对每个新帧计算一次并发布结果
+        
+        Args:
+            kind: 检测类型 'template'/'text'/'ocr'/'pixels'
+            target: 模板名称、文字、识别区域或像素特征
+            interval: 期望的刷新间隔（秒）
+            **kwargs: frame_source 及检测参数
+            
+        Returns:
+            检测键
+        """
+        return self.vision_watch.watch(kind, target, interval, **kwargs)
+    
+    def unwatch(self, key: str, interval: Optional[float] = None):
+        """注销持续检测"""
+        self.vision_watch.unwatch(key, interval)
+    
+    def get_watch_result(self, key: str) -> Optional[WatchResult]:
+        """获取持续检测的最新结果"""
+        return self.vision_watch.get(key)
+    
+    def wait_watch(self, key: str, timeout: float = 10.0, **kwargs) -> Optional[WatchResult]:
+        """
+        等待持续检测命中
+        
+        Args:
+            key: 检测键
+            timeout: 超时时间（秒）
+            **kwargs: predicate / min_version
+            
+        Returns:
+            满足条件的结果，超时返回 None
+        """
+        return self.vision_watch.wait(key, timeout, **kwargs)
+    
+    def recognize_text(self, image_path: str = None, region: tuple = None, frame_source: Any = None) -> str:
         """
         识别文本
         
         Args:
             image_path: 图片路径
             region: 识别区域 (x, y, width, height)
+            frame_source: 画面来源（名称或 FrameSource 实例）
             
         Returns:
             识别的文本
         """
-        return self.ocr_engine.recognize_text(image_path, region)
+        return self.ocr_engine.recognize_text(image_path, region, frame_source)
+    
+    def recognize_regions(self, regions: Any, **kwargs) -> Dict[Any, Any]:
+        """
+        并行识别多个区域（只取一帧）
+        
+        Args:
+            regions: {键名: 区域} 字典或区域列表
+            **kwargs: image_path / frame_source / image / with_confidence
+            
+        Returns:
+            {键名: 识别结果}
+        """
+        return self.ocr_engine.recognize_regions(regions, **kwargs)
+    
+    def find_texts(self, targets: List[str], **kwargs) -> Dict[str, Any]:
+        """
+        在同一帧中查找多个文本（只识别一次）
+        
+        Args:
+            targets: 要查找的文本列表
+            **kwargs: image_path / region / similarity_threshold / frame_source / image
+            
+        Returns:
+            {文本: 找到的文本信息或 None}
+        """
+        return self.ocr_engine.find_texts(targets, **kwargs)
+    
+    def register_frame_source(self, name: str, source: FrameSource):
+        """
+        注册画面来源
+        
+        Args:
+            name: 来源名称，供 frame_source 参数和任务配置引用
+            source: 画面来源实例
+        """
+        self.frame_sources[name] = source
+        logger.info(f"画面来源已注册: {name} {source!r}")
+    
+    def unregister_frame_source(self, name: str):
+        """注销画面来源"""
+        source = self.frame_sources.pop(name, None)
+        if source is not None:
+            source.close()
+    
+    def get_frame_source(self, source: Union[str, FrameSource, None] = None) -> FrameSource:
+        """
+        解析画面来源
+        
+        查找顺序：显式传入的实例 > 注册表中的名称 > 同名插件提供的来源（如 'scrcpy'、'playwright'）。
+        未指定时使用当前线程绑定的来源，再退回 engine.frame_source 配置（默认桌面）。
+        
+        Args:
+            source: 来源名称或实例
+            
+        Returns:
+            画面来源实例
+        """
+        if source is None:
+            source = getattr(self._task_context, 'frame_source', None) or \
+                self.get_config('engine.frame_source', 'desktop')
+        if isinstance(source, FrameSource):
+            return source
+        
+        if source in self.frame_sources:
+            return self.frame_sources[source]
+        
+        plugin = self.get_plugin(source)
+        if plugin is not None and hasattr(plugin, 'get_frame_source'):
+            return plugin.get_frame_source()
+        
+        raise ValueError(f"未知的画面来源: {source}")
+    
+    @contextmanager
+    def use_frame_source(self, source: Union[str, FrameSource, None]):
+        """
+        在当前线程内绑定画面来源，期间未指定 frame_source 的匹配和OCR调用都使用该来源
+        
+        Args:
+            source: 来源名称或实例，为 None 时不改变绑定
+        """
+        previous = getattr(self._task_context, 'frame_source', None)
+        if source is not None:
+            self._task_context.frame_source = source
+        try:
+            yield
+        finally:
+            self._task_context.frame_source = previous
     
     def get_config(self, key: str, default: Any = None) -> Any:
         """获取配置"""
@@ -0,0 +1,89 @@
+"""
+频域模板匹配
+用DFT计算归一化互相关，结果与 cv2.matchTemplate 的对应方法一致
+"""
+import cv2
+import numpy as np
+
+
+# 支持频域计算的匹配方法
+FFT_METHODS = (cv2.TM_CCOEFF_NORMED, cv2.TM_CCORR_NORMED)
+
+
+def match_template_fft(image: np.ndarray, template: np.ndarray, method: int = cv2.TM_CCOEFF_NORMED) -> np.ndarray:
+    """
+    频域归一化互相关模板匹配
+    
+    分子（模板与窗口的互相关）通过DFT逐通道计算，分母（窗口能量）通过积分图计算，
+    计算量与模板面积基本无关，适合大模板。
+    
+    Args:
+        image: 搜索图像（单通道或多通道 uint8）
+        template: 模板图像，通道数与 image 相同
+        method: cv2.TM_CCOEFF_NORMED 或 cv2.TM_CCORR_NORMED
+    
+    Returns:
+        得分图，尺寸为 (H - h + 1, W - w + 1)，float32
+    """
+    if method not in FFT_METHODS:
+        raise ValueError(f"频域匹配不支持该方法: {method}")
+    
+    image_height, image_width = image.shape[:2]
+    height, width = template.shape[:2]
+    result_height, result_width = image_height - height + 1, image_width - width + 1
+    if result_height <= 0 or result_width <= 0:
+        raise ValueError("模板尺寸大于搜索图像")
+    
+    # 补零到DFT最优尺寸，互相关有效区域不受循环卷积影响
+    dft_height = cv2.getOptimalDFTSize(image_height)
+    dft_width = cv2.getOptimalDFTSize(image_width)
+    count = height * width
+    centered = method == cv2.TM_CCOEFF_NORMED
+    
+    channels = image.shape[2] if image.ndim == 3 else 1
+    numerator = np.zeros((result_height, result_width), np.float64)
+    window_norm = np.zeros((result_height, result_width), np.float64)
+    template_norm = 0.0
+    
+    for channel in range(channels):
+        image_channel = (cv2.extractChannel(image, channel) if channels > 1 else image).astype(np.float32)
+        template_channel = (cv2.extractChannel(template, channel) if channels > 1 else template).astype(np.float32)
+        if centered:
+            template_channel -= float(template_channel.mean())
+        template_norm += float(cv2.norm(template_channel, cv2.NORM_L2SQR))
+        
+        # 分子：频域互相关
+        padded_image = cv2.copyMakeBorder(image_channel, 0, dft_height - image_height, 0,
+                                          dft_width - image_width, cv2.BORDER_CONSTANT, value=0)
+        padded_template = cv2.copyMakeBorder(template_channel, 0, dft_height - height, 0,
+                                             dft_width - width, cv2.BORDER_CONSTANT, value=0)
+        spectrum = cv2.mulSpectrums(cv2.dft(padded_image), cv2.dft(padded_template), 0, conjB=True)
+        correlation = cv2.idft(spectrum, flags=cv2.DFT_SCALE | cv2.DFT_REAL_OUTPUT)
+        numerator += correlation[:result_height, :result_width]
+        
+        # 分母：积分图求每个窗口的像素和与平方和
+        sums, squares = cv2.integral2(image_channel, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+        window_squares = squares[height:, width:] - squares[:-height, width:] \
+            - squares[height:, :-width] + squares[:-height, :-width]
+        if centered:
+            window_sums = sums[height:, width:] - sums[:-height, width:] \
+                - sums[height:, :-width] + sums[:-height, :-width]
+            window_squares -= window_sums * window_sums / count
+        window_norm += window_squares
+    
+    # 平坦模板（去均值后能量为0）：与 cv2.matchTemplate 相同，所有位置得分为 1
+    if centered and template_norm <= 1e-6 * count:
+        return np.ones((result_height, result_width), np.float32)
+    
+    denominator = np.sqrt(np.maximum(window_norm, 0) * template_norm)
+    denominator[denominator <= 1e-6 * count] = 0.0
+    
+    # 与 cv2.matchTemplate 相同的归一化规则：|分子| < 分母 时相除，略超出（舍入误差）时取 ±1，
+    # 否则（包括平坦窗口，分母为0）为 0
+    magnitude = np.abs(numerator)
+    inside = magnitude < denominator
+    rounding = ~inside & (magnitude < denominator * 1.125)
+    result = np.zeros((result_height, result_width), np.float32)
+    result[inside] = numerator[inside] / denominator[inside]
+    result[rounding] = np.sign(numerator[rounding])
+    return result
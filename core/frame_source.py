@@ -0,0 +1,356 @@
+"""
+画面来源
+为模板匹配和OCR提供统一的取帧接口，帧以 BGR numpy 数组在内存中传递
+"""
+import os
+import time
+import asyncio
+import inspect
+import subprocess
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, List, Optional, Sequence, Tuple, Union
+import cv2
+import numpy as np
+from loguru import logger
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+def crop_region(frame: np.ndarray, region: Optional[Tuple[int, int, int, int]]) -> np.ndarray:
+    """
+    从整帧中裁剪区域（返回视图，不复制数据）
+    
+    Args:
+        frame: 整帧图像
+        region: 区域 (x, y, width, height)，为 None 时返回整帧
+    
+    Returns:
+        区域图像
+    """
+    if not region:
+        return frame
+    x, y, w, h = region
+    return frame[max(y, 0):y + h, max(x, 0):x + w]
+
+
+def frame_signature(frame: np.ndarray) -> np.ndarray:
+    """
+    计算截图的缩略签名（每 16x16 像素块的平均灰度），用于判断画面是否变化
+    
+    Args:
+        frame: 截图
+    
+    Returns:
+        缩略灰度图
+    """
+    height, width = frame.shape[:2]
+    small = cv2.resize(frame, (max(width // 16, 1), max(height // 16, 1)), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    return small
+
+
+def frame_changed(previous: Optional[np.ndarray], current: np.ndarray, threshold: float) -> bool:
+    """
+    比较两个截图签名，任一像素块的平均灰度变化超过阈值即视为画面变化
+    
+    Args:
+        previous: 上一次的签名，为 None 时视为变化
+        current: 当前签名
+        threshold: 灰度差阈值
+    
+    Returns:
+        画面是否变化
+    """
+    if previous is None or previous.shape != current.shape:
+        return True
+    return cv2.norm(previous, current, cv2.NORM_INF) > threshold
+
+
+def decode_image(data: bytes) -> Optional[np.ndarray]:
+    """将 PNG/JPEG 等编码数据在内存中解码为 BGR 图像"""
+    if not data:
+        return None
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+class FrameSource(ABC):
+    """画面来源基类"""
+    
+    name = "base"
+    # grab(region) 只读取区域像素时为 True，帧存储没有可复用的整帧时直接截取区域
+    region_capture = False
+    
+    @abstractmethod
+    def grab(self, region: Optional[Tuple[int, int, int, int]] = None) -> Optional[np.ndarray]:
+        """
+        获取一帧画面
+        
+        Args:
+            region: 区域 (x, y, width, height)，坐标为该来源自身的坐标系
+        
+        Returns:
+            BGR 图像，失败返回 None
+        """
+        pass
+    
+    def size(self) -> Optional[Tuple[int, int]]:
+        """整帧尺寸 (width, height)，未知时返回 None"""
+        return None
+    
+    def click(self, x: int, y: int, **kwargs):
+        """
+        在该来源的坐标系中点击
+        
+        Args:
+            x: 横坐标
+            y: 纵坐标
+            **kwargs: button / clicks / interval
+        """
+        raise NotImplementedError(f"画面来源 {self.name} 不支持点击")
+    
+    def close(self):
+        """释放资源"""
+        pass
+    
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.name}>"
+
+
+class DesktopFrameSource(FrameSource):
+    """本机桌面（Linux X11 下直接读取共享内存，其他平台使用 pyautogui）"""
+    
+    name = "desktop"
+    region_capture = True
+    
+    def __init__(self, backend: str = 'auto'):
+        """
+        初始化桌面画面来源
+        
+        Args:
+            backend: 截图后端 'auto'（可用时使用X11）、'x11' 或 'pyautogui'
+                     （启用X11前先在目标环境运行 benchmarks/check_x11_capture.py）
+        """
+        self.backend = backend
+        self._x11 = None
+        self._x11_failed = False
+        self._lock = threading.Lock()
+    
+    def _get_x11(self):
+        """按需创建X11截图器，auto 模式下不可用时返回 None"""
+        if self.backend == 'pyautogui' or self._x11_failed:
+            return None
+        if self._x11 is not None:
+            return self._x11
+        
+        from .x11_capture import X11Capture, is_x11_available
+        
+        with self._lock:
+            if self._x11 is None and not self._x11_failed:
+                try:
+                    if self.backend == 'auto' and not is_x11_available():
+                        raise RuntimeError("当前环境没有X11显示")
+                    self._x11 = X11Capture()
+                except Exception as e:
+                    if self.backend == 'x11':
+                        raise
+                    self._x11_failed = True
+                    logger.debug(f"X11截图不可用，使用pyautogui: {e}")
+        return self._x11
+    
+    def grab(self, region: Optional[Tuple[int, int, int, int]] = None) -> Optional[np.ndarray]:
+        x11 = self._get_x11()
+        if x11 is not None:
+            return x11.grab(region)
+        
+        import pyautogui
+        
+        screenshot = pyautogui.screenshot(region=region) if region else pyautogui.screenshot()
+        return cv2.cvtColor(np.asarray(screenshot), cv2.COLOR_RGB2BGR)
+    
+    def size(self) -> Optional[Tuple[int, int]]:
+        x11 = self._get_x11()
+        if x11 is not None:
+            return x11.screen_size
+        
+        import pyautogui
+        
+        width, height = pyautogui.size()
+        return int(width), int(height)
+    
+    def close(self):
+        if self._x11 is not None:
+            self._x11.close()
+            self._x11 = None
+    
+    def click(self, x: int, y: int, **kwargs):
+        import pyautogui
+        
+        pyautogui.click(x, y, clicks=kwargs.get('clicks', 1), interval=kwargs.get('interval', 0.1),
+                        button=kwargs.get('button', 'left'))
+
+
+class AdbFrameSource(FrameSource):
+    """Android 设备（adb exec-out screencap，PNG 数据直接从管道读入内存）"""
+    
+    name = "adb"
+    
+    def __init__(self, device_id: Optional[str] = None, adb_path: str = 'adb', timeout: float = 10):
+        """
+        初始化ADB画面来源
+        
+        Args:
+            device_id: 设备序列号或 ip:port，为 None 时使用 adb 默认设备
+            adb_path: adb 可执行文件路径
+            timeout: 单次截图超时（秒）
+        """
+        self.device_id = device_id
+        self.adb_path = adb_path
+        self.timeout = timeout
+    
+    def _command(self, *args: str) -> List[str]:
+        cmd = [self.adb_path]
+        if self.device_id:
+            cmd.extend(['-s', self.device_id])
+        cmd.extend(args)
+        return cmd
+    
+    def grab(self, region: Optional[Tuple[int, int, int, int]] = None) -> Optional[np.ndarray]:
+        result = subprocess.run(self._command('exec-out', 'screencap', '-p'),
+                                capture_output=True, timeout=self.timeout)
+        if result.returncode != 0:
+            raise RuntimeError(f"设备截图失败: {result.stderr.decode(errors='ignore').strip()}")
+        
+        frame = decode_image(result.stdout)
+        if frame is None:
+            raise RuntimeError("设备截图数据无法解码")
+        return crop_region(frame, region)
+    
+    def click(self, x: int, y: int, **kwargs):
+        for _ in range(kwargs.get('clicks', 1)):
+            subprocess.run(self._command('shell', 'input', 'tap', str(int(x)), str(int(y))),
+                           capture_output=True, timeout=self.timeout)
+            time.sleep(kwargs.get('interval', 0.1))
+    
+    def __repr__(self) -> str:
+        return f"<AdbFrameSource {self.device_id or 'default'}>"
+
+
+class PlaywrightFrameSource(FrameSource):
+    """Playwright 页面（同步或异步 Page 均可）"""
+    
+    name = "playwright"
+    region_capture = True
+    
+    def __init__(self, page: Any, loop: Optional[asyncio.AbstractEventLoop] = None, timeout: float = 30):
+        """
+        初始化页面画面来源
+        
+        Args:
+            page: Playwright Page 对象
+            loop: 异步 Page 所属的事件循环（在其他线程运行时传入），为 None 时用 asyncio.run 执行
+            timeout: 单次截图超时（秒）
+        """
+        self.page = page
+        self.loop = loop
+        self.timeout = timeout
+    
+    def _resolve(self, value: Any) -> Any:
+        """等待异步 Page 方法的返回值"""
+        if not inspect.isawaitable(value):
+            return value
+        if self.loop is not None:
+            return asyncio.run_coroutine_threadsafe(value, self.loop).result(self.timeout)
+        return asyncio.run(value)
+    
+    def grab(self, region: Optional[Tuple[int, int, int, int]] = None) -> Optional[np.ndarray]:
+        # 区域截图交给浏览器裁剪，只编码需要的部分
+        kwargs = {'type': 'png'}
+        if region:
+            x, y, w, h = region
+            kwargs['clip'] = {'x': x, 'y': y, 'width': w, 'height': h}
+        return decode_image(self._resolve(self.page.screenshot(**kwargs)))
+    
+    def size(self) -> Optional[Tuple[int, int]]:
+        viewport = self.page.viewport_size
+        return (viewport['width'], viewport['height']) if viewport else None
+    
+    def click(self, x: int, y: int, **kwargs):
+        self._resolve(self.page.mouse.click(x, y, button=kwargs.get('button', 'left'),
+                                            click_count=kwargs.get('clicks', 1)))
+
+
+class ImageFileFrameSource(FrameSource):
+    """图片文件（文件被替换时自动重新读取）"""
+    
+    name = "image"
+    
+    def __init__(self, path: str):
+        """
+        初始化图片画面来源
+        
+        Args:
+            path: 图片路径
+        """
+        self.path = path
+        self._frame: Optional[np.ndarray] = None
+        self._mtime_ns = None
+    
+    def grab(self, region: Optional[Tuple[int, int, int, int]] = None) -> Optional[np.ndarray]:
+        mtime_ns = os.stat(self.path).st_mtime_ns
+        if self._frame is None or mtime_ns != self._mtime_ns:
+            self._frame = cv2.imread(self.path)
+            self._mtime_ns = mtime_ns
+            if self._frame is None:
+                raise RuntimeError(f"无法加载图像: {self.path}")
+        return crop_region(self._frame, region)
+    
+    def __repr__(self) -> str:
+        return f"<ImageFileFrameSource {self.path}>"
+
+
+class ReplayFrameSource(FrameSource):
+    """回放录制的帧序列，每次 grab 前进一帧"""
+    
+    name = "replay"
+    
+    def __init__(self, frames: Union[str, Sequence[Union[str, np.ndarray]]], loop: bool = False):
+        """
+        初始化回放画面来源
+        
+        Args:
+            frames: 帧图片目录（按文件名排序），或图片路径/图像数组列表
+            loop: 播放结束后是否从头循环，否则停留在最后一帧
+        """
+        if isinstance(frames, str):
+            frames = [os.path.join(frames, file) for file in sorted(os.listdir(frames))
+                      if os.path.splitext(file)[1].lower() in IMAGE_EXTENSIONS]
+        self.frames = list(frames)
+        self.loop = loop
+        self.index = 0
+        self._lock = threading.Lock()
+    
+    def grab(self, region: Optional[Tuple[int, int, int, int]] = None) -> Optional[np.ndarray]:
+        if not self.frames:
+            return None
+        
+        with self._lock:
+            frame = self.frames[self.index]
+            if self.index + 1 < len(self.frames):
+                self.index += 1
+            elif self.loop:
+                self.index = 0
+        
+        if isinstance(frame, str):
+            path, frame = frame, cv2.imread(frame)
+            if frame is None:
+                logger.error(f"无法加载回放帧: {path}")
+                return None
+        return crop_region(frame, region)
+    
+    def reset(self):
+        """回到第一帧"""
+        with self._lock:
+            self.index = 0
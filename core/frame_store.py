@@ -0,0 +1,200 @@
+"""
+帧存储
+按画面来源保存最新的整帧截图及其版本号，区域请求直接返回整帧的视图；
+没有可复用的整帧时，支持区域截图的来源只截取请求的区域
+"""
+import time
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from loguru import logger
+
+from .frame_source import FrameSource, crop_region
+
+
+@dataclass
+class Frame:
+    """一帧截图（image 为只读视图，调用方不应原地修改）"""
+    image: np.ndarray
+    version: int
+    timestamp: float
+    region: Optional[Tuple[int, int, int, int]] = None
+
+
+class _SourceState:
+    """单个画面来源的最新帧和输入屏障"""
+    
+    def __init__(self):
+        self.frame: Optional[Frame] = None
+        self.regions: Dict[Tuple[int, int, int, int], Frame] = {}  # 区域 -> 最新的区域截图
+        self.input_time = 0.0  # 最近一次输入动作的时间，在此之前开始截取的帧不再复用
+        self.capture_lock = threading.Lock()
+
+
+class FrameStore:
+    """带版本号的帧存储"""
+    
+    def __init__(self, max_age: float = 0.1, max_regions: int = 16):
+        """
+        初始化帧存储
+        
+        Args:
+            max_age: 帧可以被复用的最长时间（秒）
+            max_regions: 每个来源保留的区域截图数量上限
+        """
+        self.max_age = max_age
+        self.max_regions = max_regions
+        self._states: Dict[FrameSource, _SourceState] = {}
+        self._lock = threading.Lock()
+        self._version = 0
+        
+        self.captures = 0
+        self.reuses = 0
+    
+    @property
+    def version(self) -> int:
+        """最近一次截图的版本号（所有来源共用一个单调递增的计数）"""
+        return self._version
+    
+    def get(self, source: FrameSource, region: Optional[Tuple[int, int, int, int]] = None,
+            max_age: Optional[float] = None, min_version: Optional[int] = None,
+            force_new: bool = False) -> Optional[Frame]:
+        """
+        获取一帧截图
+        
+        最新整帧满足新鲜度要求时直接返回（区域为整帧的视图）。否则，来源支持区域截图
+        （source.region_capture）时复用或截取该区域，其他来源截取新的整帧。
+        同一来源的并发请求只会触发一次截图。
+        
+        Args:
+            source: 画面来源
+            region: 区域 (x, y, width, height)
+            max_age: 可复用的最长时间（秒），默认使用 self.max_age
+            min_version: 要求帧的版本号不小于该值
+            force_new: 强制截取新帧
+        
+        Returns:
+            截图帧，失败返回 None
+        """
+        state = self._get_state(source)
+        max_age = self.max_age if max_age is None else max_age
+        key = tuple(region) if region and source.region_capture else None
+        seen = (state.frame, state.regions.get(key))
+        
+        frame = None if force_new else self._reusable_frame(state, key, max_age, min_version)
+        if frame is None:
+            with state.capture_lock:
+                # 等锁期间其他线程已经截取了新帧时直接复用
+                if state.frame is not seen[0] or state.regions.get(key) is not seen[1]:
+                    frame = self._reusable_frame(state, key, max_age, min_version)
+                if frame is not None:
+                    self.reuses += 1
+                else:
+                    frame = self._capture(source, state, key)
+                    if frame is None:
+                        return None
+        else:
+            self.reuses += 1
+        
+        if not region or frame.region is not None:
+            return frame
+        return Frame(image=crop_region(frame.image, region), version=frame.version,
+                     timestamp=frame.timestamp, region=tuple(region))
+    
+    def latest(self, source: FrameSource) -> Optional[Frame]:
+        """获取来源的最新整帧（不截图）"""
+        with self._lock:
+            state = self._states.get(source)
+        return state.frame if state else None
+    
+    def mark_input(self, source: Optional[FrameSource] = None) -> int:
+        """
+        记录一次输入动作（点击、按键等），之后的请求不会再复用动作之前的帧
+        
+        Args:
+            source: 发生输入的画面来源，为 None 时作用于所有来源
+        
+        Returns:
+            当前版本号，之后截取的帧版本号都大于它
+        """
+        with self._lock:
+            states = [self._states[source]] if source in self._states else \
+                ([] if source is not None else list(self._states.values()))
+            now = time.time()
+            for state in states:
+                state.input_time = now
+            return self._version
+    
+    def invalidate(self, source: Optional[FrameSource] = None):
+        """丢弃缓存的帧"""
+        with self._lock:
+            if source is None:
+                self._states.clear()
+            else:
+                self._states.pop(source, None)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        with self._lock:
+            requests = self.captures + self.reuses
+            return {
+                'version': self._version,
+                'sources': len(self._states),
+                'captures': self.captures,
+                'reuses': self.reuses,
+                'reuse_rate': self.reuses / requests if requests else 0.0
+            }
+    
+    def _get_state(self, source: FrameSource) -> _SourceState:
+        with self._lock:
+            state = self._states.get(source)
+            if state is None:
+                state = self._states[source] = _SourceState()
+            return state
+    
+    def _reusable_frame(self, state: _SourceState, region: Optional[Tuple[int, int, int, int]],
+                        max_age: float, min_version: Optional[int]) -> Optional[Frame]:
+        """可复用的整帧，没有时返回可复用的同一区域截图（region 为 None 时只看整帧）"""
+        frame = self._fresh_frame(state, state.frame, max_age, min_version)
+        if frame is None and region is not None:
+            frame = self._fresh_frame(state, state.regions.get(region), max_age, min_version)
+        return frame
+    
+    def _fresh_frame(self, state: _SourceState, frame: Optional[Frame], max_age: float,
+                     min_version: Optional[int]) -> Optional[Frame]:
+        """帧满足时间、版本和输入屏障要求时返回，否则返回 None"""
+        if frame is None or frame.timestamp <= state.input_time:
+            return None
+        if min_version is not None and frame.version < min_version:
+            return None
+        if time.time() - frame.timestamp > max_age:
+            return None
+        return frame
+    
+    def _capture(self, source: FrameSource, state: _SourceState,
+                 region: Optional[Tuple[int, int, int, int]] = None) -> Optional[Frame]:
+        """截取整帧（或区域）并发布为新版本（调用方需持有 state.capture_lock）"""
+        timestamp = time.time()
+        try:
+            image = source.grab(region)
+        except Exception as e:
+            logger.error(f"获取截图失败: {source!r} - {e}")
+            return None
+        if image is None:
+            return None
+        
+        with self._lock:
+            self._version += 1
+            frame = Frame(image=image, version=self._version, timestamp=timestamp, region=region)
+            if region is None:
+                # 新的整帧可以满足所有区域请求
+                state.frame = frame
+                state.regions.clear()
+            else:
+                state.regions.pop(region, None)
+                state.regions[region] = frame
+                while len(state.regions) > self.max_regions:
+                    state.regions.pop(next(iter(state.regions)))
+            self.captures += 1
+        return frame
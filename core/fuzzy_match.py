@@ -0,0 +1,246 @@
+"""
+模糊文本匹配
+按相似度阈值换算出允许的最大编辑距离：先按长度差排除候选，
+再用位并行（Myers/Hyyrö）编辑距离计算，距离确定超出上限时提前结束。
+多个目标对多个候选时按候选向量化，一次计算整组相似度。
+"""
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# 向量化计算时每个目标的位向量宽度
+_WORD_BITS = 64
+# 剪枝后候选少于该数量时逐个计算（numpy 的调用开销大于收益）
+_MIN_BATCH = 48
+
+
+def normalize_text(text: str) -> str:
+    """比较前的归一化（忽略大小写和首尾空白）"""
+    return text.lower().strip()
+
+
+def max_distance(threshold: float, length: int) -> int:
+    """
+    相似度阈值对应的最大编辑距离
+    
+    Args:
+        threshold: 相似度阈值 (0-1)
+        length: 两个字符串中较长者的长度
+    
+    Returns:
+        满足 1 - distance / length >= threshold 的最大 distance
+    """
+    # 加上微小量抵消浮点误差，例如 (1 - 0.8) * 5 = 0.9999999999999998
+    return max(int(math.floor((1.0 - threshold) * length + 1e-9)), 0)
+
+
+def edit_distance(s1: str, s2: str, limit: Optional[int] = None) -> int:
+    """
+    计算编辑距离（Levenshtein）
+    
+    Args:
+        s1: 字符串1
+        s2: 字符串2
+        limit: 距离上限，确定超出时提前结束
+    
+    Returns:
+        编辑距离；给定 limit 且距离超出时返回 limit + 1
+    """
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    if limit is not None and len(s1) - len(s2) > limit:
+        return limit + 1
+    if not s2:
+        return len(s1)
+    
+    # 较短的字符串作为模式，每个字符对应一个位掩码
+    m = len(s2)
+    full = (1 << m) - 1
+    high = 1 << (m - 1)
+    peq: Dict[str, int] = {}
+    for i, c in enumerate(s2):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    
+    pv, mv, score = full, 0, m
+    remaining = len(s1)
+    for c in s1:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        
+        remaining -= 1
+        if limit is not None and score - remaining > limit:
+            # 后面每个字符最多让距离减少 1
+            return limit + 1
+        
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    
+    return score
+
+
+def similarity(text1: str, text2: str, threshold: float = 0.0) -> float:
+    """
+    计算文本相似度（1 - 编辑距离 / 较长长度，比较前归一化）
+    
+    Args:
+        text1: 文本1
+        text2: 文本2
+        threshold: 相似度阈值，低于阈值的结果不精确计算
+    
+    Returns:
+        相似度 (0-1)，低于阈值时返回 0.0
+    """
+    text1, text2 = normalize_text(text1), normalize_text(text2)
+    if not text1 or not text2:
+        return 0.0
+    
+    length = max(len(text1), len(text2))
+    limit = max_distance(threshold, length)
+    distance = edit_distance(text1, text2, limit)
+    if distance > limit:
+        return 0.0
+    return max(0.0, 1.0 - distance / length)
+
+
+def similarity_matrix(targets: Sequence[str], candidates: Sequence[str], threshold: float = 0.0) -> np.ndarray:
+    """
+    计算多个目标与多个候选两两之间的相似度
+    
+    Args:
+        targets: 目标文本列表
+        candidates: 候选文本列表（例如OCR识别出的单词）
+        threshold: 相似度阈值，低于阈值的结果不精确计算
+    
+    Returns:
+        (len(targets), len(candidates)) 的相似度矩阵，低于阈值的位置为 0.0
+    """
+    targets = [normalize_text(text) for text in targets]
+    candidates = [normalize_text(text) for text in candidates]
+    scores = np.zeros((len(targets), len(candidates)), dtype=np.float64)
+    if not targets or not candidates:
+        return scores
+    
+    lengths = np.array([len(text) for text in candidates], dtype=np.int64)
+    codes, alphabet = _encode(candidates, targets)
+    
+    for row, target in enumerate(targets):
+        if not target:
+            continue
+        
+        # 长度差超过允许的距离的候选直接排除
+        longest = np.maximum(lengths, len(target))
+        limits = np.floor((1.0 - threshold) * longest + 1e-9).astype(np.int64).clip(min=0)
+        keep = np.flatnonzero((lengths > 0) & (np.abs(lengths - len(target)) <= limits))
+        if keep.size == 0:
+            continue
+        
+        if len(target) <= _WORD_BITS and keep.size >= _MIN_BATCH:
+            distances = _batch_distance(target, alphabet, codes[keep], lengths[keep], limits[keep])
+        else:
+            distances = np.array([edit_distance(target, candidates[i], int(limits[i])) for i in keep], dtype=np.int64)
+        
+        ok = distances <= limits[keep]
+        scores[row, keep[ok]] = 1.0 - distances[ok] / longest[keep[ok]]
+    
+    return scores
+
+
+def best_match(target: str, candidates: Sequence[str], threshold: float = 0.0) -> Tuple[int, float]:
+    """
+    在候选中查找与目标最相似的一个
+    
+    Args:
+        target: 目标文本
+        candidates: 候选文本列表
+        threshold: 相似度阈值
+    
+    Returns:
+        (下标, 相似度)，没有达到阈值的候选时返回 (-1, 0.0)；相似度相同时取靠前的候选
+    """
+    if not candidates:
+        return -1, 0.0
+    scores = similarity_matrix([target], candidates, threshold)[0]
+    index = int(np.argmax(scores))
+    if scores[index] <= 0.0 or scores[index] < threshold:
+        return -1, 0.0
+    return index, float(scores[index])
+
+
+def _encode(candidates: List[str], targets: List[str]) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    把候选编码为字符编号矩阵
+    
+    出现在任一目标中的字符编号为 1..V，其他字符为 0（不会与目标中的任何字符相等），补齐位置也为 0
+    
+    Returns:
+        (编号矩阵, 字符 -> 编号)
+    """
+    alphabet: Dict[str, int] = {}
+    for target in targets:
+        for c in target:
+            alphabet.setdefault(c, len(alphabet) + 1)
+    
+    width = max((len(text) for text in candidates), default=0)
+    codes = np.zeros((len(candidates), max(width, 1)), dtype=np.intp)
+    for i, text in enumerate(candidates):
+        codes[i, :len(text)] = [alphabet.get(c, 0) for c in text]
+    return codes, alphabet
+
+
+def _batch_distance(target: str, alphabet: Dict[str, int], codes: np.ndarray,
+                    lengths: np.ndarray, limits: np.ndarray) -> np.ndarray:
+    """
+    一个目标（不超过 64 个字符）对一组候选的位并行编辑距离，每个候选占一个 uint64 位向量
+    
+    Args:
+        target: 目标文本（模式）
+        alphabet: 字符编号，见 _encode
+        codes: 候选的字符编号矩阵，见 _encode
+        lengths: 候选长度
+        limits: 每个候选允许的最大距离
+    
+    Returns:
+        编辑距离，超出上限的候选为不小于 limit + 1 的值
+    """
+    m = len(target)
+    one = np.uint64(1)
+    full = np.uint64((1 << m) - 1)
+    high = np.uint64(1 << (m - 1))
+    
+    peq = np.zeros(len(alphabet) + 1, dtype=np.uint64)
+    for i, c in enumerate(target):
+        peq[alphabet[c]] |= np.uint64(1 << i)
+    
+    count = len(lengths)
+    pv = np.full(count, full, dtype=np.uint64)
+    mv = np.zeros(count, dtype=np.uint64)
+    score = np.full(count, m, dtype=np.int64)
+    
+    for j in range(int(lengths.max())):
+        active = lengths > j
+        eq = peq[codes[:, j]]
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        score += np.where(active, (ph & high).astype(bool).astype(np.int64) - (mh & high).astype(bool), 0)
+        
+        # 尚未结束的候选距离都确定超出上限时提前退出，已结束的候选距离不变
+        if not np.any(active & (score - (lengths - j - 1) <= limits)):
+            return np.where(active, np.maximum(score, limits + 1), score)
+        
+        ph = ((ph << one) | one) & full
+        mh = (mh << one) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    
+    return score
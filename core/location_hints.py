@@ -0,0 +1,175 @@
+"""
+模板位置提示
+记录模板每次出现的位置，下次查找时优先搜索上次位置和历史热点区域
+"""
+import os
+import json
+import threading
+from typing import Dict, Any, List, Tuple
+from loguru import logger
+
+
+class LocationHints:
+    """模板位置提示（最近位置 + 粗粒度热力图）"""
+    
+    def __init__(self, cell_size: int = 64, max_hot_cells: int = 2):
+        """
+        初始化位置提示
+        
+        Args:
+            cell_size: 热力图网格大小（像素）
+            max_hot_cells: 除最近位置外额外尝试的热点格子数量
+        """
+        self.cell_size = cell_size
+        self.max_hot_cells = max_hot_cells
+        self._last: Dict[str, Tuple[int, int, int, int]] = {}
+        self._heatmap: Dict[str, Dict[Tuple[int, int], int]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        
+        self.hits = 0
+        self.misses = 0
+    
+    def record(self, key: str, location: Tuple[int, int], size: Tuple[int, int]):
+        """
+        记录模板出现的位置
+        
+        Args:
+            key: 模板键
+            location: 左上角屏幕坐标 (x, y)
+            size: 模板尺寸 (width, height)
+        """
+        x, y = location
+        width, height = size
+        cell = ((x + width // 2) // self.cell_size, (y + height // 2) // self.cell_size)
+        
+        with self._lock:
+            self._last[key] = (x, y, width, height)
+            cells = self._heatmap.setdefault(key, {})
+            cells[cell] = cells.get(cell, 0) + 1
+            self._dirty = True
+    
+    def get_regions(self, key: str, size: Tuple[int, int], padding: int) -> List[Tuple[int, int, int, int]]:
+        """
+        获取优先搜索的屏幕区域
+        
+        Args:
+            key: 模板键
+            size: 模板尺寸 (width, height)
+            padding: 区域四周的扩展像素
+        
+        Returns:
+            区域列表 [(x, y, width, height)]，最近位置在前，其余按出现次数排序
+        """
+        width, height = size
+        regions = []
+        
+        with self._lock:
+            last = self._last.get(key)
+            cells = self._heatmap.get(key, {})
+            hot_cells = sorted(cells.items(), key=lambda item: item[1], reverse=True)
+        
+        if last is not None:
+            regions.append((last[0] - padding, last[1] - padding, width + 2 * padding, height + 2 * padding))
+        
+        hot_count = 0
+        for (cell_x, cell_y), _ in hot_cells:
+            if hot_count >= self.max_hot_cells:
+                break
+            center_x = cell_x * self.cell_size + self.cell_size // 2
+            center_y = cell_y * self.cell_size + self.cell_size // 2
+            # 最近位置已经覆盖的格子不再重复搜索
+            if last is not None and abs(center_x - (last[0] + width // 2)) <= padding \
+                    and abs(center_y - (last[1] + height // 2)) <= padding:
+                continue
+            regions.append((center_x - width // 2 - padding, center_y - height // 2 - padding,
+                            width + 2 * padding, height + 2 * padding))
+            hot_count += 1
+        
+        return regions
+    
+    def forget(self, key: str):
+        """清除模板的最近位置（热力图保留）"""
+        with self._lock:
+            self._last.pop(key, None)
+    
+    def clear(self):
+        """清空所有位置提示"""
+        with self._lock:
+            self._last.clear()
+            self._heatmap.clear()
+            self._dirty = True
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取位置提示统计信息"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'templates': len(self._heatmap),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+    
+    def load(self, path: str):
+        """
+        从文件加载热力图
+        
+        Args:
+            path: 文件路径
+        """
+        if not path or not os.path.exists(path):
+            return
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            
+            if data.get('cell_size') != self.cell_size:
+                logger.warning(f"位置提示文件的网格大小不一致，已忽略: {path}")
+                return
+            
+            with self._lock:
+                for key, cells in data.get('heatmap', {}).items():
+                    self._heatmap[key] = {tuple(map(int, cell.split(','))): count for cell, count in cells.items()}
+                for key, last in data.get('last', {}).items():
+                    self._last[key] = tuple(last)
+                self._dirty = False
+            
+            logger.info(f"位置提示加载成功: {path}")
+        
+        except Exception as e:
+            logger.error(f"加载位置提示失败: {path} - {e}")
+    
+    def save(self, path: str):
+        """
+        保存热力图到文件（无变化时跳过）
+        
+        Args:
+            path: 文件路径
+        """
+        if not path:
+            return
+        
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                'cell_size': self.cell_size,
+                'heatmap': {
+                    key: {f"{x},{y}": count for (x, y), count in cells.items()}
+                    for key, cells in self._heatmap.items()
+                },
+                'last': {key: list(last) for key, last in self._last.items()}
+            }
+            self._dirty = False
+        
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            logger.debug(f"位置提示已保存: {path}")
+        except Exception as e:
+            logger.error(f"保存位置提示失败: {path} - {e}")
@@ -0,0 +1,79 @@
+"""
+匹配缓冲池
+按 (截图尺寸, 模板尺寸, 匹配方法) 复用得分图等中间结果，避免轮询时反复分配大块内存
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+import numpy as np
+
+
+class MatchBufferPool:
+    """线程私有的匹配缓冲池（每个线程各自复用，互不覆盖）"""
+    
+    def __init__(self, max_entries: int = 32):
+        """
+        初始化缓冲池
+        
+        Args:
+            max_entries: 每个线程保留的缓冲区数量上限，超出时淘汰最久未使用的
+        """
+        self.max_entries = max_entries
+        self._local = threading.local()
+        
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, frame_shape: Tuple[int, ...], template_shape: Tuple[int, ...], method: int,
+            role: str = 'result', dtype: Any = np.float32) -> np.ndarray:
+        """
+        获取得分图尺寸的缓冲区
+        
+        返回的数组内容未初始化，并且会在同一线程下一次取同一键时被覆盖，
+        调用方需要在下一次匹配前取出需要的数据。
+        
+        Args:
+            frame_shape: 截图尺寸
+            template_shape: 模板尺寸
+            method: 匹配方法
+            role: 缓冲区用途（'result'、'dilated'、'mask' 等）
+            dtype: 数据类型
+        
+        Returns:
+            形状为 (H - h + 1, W - w + 1) 的数组
+        """
+        buffers: "OrderedDict[Tuple, np.ndarray]" = getattr(self._local, 'buffers', None)
+        if buffers is None:
+            buffers = self._local.buffers = OrderedDict()
+        
+        key = (frame_shape[:2], template_shape[:2], method, role)
+        buffer = buffers.get(key)
+        if buffer is not None and buffer.dtype == dtype:
+            buffers.move_to_end(key)
+            self.hits += 1
+            return buffer
+        
+        shape = (frame_shape[0] - template_shape[0] + 1, frame_shape[1] - template_shape[1] + 1)
+        buffer = buffers[key] = np.empty(shape, dtype=dtype)
+        while len(buffers) > self.max_entries:
+            buffers.popitem(last=False)
+        self.misses += 1
+        return buffer
+    
+    def clear(self):
+        """释放当前线程的缓冲区"""
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is not None:
+            buffers.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        buffers = getattr(self._local, 'buffers', None) or {}
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(buffers),
+            'bytes': sum(buffer.nbytes for buffer in buffers.values()),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
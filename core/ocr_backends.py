@@ -0,0 +1,290 @@
+"""
+OCR后端
+tesserocr 在进程内常驻 Tesseract 实例，语言模型只加载一次；
+pytesseract 每次调用启动 tesseract 进程，作为未安装 tesserocr 时的后备
+"""
+import os
+import shlex
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import cv2
+import numpy as np
+from loguru import logger
+from PIL import Image
+import pytesseract
+
+# 进程内Tesseract绑定（可选）
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+
+def parse_tesseract_config(config: str) -> Tuple[Optional[int], Optional[int], Dict[str, str]]:
+    """
+    解析 tesseract 命令行参数
+    
+    Args:
+        config: 例如 '--psm 8 --oem 1 -c tessedit_char_whitelist=0123456789'
+    
+    Returns:
+        (psm, oem, 变量字典)
+    """
+    psm, oem, variables = None, None, {}
+    args = shlex.split(config or '')
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        value = args[i + 1] if i + 1 < len(args) else None
+        if arg == '--psm' and value is not None:
+            psm, i = int(value), i + 2
+        elif arg == '--oem' and value is not None:
+            oem, i = int(value), i + 2
+        elif arg == '-c' and value is not None and '=' in value:
+            key, _, var = value.partition('=')
+            variables[key] = var
+            i += 2
+        else:
+            logger.warning(f"忽略不支持的OCR参数: {arg}")
+            i += 1
+    return psm, oem, variables
+
+
+class OCRBackend(ABC):
+    """OCR后端基类"""
+    
+    name = "base"
+    
+    def __init__(self, lang: str, config: str):
+        """
+        初始化后端
+        
+        Args:
+            lang: 语言，例如 'chi_sim+eng'
+            config: tesseract 参数，例如 '--psm 8'
+        """
+        self.lang = lang
+        self.config = config
+    
+    @abstractmethod
+    def image_to_string(self, image: np.ndarray) -> str:
+        """识别图像中的文本"""
+        pass
+    
+    @abstractmethod
+    def image_to_data(self, image: np.ndarray) -> Dict[str, List[Any]]:
+        """
+        识别图像中的单词及位置
+        
+        Returns:
+            与 pytesseract.Output.DICT 相同结构的字典（text/conf/left/top/width/height 等长列表）
+        """
+        pass
+    
+    def get_languages(self) -> List[str]:
+        """获取可用的语言"""
+        return pytesseract.get_languages()
+    
+    def close(self):
+        """释放资源"""
+        pass
+
+
+class PytesseractBackend(OCRBackend):
+    """pytesseract 后端（每次调用启动 tesseract 进程）"""
+    
+    name = "tesseract"
+    
+    def __init__(self, lang: str, config: str):
+        super().__init__(lang, config)
+        
+        # 配置tesseract路径（Windows）
+        if os.name == 'nt':
+            tesseract_path = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+            if os.path.exists(tesseract_path):
+                pytesseract.pytesseract.tesseract_cmd = tesseract_path
+    
+    def _to_pil(self, image: np.ndarray) -> Image.Image:
+        if image.ndim == 2:
+            return Image.fromarray(image)
+        return Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    
+    def image_to_string(self, image: np.ndarray) -> str:
+        return pytesseract.image_to_string(self._to_pil(image), lang=self.lang, config=self.config)
+    
+    def image_to_data(self, image: np.ndarray) -> Dict[str, List[Any]]:
+        return pytesseract.image_to_data(self._to_pil(image), lang=self.lang, config=self.config,
+                                         output_type=pytesseract.Output.DICT)
+
+
+class TesserocrBackend(OCRBackend):
+    """tesserocr 后端（进程内常驻 Tesseract 实例，图像直接从内存传入）"""
+    
+    name = "tesserocr"
+    
+    def __init__(self, lang: str, config: str, tessdata_path: Optional[str] = None):
+        """
+        初始化后端
+        
+        Args:
+            lang: 语言
+            config: tesseract 参数，支持 --psm / --oem / -c key=value
+            tessdata_path: traineddata 目录，为 None 时使用 tesseract 默认目录
+        """
+        if not TESSEROCR_AVAILABLE:
+            raise RuntimeError("未安装 tesserocr")
+        super().__init__(lang, config)
+        
+        psm, oem, variables = parse_tesseract_config(config)
+        kwargs = {'lang': lang}
+        if tessdata_path:
+            kwargs['path'] = tessdata_path
+        if psm is not None:
+            kwargs['psm'] = psm
+        if oem is not None:
+            kwargs['oem'] = oem
+        
+        # Tesseract 实例不是线程安全的，同一实例的调用需要串行
+        self._lock = threading.Lock()
+        self._api = tesserocr.PyTessBaseAPI(**kwargs)
+        for key, value in variables.items():
+            if not self._api.SetVariable(key, value):
+                logger.warning(f"tesserocr 不支持的变量: {key}")
+    
+    def _set_image(self, image: np.ndarray):
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        image = np.ascontiguousarray(image)
+        height, width = image.shape
+        self._api.SetImageBytes(image.tobytes(), width, height, 1, width)
+    
+    def image_to_string(self, image: np.ndarray) -> str:
+        with self._lock:
+            self._set_image(image)
+            return self._api.GetUTF8Text()
+    
+    def image_to_data(self, image: np.ndarray) -> Dict[str, List[Any]]:
+        data = {'text': [], 'conf': [], 'left': [], 'top': [], 'width': [], 'height': []}
+        level = tesserocr.RIL.WORD
+        with self._lock:
+            self._set_image(image)
+            self._api.Recognize()
+            iterator = self._api.GetIterator()
+            if iterator is None:
+                return data
+            for word in tesserocr.iterate_level(iterator, level):
+                text = word.GetUTF8Text(level)
+                box = word.BoundingBox(level)
+                if text is None or box is None:
+                    continue
+                x1, y1, x2, y2 = box
+                data['text'].append(text)
+                data['conf'].append(word.Confidence(level))
+                data['left'].append(x1)
+                data['top'].append(y1)
+                data['width'].append(x2 - x1)
+                data['height'].append(y2 - y1)
+        return data
+    
+    def get_languages(self) -> List[str]:
+        _, languages = tesserocr.get_languages()
+        return languages
+    
+    def close(self):
+        with self._lock:
+            self._api.End()
+
+
+class OCRBackendPool:
+    """OCR后端池：每个后端同一时间只服务一个线程，按需创建，创建后常驻复用"""
+    
+    def __init__(self, factory: Callable[[], OCRBackend], size: int):
+        """
+        初始化后端池
+        
+        Args:
+            factory: 创建后端的函数
+            size: 后端数量上限，即可并行识别的数量
+        """
+        self.factory = factory
+        self.size = max(int(size), 1)
+        self._idle: List[OCRBackend] = []
+        self._created = 0
+        self._generation = 0
+        self._condition = threading.Condition()
+    
+    @contextmanager
+    def borrow(self) -> Iterator[OCRBackend]:
+        """借出一个空闲后端，没有空闲且已达上限时等待归还"""
+        with self._condition:
+            while not self._idle and self._created >= self.size:
+                self._condition.wait()
+            generation = self._generation
+            backend = self._idle.pop() if self._idle else None
+            if backend is None:
+                self._created += 1
+        
+        if backend is None:
+            try:
+                backend = self.factory()
+            except Exception:
+                with self._condition:
+                    self._created -= 1
+                    self._condition.notify()
+                raise
+        
+        try:
+            yield backend
+        finally:
+            stale = False
+            with self._condition:
+                if generation == self._generation:
+                    self._idle.append(backend)
+                else:
+                    # 借出期间池已重置（语言或参数变化），归还时直接释放
+                    self._created -= 1
+                    stale = True
+                self._condition.notify()
+            if stale:
+                backend.close()
+    
+    def reset(self):
+        """释放所有后端，之后按新的配置重新创建"""
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._generation += 1
+            self._condition.notify_all()
+        for backend in idle:
+            backend.close()
+    
+    def close(self):
+        """释放所有后端"""
+        self.reset()
+
+
+def create_ocr_backend(name: str, lang: str, config: str, tessdata_path: Optional[str] = None) -> OCRBackend:
+    """
+    创建OCR后端
+    
+    Args:
+        name: 'auto'（可用时使用 tesserocr）、'tesserocr'、'tesseract'/'pytesseract'
+        lang: 语言
+        config: tesseract 参数
+        tessdata_path: tesserocr 的 traineddata 目录
+    
+    Returns:
+        OCR后端，tesserocr 不可用时退回 pytesseract
+    """
+    if name in ('auto', 'tesserocr'):
+        try:
+            return TesserocrBackend(lang, config, tessdata_path)
+        except Exception as e:
+            level = 'WARNING' if name == 'tesserocr' else 'DEBUG'
+            logger.log(level, f"tesserocr 不可用，使用 pytesseract: {e}")
+    elif name not in ('tesseract', 'pytesseract'):
+        logger.warning(f"未知的OCR引擎: {name}，使用 pytesseract")
+    return PytesseractBackend(lang, config)
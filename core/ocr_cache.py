@@ -0,0 +1,85 @@
+"""
+OCR结果缓存
+以预处理后的区域像素哈希加语言/参数为键，画面不变的标签、计数器等不再重复识别
+"""
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+
+
+class OCRResultCache:
+    """带过期时间和容量上限的OCR结果缓存（LRU淘汰）"""
+    
+    def __init__(self, max_entries: int = 512, ttl: float = 30.0):
+        """
+        初始化缓存
+        
+        Args:
+            max_entries: 最多缓存的结果数量，超出时淘汰最久未使用的
+            ttl: 结果的有效期（秒），0 表示不过期
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def make_key(self, image: np.ndarray, *parts: Any) -> Tuple:
+        """
+        生成缓存键
+        
+        Args:
+            image: 预处理后的图像
+            *parts: 其他影响识别结果的参数，例如语言、tesseract 参数、输出类型
+        
+        Returns:
+            缓存键
+        """
+        digest = hashlib.blake2b(np.ascontiguousarray(image).data, digest_size=16).digest()
+        return (digest, image.shape) + parts
+    
+    def get(self, key: Tuple) -> Optional[Any]:
+        """获取缓存的结果，不存在或已过期返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and time.time() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def put(self, key: Tuple, value: Any):
+        """保存结果"""
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息，hit_rate 即免去识别的调用比例"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -3,18 +3,25 @@ OCR引擎
 提供文字识别功能
 """
 import os
+import threading
 import cv2
 import numpy as np
-from typing import Optional, Tuple, List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple, List, Dict, Any, Union
 from loguru import logger
-from PIL import Image
-import pytesseract
-import pyautogui
+from .frame_source import crop_region
+from .ocr_backends import OCRBackend, OCRBackendPool, create_ocr_backend
+from .ocr_cache import OCRResultCache
+from .ocr_snapshot import OCRSnapshot
+from . import fuzzy_match
 
 
 class OCREngine:
     """OCR文字识别引擎"""
     
+    # 最多保存的单词快照数量（每个来源和区域一个）
+    MAX_SNAPSHOTS = 32
+    
     def __init__(self, engine):
         """
         初始化OCR引擎
@@ -26,64 +33,73 @@ class OCREngine:
         self.tesseract_config = self.engine.get_config('ocr.config', '--psm 8')
         self.tesseract_lang = self.engine.get_config('ocr.lang', 'chi_sim+eng')
         
-        # 配置tesseract路径（Windows）
-        if os.name == 'nt':
-            tesseract_path = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-            if os.path.exists(tesseract_path):
-                pytesseract.pytesseract.tesseract_cmd = tesseract_path
+        # 常驻的识别后端池，语言模型只加载一次，多区域识别时并行使用
+        self.max_workers = self.engine.get_config('ocr.max_workers', self.engine.get_config('engine.max_workers', 4))
+        self.backends = OCRBackendPool(self._create_backend, self.max_workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        
+        # 识别结果缓存，画面未变化的区域直接返回上次结果
+        self.cache_enabled = self.engine.get_config('ocr.cache_enabled', True)
+        self.cache = OCRResultCache(max_entries=self.engine.get_config('ocr.cache_size', 512),
+                                    ttl=self.engine.get_config('ocr.cache_ttl', 30.0))
         
-        logger.info("OCR引擎初始化完成")
+        # (画面来源, 区域) -> 最近一帧的单词快照，帧版本变化后重建
+        self._snapshots: Dict[Tuple[Any, Any], OCRSnapshot] = {}
+        self._snapshot_lock = threading.Lock()
+        
+        with self.backends.borrow() as backend:
+            logger.info(f"OCR引擎初始化完成 (后端: {backend.name})")
+    
+    def _create_backend(self) -> OCRBackend:
+        """按 ocr.engine 配置创建识别后端"""
+        return create_ocr_backend(self.engine.get_config('ocr.engine', 'auto'), self.tesseract_lang,
+                                  self.tesseract_config, self.engine.get_config('ocr.tessdata_path', None))
+    
+    def _reload_backend(self):
+        """语言或参数变化后重建后端"""
+        self.backends.reset()
+        self.cache.clear()
+        with self._snapshot_lock:
+            self._snapshots.clear()
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """获取（按需创建）多区域识别使用的线程池"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='ocr')
+            return self._executor
+    
+    def close(self):
+        """关闭线程池并释放识别后端"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+        self.backends.close()
     
     def recognize_text(self, image_path: Optional[str] = None, 
-                      region: Optional[Tuple[int, int, int, int]] = None) -> str:
+                      region: Optional[Tuple[int, int, int, int]] = None,
+                      frame_source: Any = None, image: Optional[np.ndarray] = None) -> str:
         """
         识别文本
         
         Args:
             image_path: 图片路径，如果为None则截图
             region: 识别区域 (x, y, width, height)
+            frame_source: 画面来源名称或实例，为 None 时使用任务绑定的来源或默认来源
+            image: 给定的整帧图像，给定时不截图
             
         Returns:
             识别的文本
         """
         try:
             # 获取图像
-            if image_path:
-                image = cv2.imread(image_path)
-                if image is None:
-                    logger.error(f"无法加载图像: {image_path}")
-                    return ""
-            else:
-                # 截图
-                if region:
-                    screenshot = pyautogui.screenshot(region=region)
-                else:
-                    screenshot = pyautogui.screenshot()
-                
-                # 转换为OpenCV格式
-                image = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
-            
-            # 如果有区域参数且是从文件读取的图像，则裁剪
-            if region and image_path:
-                x, y, w, h = region
-                image = image[y:y+h, x:x+w]
-            
-            # 预处理图像
-            processed_image = self._preprocess_image(image)
-            
-            # 转换为PIL图像
-            pil_image = Image.fromarray(cv2.cvtColor(processed_image, cv2.COLOR_BGR2RGB))
-            
-            # 执行OCR
-            text = pytesseract.image_to_string(
-                pil_image, 
-                lang=self.tesseract_lang,
-                config=self.tesseract_config
-            )
-            
-            # 清理结果
-            text = self._clean_text(text)
+            image = self._get_image(image_path, region, frame_source, image)
+            if image is None:
+                return ""
             
+            text = self._recognize(image)
             logger.debug(f"OCR识别结果: {text}")
             return text
             
@@ -92,80 +108,30 @@ class OCREngine:
             return ""
     
     def recognize_text_with_confidence(self, image_path: Optional[str] = None,
-                                     region: Optional[Tuple[int, int, int, int]] = None) -> List[Dict[str, Any]]:
+                                     region: Optional[Tuple[int, int, int, int]] = None,
+                                     frame_source: Any = None,
+                                     image: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
         """
         识别文本并返回置信度信息
         
         Args:
             image_path: 图片路径，如果为None则截图
             region: 识别区域 (x, y, width, height)
+            frame_source: 画面来源名称或实例
+            image: 给定的整帧图像，给定时不截图
             
         Returns:
             识别结果列表，每个元素包含文本、置信度、位置信息
         """
         try:
             # 获取图像
-            if image_path:
-                image = cv2.imread(image_path)
-                if image is None:
-                    logger.error(f"无法加载图像: {image_path}")
-                    return []
-            else:
-                # 截图
-                if region:
-                    screenshot = pyautogui.screenshot(region=region)
-                else:
-                    screenshot = pyautogui.screenshot()
-                
-                # 转换为OpenCV格式
-                image = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
-            
-            # 如果有区域参数且是从文件读取的图像，则裁剪
-            if region and image_path:
-                x, y, w, h = region
-                image = image[y:y+h, x:x+w]
-            
-            # 预处理图像
-            processed_image = self._preprocess_image(image)
-            
-            # 转换为PIL图像
-            pil_image = Image.fromarray(cv2.cvtColor(processed_image, cv2.COLOR_BGR2RGB))
+            image = self._get_image(image_path, region, frame_source, image)
+            if image is None:
+                return []
             
-            # 执行OCR并获取详细信息
-            data = pytesseract.image_to_data(
-                pil_image,
-                lang=self.tesseract_lang,
-                config=self.tesseract_config,
-                output_type=pytesseract.Output.DICT
-            )
-            
-            # 处理结果
-            results = []
-            for i in range(len(data['text'])):
-                text = data['text'][i].strip()
-                confidence = int(data['conf'][i])
-                
-                # 过滤空文本和低置信度结果
-                if text and confidence > 0:
-                    result = {
-                        'text': text,
-                        'confidence': confidence,
-                        'left': data['left'][i],
-                        'top': data['top'][i],
-                        'width': data['width'][i],
-                        'height': data['height'][i],
-                        'center_x': data['left'][i] + data['width'][i] // 2,
-                        'center_y': data['top'][i] + data['height'][i] // 2
-                    }
-                    
-                    # 如果有区域偏移，调整坐标
-                    if region and not image_path:
-                        result['left'] += region[0]
-                        result['top'] += region[1]
-                        result['center_x'] += region[0]
-                        result['center_y'] += region[1]
-                    
-                    results.append(result)
+            # 如果有区域偏移，坐标换算回整帧
+            offset = (region[0], region[1]) if region and not image_path else (0, 0)
+            results = self._recognize_words(image, offset)
             
             logger.debug(f"OCR识别到 {len(results)} 个文本块")
             return results
@@ -174,10 +140,134 @@ class OCREngine:
             logger.error(f"OCR识别失败: {e}")
             return []
     
+    def recognize_regions(self, regions: Union[Dict[str, Tuple[int, int, int, int]], List[Tuple[int, int, int, int]]],
+                          image_path: Optional[str] = None, frame_source: Any = None,
+                          image: Optional[np.ndarray] = None,
+                          with_confidence: bool = False) -> Dict[Any, Any]:
+        """
+        并行识别多个区域
+        
+        只取一帧（或读取一次图片），各区域以视图裁剪后分发给常驻的识别后端并行识别，
+        并行数量由 ocr.max_workers 配置（默认与 engine.max_workers 相同）。
+        
+        Args:
+            regions: {键名: 区域} 字典，或区域 (x, y, width, height) 列表（以区域元组为键）
+            image_path: 图片路径，为 None 时从画面来源取帧
+            frame_source: 画面来源名称或实例
+            image: 给定的整帧图像，给定时不截图
+            with_confidence: 返回带置信度和位置的结果列表（同 recognize_text_with_confidence），否则返回文本
+            
+        Returns:
+            {键名: 识别结果}，识别失败的区域为空文本或空列表
+        """
+        if not isinstance(regions, dict):
+            regions = {tuple(region): region for region in regions}
+        empty = [] if with_confidence else ""
+        results: Dict[Any, Any] = {key: empty for key in regions}
+        
+        try:
+            frame = self._get_image(image_path, None, frame_source, image)
+            if frame is None:
+                return results
+            
+            def run(region: Tuple[int, int, int, int]) -> Any:
+                view = crop_region(frame, region)
+                if with_confidence:
+                    return self._recognize_words(view, (max(region[0], 0), max(region[1], 0)))
+                return self._recognize(view)
+            
+            executor = self._get_executor()
+            futures = {key: executor.submit(run, region) for key, region in regions.items()}
+            for key, future in futures.items():
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    logger.error(f"OCR识别失败: {key} - {e}")
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"多区域OCR识别失败: {e}")
+            return results
+    
+    def _recognize(self, image: np.ndarray) -> str:
+        """预处理并识别图像中的文本"""
+        processed_image = self._preprocess_image(image)
+        return self._clean_text(self._run_backend(processed_image, 'string'))
+    
+    def _recognize_words(self, image: np.ndarray, offset: Tuple[int, int] = (0, 0)) -> List[Dict[str, Any]]:
+        """
+        预处理并识别图像中的单词
+        
+        Args:
+            image: 待识别图像
+            offset: 图像左上角在整帧中的坐标，结果坐标会加上该偏移
+            
+        Returns:
+            识别结果列表，每个元素包含文本、置信度、位置信息
+        """
+        processed_image = self._preprocess_image(image)
+        data = self._run_backend(processed_image, 'data')
+        
+        results = []
+        for i in range(len(data['text'])):
+            text = data['text'][i].strip()
+            confidence = int(float(data['conf'][i]))
+            
+            # 过滤空文本和低置信度结果
+            if text and confidence > 0:
+                left = data['left'][i] + offset[0]
+                top = data['top'][i] + offset[1]
+                results.append({
+                    'text': text,
+                    'confidence': confidence,
+                    'left': left,
+                    'top': top,
+                    'width': data['width'][i],
+                    'height': data['height'][i],
+                    'center_x': left + data['width'][i] // 2,
+                    'center_y': top + data['height'][i] // 2
+                })
+        return results
+    
+    def _run_backend(self, processed_image: np.ndarray, output: str) -> Any:
+        """
+        用后端识别预处理后的图像，结果按像素哈希缓存
+        
+        Args:
+            processed_image: 预处理后的图像
+            output: 'string'（文本）或 'data'（单词及位置）
+        
+        Returns:
+            后端的原始识别结果
+        """
+        key = None
+        if self.cache_enabled:
+            key = self.cache.make_key(processed_image, self.tesseract_lang, self.tesseract_config, output)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        with self.backends.borrow() as backend:
+            if output == 'string':
+                result = backend.image_to_string(processed_image)
+            else:
+                result = backend.image_to_data(processed_image)
+        
+        if key is not None:
+            self.cache.put(key, result)
+        return result
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取OCR结果缓存的统计信息（hit_rate 为免去识别的调用比例）"""
+        return self.cache.get_stats()
+    
     def find_text(self, target_text: str, 
                   image_path: Optional[str] = None,
                   region: Optional[Tuple[int, int, int, int]] = None,
-                  similarity_threshold: float = 0.8) -> Optional[Dict[str, Any]]:
+                  similarity_threshold: float = 0.8,
+                  frame_source: Any = None,
+                  image: Optional[np.ndarray] = None) -> Optional[Dict[str, Any]]:
         """
         在图像中查找指定文本
         
@@ -186,26 +276,19 @@ class OCREngine:
             image_path: 图片路径，如果为None则截图
             region: 搜索区域 (x, y, width, height)
             similarity_threshold: 相似度阈值
+            frame_source: 画面来源名称或实例
+            image: 给定的整帧图像，给定时不截图
             
         Returns:
             找到的文本信息
         """
         try:
-            results = self.recognize_text_with_confidence(image_path, region)
-            
-            # 查找最匹配的文本
-            best_match = None
-            best_similarity = 0
-            
-            for result in results:
-                similarity = self._calculate_text_similarity(target_text, result['text'])
-                if similarity >= similarity_threshold and similarity > best_similarity:
-                    best_similarity = similarity
-                    best_match = result
-                    best_match['similarity'] = similarity
+            # 同一帧上的多次查找共用一次识别
+            snapshot = self.snapshot(image_path, region, frame_source, image)
+            best_match = snapshot.find(target_text, similarity_threshold) if snapshot is not None else None
             
             if best_match:
-                logger.info(f"找到文本: {best_match['text']} (相似度: {best_similarity:.2f})")
+                logger.info(f"找到文本: {best_match['text']} (相似度: {best_match['similarity']:.2f})")
             else:
                 logger.warning(f"未找到文本: {target_text}")
             
@@ -215,10 +298,91 @@ class OCREngine:
             logger.error(f"查找文本失败: {e}")
             return None
     
+    def find_texts(self, targets: List[str],
+                   image_path: Optional[str] = None,
+                   region: Optional[Tuple[int, int, int, int]] = None,
+                   similarity_threshold: float = 0.8,
+                   frame_source: Any = None,
+                   image: Optional[np.ndarray] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        在同一帧中查找多个文本（只识别一次）
+        
+        Args:
+            targets: 要查找的文本列表
+            image_path: 图片路径，如果为None则截图
+            region: 搜索区域 (x, y, width, height)
+            similarity_threshold: 相似度阈值
+            frame_source: 画面来源名称或实例
+            image: 给定的整帧图像，给定时不截图
+        
+        Returns:
+            {文本: 找到的文本信息或 None}
+        """
+        try:
+            snapshot = self.snapshot(image_path, region, frame_source, image)
+            if snapshot is None:
+                return {target: None for target in targets}
+            return snapshot.find_all(targets, similarity_threshold)
+        
+        except Exception as e:
+            logger.error(f"查找文本失败: {e}")
+            return {target: None for target in targets}
+    
+    def snapshot(self, image_path: Optional[str] = None,
+                 region: Optional[Tuple[int, int, int, int]] = None,
+                 frame_source: Any = None,
+                 image: Optional[np.ndarray] = None,
+                 min_version: Optional[int] = None) -> Optional[OCRSnapshot]:
+        """
+        获取一帧的OCR单词快照
+        
+        从画面来源取帧时按 (来源, 区域) 保存最近的快照：帧存储返回的仍是同一版本的帧时直接复用，
+        截取了新帧（超过复用时间或点击之后）即重新识别。
+        
+        Args:
+            image_path: 图片路径，为 None 时从画面来源取帧
+            region: 识别区域 (x, y, width, height)
+            frame_source: 画面来源名称或实例
+            image: 给定的整帧图像，给定时不截图
+            min_version: 要求帧的版本号不小于该值
+        
+        Returns:
+            单词快照，获取画面失败返回 None
+        """
+        if image is not None or image_path:
+            cropped = self._get_image(image_path, region, frame_source, image)
+            if cropped is None:
+                return None
+            offset = (region[0], region[1]) if region and not image_path else (0, 0)
+            return OCRSnapshot(self._recognize_words(cropped, offset), region=region)
+        
+        source = self.engine.get_frame_source(frame_source)
+        frame = self.engine.frame_store.get(source, region, min_version=min_version)
+        if frame is None:
+            return None
+        
+        key = (source, tuple(region) if region else None)
+        with self._snapshot_lock:
+            cached = self._snapshots.get(key)
+        if cached is not None and cached.version == frame.version:
+            return cached
+        
+        offset = (region[0], region[1]) if region else (0, 0)
+        snapshot = OCRSnapshot(self._recognize_words(frame.image, offset), frame.version, frame.timestamp, region)
+        with self._snapshot_lock:
+            current = self._snapshots.get(key)
+            if current is None or current.version <= snapshot.version:
+                self._snapshots.pop(key, None)
+                self._snapshots[key] = snapshot
+                while len(self._snapshots) > self.MAX_SNAPSHOTS:
+                    self._snapshots.pop(next(iter(self._snapshots)))
+        return snapshot
+    
     def wait_for_text(self, target_text: str, 
                       timeout: float = 10.0,
                       region: Optional[Tuple[int, int, int, int]] = None,
-                      similarity_threshold: float = 0.8) -> Optional[Dict[str, Any]]:
+                      similarity_threshold: float = 0.8,
+                      frame_source: Any = None) -> Optional[Dict[str, Any]]:
         """
         等待指定文本出现
         
@@ -227,6 +391,7 @@ class OCREngine:
             timeout: 超时时间（秒）
             region: 搜索区域 (x, y, width, height)
             similarity_threshold: 相似度阈值
+            frame_source: 画面来源名称或实例
             
         Returns:
             找到的文本信息
@@ -235,7 +400,7 @@ class OCREngine:
         start_time = time.time()
         
         while time.time() - start_time < timeout:
-            result = self.find_text(target_text, None, region, similarity_threshold)
+            result = self.find_text(target_text, None, region, similarity_threshold, frame_source)
             if result:
                 return result
             time.sleep(0.5)
@@ -247,7 +412,8 @@ class OCREngine:
                    image_path: Optional[str] = None,
                    region: Optional[Tuple[int, int, int, int]] = None,
                    similarity_threshold: float = 0.8,
-                   offset: Tuple[int, int] = (0, 0)) -> bool:
+                   offset: Tuple[int, int] = (0, 0),
+                   frame_source: Any = None) -> bool:
         """
         点击指定文本
         
@@ -257,12 +423,13 @@ class OCREngine:
             region: 搜索区域 (x, y, width, height)
             similarity_threshold: 相似度阈值
             offset: 点击偏移 (x, y)
+            frame_source: 画面来源名称或实例，点击也在该来源上执行
             
         Returns:
             是否成功点击
         """
         try:
-            result = self.find_text(target_text, image_path, region, similarity_threshold)
+            result = self.find_text(target_text, image_path, region, similarity_threshold, frame_source)
             if not result:
                 return False
             
@@ -271,7 +438,9 @@ class OCREngine:
             click_y = result['center_y'] + offset[1]
             
             # 执行点击
-            pyautogui.click(click_x, click_y)
+            source = self.engine.get_frame_source(frame_source)
+            source.click(click_x, click_y)
+            self.engine.frame_store.mark_input(source)
             
             logger.info(f"点击文本成功: {target_text} at ({click_x}, {click_y})")
             return True
@@ -280,6 +449,35 @@ class OCREngine:
             logger.error(f"点击文本失败: {target_text} - {e}")
             return False
     
+    def _get_image(self, image_path: Optional[str], region: Optional[Tuple[int, int, int, int]],
+                   frame_source: Any = None, image: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """
+        获取待识别的图像
+        
+        Args:
+            image_path: 图片路径，为 None 时从画面来源取帧
+            region: 区域 (x, y, width, height)
+            frame_source: 画面来源名称或实例
+            image: 给定的整帧图像，给定时直接裁剪该图像
+            
+        Returns:
+            BGR 图像，失败返回 None
+        """
+        if image is not None:
+            return crop_region(image, region)
+        
+        if image_path:
+            image = cv2.imread(image_path)
+            if image is None:
+                logger.error(f"无法加载图像: {image_path}")
+                return None
+            return crop_region(image, region)
+        
+        # 与模板匹配共用帧存储，短时间内的多次识别不会重复截图
+        source = self.engine.get_frame_source(frame_source)
+        frame = self.engine.frame_store.get(source, region)
+        return frame.image if frame is not None else None
+    
     def _preprocess_image(self, image: np.ndarray) -> np.ndarray:
         """
         预处理图像以提高OCR准确度
@@ -341,53 +539,13 @@ class OCREngine:
         Returns:
             相似度 (0-1)
         """
-        # 简单的字符串相似度计算
-        text1 = text1.lower().strip()
-        text2 = text2.lower().strip()
-        
-        if not text1 or not text2:
-            return 0.0
-        
-        # 计算编辑距离
-        distance = self._levenshtein_distance(text1, text2)
-        max_len = max(len(text1), len(text2))
-        
-        similarity = 1 - distance / max_len
-        return max(0.0, similarity)
-    
-    def _levenshtein_distance(self, s1: str, s2: str) -> int:
-        """
-        计算两个字符串的编辑距离
-        
-        Args:
-            s1: 字符串1
-            s2: 字符串2
-            
-        Returns:
-            编辑距离
-        """
-        if len(s1) < len(s2):
-            return self._levenshtein_distance(s2, s1)
-        
-        if len(s2) == 0:
-            return len(s1)
-        
-        previous_row = list(range(len(s2) + 1))
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
-        
-        return previous_row[-1]
+        return fuzzy_match.similarity(text1, text2)
     
     def get_available_languages(self) -> List[str]:
         """获取可用的OCR语言"""
         try:
-            langs = pytesseract.get_languages()
+            with self.backends.borrow() as backend:
+                langs = backend.get_languages()
             return sorted(langs)
         except Exception as e:
             logger.error(f"获取OCR语言失败: {e}")
@@ -397,12 +555,14 @@ class OCREngine:
         """设置OCR语言"""
         self.tesseract_lang = language
         self.engine.set_config('ocr.lang', language)
+        self._reload_backend()
         logger.info(f"OCR语言已设置为: {language}")
     
     def set_config(self, config: str):
         """设置OCR配置"""
         self.tesseract_config = config
         self.engine.set_config('ocr.config', config)
+        self._reload_backend()
         logger.info(f"OCR配置已设置为: {config}")
     
     def save_debug_image(self, image: np.ndarray, filename: str):
@@ -0,0 +1,137 @@
+"""
+OCR快照
+保存一帧识别出的单词及位置，并建立归一化文本和 n-gram 索引，
+同一画面上的多次查找（"开始"、"继续"、"领取"……）只识别一次
+"""
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from . import fuzzy_match
+
+
+class OCRSnapshot:
+    """一帧的OCR单词快照"""
+    
+    def __init__(self, words: List[Dict[str, Any]], version: Optional[int] = None,
+                 timestamp: float = 0.0, region: Optional[Tuple[int, int, int, int]] = None, ngram: int = 2):
+        """
+        初始化快照
+        
+        Args:
+            words: 识别结果列表（同 recognize_text_with_confidence）
+            version: 所识别帧的版本号，给定图像时为 None
+            timestamp: 帧的截取时间
+            region: 识别区域
+            ngram: 索引的 n-gram 长度
+        """
+        self.words = words
+        self.version = version
+        self.timestamp = timestamp
+        self.region = region
+        self.ngram = ngram
+        
+        self.texts = [fuzzy_match.normalize_text(word['text']) for word in words]
+        self.lengths = np.array([len(text) for text in self.texts], dtype=np.int64)
+        
+        # 归一化文本 -> 第一个单词的下标
+        self._exact: Dict[str, int] = {}
+        # n-gram -> [(单词下标, 出现次数)]
+        self._grams: Dict[str, List[Tuple[int, int]]] = {}
+        for index, text in enumerate(self.texts):
+            self._exact.setdefault(text, index)
+            for gram, count in self._count_grams(text).items():
+                self._grams.setdefault(gram, []).append((index, count))
+        
+        self._queries: Dict[Tuple[str, float], Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self.words)
+    
+    def find(self, target_text: str, similarity_threshold: float = 0.8) -> Optional[Dict[str, Any]]:
+        """
+        查找最匹配的单词
+        
+        Args:
+            target_text: 要查找的文本
+            similarity_threshold: 相似度阈值
+        
+        Returns:
+            单词信息（副本，含 similarity），未找到返回 None；相似度相同时取靠前的单词
+        """
+        key = (fuzzy_match.normalize_text(target_text), similarity_threshold)
+        with self._lock:
+            cached = self._queries.get(key)
+        if cached is None:
+            cached = self._match(key[0], similarity_threshold)
+            with self._lock:
+                self._queries[key] = cached
+        
+        index, similarity = cached
+        if index < 0:
+            return None
+        return dict(self.words[index], similarity=similarity)
+    
+    def find_all(self, targets: Sequence[str], similarity_threshold: float = 0.8) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        一次查找多个文本
+        
+        Args:
+            targets: 要查找的文本列表
+            similarity_threshold: 相似度阈值
+        
+        Returns:
+            {文本: 单词信息或 None}
+        """
+        return {target: self.find(target, similarity_threshold) for target in targets}
+    
+    def candidates(self, target: str, similarity_threshold: float) -> np.ndarray:
+        """
+        用 n-gram 过滤可能达到阈值的单词
+        
+        编辑距离为 k 的两个字符串至少有 max(长度) - n + 1 - k * n 个相同的 n-gram，
+        共有数量不足的单词不可能达到阈值；下界不大于 0 的单词全部保留。
+        
+        Args:
+            target: 归一化后的目标文本
+            similarity_threshold: 相似度阈值
+        
+        Returns:
+            候选单词的下标（升序）
+        """
+        shared = np.zeros(len(self.words), dtype=np.int64)
+        for gram, count in self._count_grams(target).items():
+            for index, word_count in self._grams.get(gram, ()):
+                shared[index] += min(count, word_count)
+        
+        longest = np.maximum(self.lengths, len(target))
+        limits = np.floor((1.0 - similarity_threshold) * longest + 1e-9).astype(np.int64).clip(min=0)
+        bound = longest - self.ngram + 1 - limits * self.ngram
+        keep = (self.lengths > 0) & (np.abs(self.lengths - len(target)) <= limits) & (shared >= bound)
+        return np.flatnonzero(keep)
+    
+    def _match(self, target: str, similarity_threshold: float) -> Tuple[int, float]:
+        """查找最匹配的单词下标和相似度"""
+        if not target:
+            return -1, 0.0
+        
+        index = self._exact.get(target)
+        if index is not None:
+            return index, 1.0
+        
+        keep = self.candidates(target, similarity_threshold)
+        if keep.size == 0:
+            return -1, 0.0
+        best, similarity = fuzzy_match.best_match(target, [self.texts[i] for i in keep], similarity_threshold)
+        if best < 0:
+            return -1, 0.0
+        return int(keep[best]), similarity
+    
+    def _count_grams(self, text: str) -> Counter:
+        """文本的 n-gram 计数（短于 n 的文本整体作为一个 gram）"""
+        n = self.ngram
+        if len(text) <= n:
+            return Counter([text]) if text else Counter()
+        return Counter(text[i:i + n] for i in range(len(text) - n + 1))
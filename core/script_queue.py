@@ -37,6 +37,7 @@ class ScriptTask:
     error_message: Optional[str] = None
     progress: float = 0.0
     result: Optional[Dict[str, Any]] = None
+    frame_source: Optional[Any] = None  # 画面来源名称或实例，任务内的匹配和OCR默认使用
     
     def __post_init__(self):
         if self.created_at is None:
@@ -81,7 +82,8 @@ class ScriptQueue:
                 name=script_data.get('name', 'Untitled Script'),
                 plugin_name=script_data.get('plugin_name', ''),
                 actions=script_data.get('actions', []),
-                priority=script_data.get('priority', 0)
+                priority=script_data.get('priority', 0),
+                frame_source=script_data.get('frame_source')
             )
             
             with self._lock:
@@ -144,29 +146,33 @@ class ScriptQueue:
             if not plugin:
                 raise Exception(f"插件 {task.plugin_name} 不存在")
             
-            # 执行动作序列
+            # 执行动作序列（任务线程绑定该任务的画面来源）
             result = {}
             total_actions = len(task.actions)
             
-            for i, action in enumerate(task.actions):
-                # 检查是否需要暂停或取消
-                if task.status == ScriptStatus.CANCELLED:
-                    logger.info(f"脚本任务已取消: {task.name}")
-                    return
+            with self.engine.use_frame_source(task.frame_source):
+                for i, action in enumerate(task.actions):
+                    # 检查是否需要暂停或取消
+                    if task.status == ScriptStatus.CANCELLED:
+                        logger.info(f"脚本任务已取消: {task.name}")
+                        return
+                        
+                    if self._paused:
+                        task.status = ScriptStatus.PAUSED
+                        logger.info(f"脚本任务已暂停: {task.name}")
+                        return
                     
-                if self._paused:
-                    task.status = ScriptStatus.PAUSED
-                    logger.info(f"脚本任务已暂停: {task.name}")
-                    return
-                
-                # 执行动作
-                action_result = plugin.execute_action(action)
-                result[f"action_{i}"] = action_result
-                
-                # 更新进度
-                task.progress = (i + 1) / total_actions * 100
-                
-                logger.debug(f"动作执行完成: {action.get('type', 'unknown')}")
+                    # 执行动作
+                    action_result = plugin.execute_action(action)
+                    result[f"action_{i}"] = action_result
+                    
+                    # 动作可能改变了画面，之后的匹配不再复用动作前的截图
+                    self.engine.frame_store.mark_input()
+                    
+                    # 更新进度
+                    task.progress = (i + 1) / total_actions * 100
+                    
+                    logger.debug(f"动作执行完成: {action.get('type', 'unknown')}")
             
             # 任务完成
             task.status = ScriptStatus.COMPLETED
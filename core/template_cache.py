@@ -0,0 +1,197 @@
+"""
+模板缓存
+按内存预算做LRU淘汰，并在模板文件被替换时自动失效
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional
+import numpy as np
+from loguru import logger
+
+
+@dataclass
+class TemplateCacheEntry:
+    """模板缓存条目"""
+    path: str
+    image: np.ndarray
+    mtime_ns: int
+    file_size: int
+    checked_at: float
+    variants: Dict[str, np.ndarray] = field(default_factory=dict)
+    
+    @property
+    def nbytes(self) -> int:
+        """条目占用的内存字节数（含派生变体）"""
+        return self.image.nbytes + sum(variant.nbytes for variant in self.variants.values())
+
+
+class TemplateCache:
+    """按字节预算做LRU淘汰的模板缓存"""
+    
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, check_interval: float = 1.0):
+        """
+        初始化模板缓存
+        
+        Args:
+            max_bytes: 缓存占用内存上限（字节）
+            check_interval: 检查模板文件是否变更的最小间隔（秒），0 表示每次访问都检查
+        """
+        self.max_bytes = max_bytes
+        self.check_interval = check_interval
+        self._entries: "OrderedDict[str, TemplateCacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        获取缓存的模板
+        
+        Args:
+            key: 缓存键
+        
+        Returns:
+            模板图像，未命中或文件已变更时返回 None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            # 定期检查文件是否被替换
+            now = time.time()
+            if now - entry.checked_at >= self.check_interval:
+                if not self._is_fresh(entry):
+                    self._remove(key)
+                    self.invalidations += 1
+                    self.misses += 1
+                    logger.debug(f"模板文件已变更，缓存失效: {entry.path}")
+                    return None
+                entry.checked_at = now
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.image
+    
+    def put(self, key: str, path: str, image: np.ndarray):
+        """
+        写入缓存，超出内存预算时按LRU顺序淘汰
+        
+        Args:
+            key: 缓存键
+            path: 模板文件路径
+            image: 模板图像
+        """
+        try:
+            stat = os.stat(path)
+            mtime_ns, file_size = stat.st_mtime_ns, stat.st_size
+        except OSError:
+            mtime_ns, file_size = 0, 0
+        
+        entry = TemplateCacheEntry(path=path, image=image, mtime_ns=mtime_ns,
+                                   file_size=file_size, checked_at=time.time())
+        
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._total_bytes += entry.nbytes
+            self._evict()
+    
+    def get_variant(self, key: str, variant: str) -> Optional[np.ndarray]:
+        """
+        获取模板的派生变体（灰度、缩放等），变体随原模板一起失效和淘汰
+        
+        Args:
+            key: 缓存键
+            variant: 变体名称
+            
+        Returns:
+            变体图像，不存在时返回 None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.variants.get(variant) if entry else None
+    
+    def put_variant(self, key: str, variant: str, image: np.ndarray):
+        """
+        写入模板的派生变体，原模板不在缓存中时忽略
+        
+        Args:
+            key: 缓存键
+            variant: 变体名称
+            image: 变体图像
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            
+            old = entry.variants.get(variant)
+            self._total_bytes += image.nbytes - (old.nbytes if old is not None else 0)
+            entry.variants[variant] = image
+            self._evict()
+    
+    def invalidate(self, key: str):
+        """使指定缓存失效"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self.invalidations += 1
+    
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+    
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+    
+    def _evict(self):
+        """淘汰最久未使用的条目直到满足内存预算，至少保留最近使用的条目（调用方需持有锁）"""
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            old_key = next(iter(self._entries))
+            self._remove(old_key)
+            self.evictions += 1
+    
+    def _remove(self, key: str):
+        """移除条目（调用方需持有锁）"""
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry.nbytes
+    
+    def _is_fresh(self, entry: TemplateCacheEntry) -> bool:
+        """检查模板文件的修改时间和大小是否与缓存时一致"""
+        try:
+            stat = os.stat(entry.path)
+        except OSError:
+            return False
+        return stat.st_mtime_ns == entry.mtime_ns and stat.st_size == entry.file_size
@@ -3,12 +3,21 @@
 提供图像模板匹配功能
 """
 import os
+import time
+import threading
 import cv2
 import numpy as np
-from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Union, Callable
 from loguru import logger
 from dataclasses import dataclass
-import pyautogui
+from .template_cache import TemplateCache
+from .template_pack import PACK_FILENAME, TemplatePack, load_template_pack, scaled_variant_name
+from .location_hints import LocationHints
+from .fft_matcher import FFT_METHODS, match_template_fft
+from .match_buffers import MatchBufferPool
+from .template_meta import TemplateMetadata
+from .frame_source import crop_region, frame_signature, frame_changed
 
 
 @dataclass
@@ -21,6 +30,32 @@ class TemplateMatchResult:
     center: Tuple[int, int]    # (center_x, center_y)
 
 
+# 匹配颜色空间：bgr 三通道、gray 灰度、b/g/r 单通道、hue HSV色相
+COLOR_MODES = ('bgr', 'gray', 'b', 'g', 'r', 'hue')
+
+
+def convert_color(image: np.ndarray, color_mode: str) -> np.ndarray:
+    """
+    将BGR图像转换到指定的匹配颜色空间
+    
+    Args:
+        image: BGR图像
+        color_mode: 颜色空间 (见 COLOR_MODES)
+        
+    Returns:
+        转换后的图像（除 bgr 外均为单通道）
+    """
+    if color_mode == 'bgr':
+        return image
+    if color_mode == 'gray':
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    if color_mode in ('b', 'g', 'r'):
+        return cv2.extractChannel(image, 'bgr'.index(color_mode))
+    if color_mode == 'hue':
+        return cv2.extractChannel(cv2.cvtColor(image, cv2.COLOR_BGR2HSV), 0)
+    raise ValueError(f"不支持的颜色空间: {color_mode}")
+
+
 class TemplateMatcher:
     """模板匹配器"""
     
@@ -33,13 +68,40 @@ class TemplateMatcher:
         """
         self.engine = engine
         self.templates_dir = "templates"
-        self.templates_cache = {}
-        self.screenshot_cache = None
-        self.screenshot_timestamp = 0
+        self.templates_cache = TemplateCache(
+            max_bytes=int(self.engine.get_config('template_matcher.cache_max_mb', 256) * 1024 * 1024),
+            check_interval=self.engine.get_config('template_matcher.cache_check_interval', 1.0)
+        )
+        # 模板目录 -> (模板包, 打开时模板包文件的 (mtime_ns, size, inode))
+        self.template_packs: Dict[str, Tuple[Optional[TemplatePack], Optional[Tuple[int, int, int]]]] = {}
+        self.template_meta = TemplateMetadata(
+            check_interval=self.engine.get_config('template_matcher.cache_check_interval', 1.0)
+        )
+        # (模板, 整帧宽, 整帧高) -> 最佳缩放比例 / 最近一次遍历所有比例都未命中的时间
+        self.scale_cache: Dict[Tuple[str, int, int], float] = {}
+        self.scale_misses: Dict[Tuple[str, int, int], float] = {}
+        self.scale_miss_ttl = self.engine.get_config('template_matcher.scale_miss_ttl', 2.0)
+        self.location_hints = LocationHints(
+            cell_size=self.engine.get_config('template_matcher.hint_cell_size', 64)
+        )
+        self.hints_file = self.engine.get_config('template_matcher.hints_file', '')
+        self.location_hints.load(self.hints_file)
+        self._frame_variants_source: Optional[np.ndarray] = None
+        self._frame_variants: Dict[str, np.ndarray] = {}
+        self._frame_variants_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self.reuse_buffers = self.engine.get_config('template_matcher.reuse_buffers', True)
+        self.match_buffers = MatchBufferPool(
+            max_entries=self.engine.get_config('template_matcher.buffer_pool_entries', 32)
+        )
         
         # 确保模板目录存在
         os.makedirs(self.templates_dir, exist_ok=True)
         
+        # 启动时映射默认模板目录的模板包
+        self._get_template_pack(self.templates_dir)
+        
         logger.info("模板匹配器初始化完成")
     
     def find_template(self, template_name: str, **kwargs) -> Optional[TemplateMatchResult]:
@@ -54,44 +116,37 @@ class TemplateMatcher:
                 - method: 匹配方法 (default: cv2.TM_CCOEFF_NORMED)
                 - max_results: 最大结果数量 (default: 1)
                 - screenshot: 是否使用新截图 (default: False)
+                - search_mode: 搜索模式 'full' 或 'pyramid' (default: template_matcher.search_mode)
+                - pyramid_scale: 金字塔模式的缩放比例 (default: template_matcher.pyramid_scale)
+                - templates_dir: 模板目录，例如游戏自己的模板目录 (default: templates)
+                - color_mode: 匹配颜色空间 'bgr'/'gray'/'b'/'g'/'r'/'hue' (default: template_matcher.color_mode)
+                - use_hints: 单结果查找时先搜索上次出现位置和热点区域，命中即返回，不保证是全帧最佳匹配
+                             (default: template_matcher.use_hints，默认关闭)
+                - multi_scale: 多尺度匹配，按分辨率记住最佳缩放比例 (default: template_matcher.multi_scale)
+                - scales: 多尺度匹配尝试的缩放比例列表 (default: 由 template_matcher.scale_range/scale_step 生成)
+                - backend: 相关计算后端 'auto'/'spatial'/'fft' (default: template_matcher.backend)
+                - frame_source: 画面来源名称或 FrameSource 实例 (default: 任务绑定的来源或 engine.frame_source)
+                - min_version: 要求截图帧的版本号不小于该值，例如点击后的新帧 (default: None)
+                - exact: 像素精确匹配，未命中时退回相关匹配 (default: 模板元数据 templates.json 中的 exact)
+                - exact_tolerance: 精确匹配允许的每通道像素误差 (default: 元数据 tolerance 或 template_matcher.exact_tolerance)
+                  （完全一致的命中置信度为 1.0，容差内的命中使用 method 的相关得分，与 threshold 同一标度）
+                - frame: 在给定的整帧图像上查找，不截图 (default: None)
                 
         Returns:
             匹配结果
         """
         try:
-            # 获取参数
-            threshold = kwargs.get('threshold', self.engine.get_config('template_matcher.threshold', 0.8))
-            region = kwargs.get('region', None)
-            method = kwargs.get('method', cv2.TM_CCOEFF_NORMED)
-            max_results = kwargs.get('max_results', 1)
-            use_new_screenshot = kwargs.get('screenshot', False)
-            
-            # 加载模板
-            template = self._load_template(template_name)
-            if template is None:
-                return None
+            options = self._resolve_options(kwargs, default_max_results=1)
             
             # 获取屏幕截图
-            screenshot = self._get_screenshot(region, use_new_screenshot)
+            screenshot = self._get_screenshot(options['region'], options['screenshot'], options['frame_source'],
+                                              options['min_version'], options['frame'])
             if screenshot is None:
                 return None
             
-            # 执行模板匹配
-            results = self._match_template(screenshot, template, method, threshold, max_results)
-            
-            if results:
-                # 返回第一个结果
-                result = results[0]
-                
-                # 如果有区域限制，需要调整坐标
-                if region:
-                    result.location = (result.location[0] + region[0], result.location[1] + region[1])
-                    result.center = (result.center[0] + region[0], result.center[1] + region[1])
-                
-                result.template_name = template_name
-                return result
-                
-            return None
+            # 执行模板匹配，返回第一个结果
+            results = self._search_in_frame(template_name, screenshot, options)
+            return results[0] if results else None
             
         except Exception as e:
             logger.error(f"模板匹配失败: {template_name} - {e}")
@@ -103,59 +158,548 @@ class TemplateMatcher:
         
         Args:
             template_name: 模板名称
-            **kwargs: 其他参数
+            **kwargs: 其他参数，同 find_template (max_results 默认为 10)
                 
         Returns:
             匹配结果列表
         """
         try:
-            # 设置最大结果数量
-            kwargs['max_results'] = kwargs.get('max_results', 10)
-            
-            # 获取参数
-            threshold = kwargs.get('threshold', self.engine.get_config('template_matcher.threshold', 0.8))
-            region = kwargs.get('region', None)
-            method = kwargs.get('method', cv2.TM_CCOEFF_NORMED)
-            max_results = kwargs.get('max_results', 10)
-            use_new_screenshot = kwargs.get('screenshot', False)
-            
-            # 加载模板
-            template = self._load_template(template_name)
-            if template is None:
-                return []
+            options = self._resolve_options(kwargs, default_max_results=10)
             
             # 获取屏幕截图
-            screenshot = self._get_screenshot(region, use_new_screenshot)
+            screenshot = self._get_screenshot(options['region'], options['screenshot'], options['frame_source'],
+                                              options['min_version'], options['frame'])
             if screenshot is None:
                 return []
             
-            # 执行模板匹配
-            results = self._match_template(screenshot, template, method, threshold, max_results)
+            return self._search_in_frame(template_name, screenshot, options)
             
-            # 调整坐标
-            if region:
-                for result in results:
-                    result.location = (result.location[0] + region[0], result.location[1] + region[1])
-                    result.center = (result.center[0] + region[0], result.center[1] + region[1])
+        except Exception as e:
+            logger.error(f"模板匹配失败: {template_name} - {e}")
+            return []
+    
+    def find_templates(self, templates: List[Union[str, Dict[str, Any]]],
+                       **kwargs) -> Dict[str, Optional[TemplateMatchResult]]:
+        """
+        批量查找多个模板
+        
+        所有模板共用同一帧截图，匹配任务分发到线程池并行执行
+        （OpenCV 匹配时会释放GIL）。
+        
+        Args:
+            templates: 模板列表，元素为模板名称，或包含 template_name 的参数字典
+                       （可单独指定 threshold/region/method 等参数，key 指定结果键名）
+            **kwargs: 所有模板共用的参数，同 find_template
+                
+        Returns:
+            {结果键名: 匹配结果}，未找到的模板对应 None
+        """
+        results: Dict[str, Optional[TemplateMatchResult]] = {}
+        
+        try:
+            base_options = self._resolve_options(kwargs, default_max_results=1)
+            
+            # 只截一次图，所有模板共用
+            frame_region = base_options['region']
+            screenshot = self._get_screenshot(frame_region, base_options['screenshot'], base_options['frame_source'],
+                                              base_options['min_version'], base_options['frame'])
+            
+            jobs = []
+            for item in templates:
+                if isinstance(item, str):
+                    item = {'template_name': item}
+                key = item.get('key', item['template_name'])
+                results[key] = None
+                options = dict(base_options, **{k: v for k, v in item.items() if k in base_options})
+                jobs.append((key, item['template_name'], options))
             
-            # 设置模板名称
-            for result in results:
-                result.template_name = template_name
+            if screenshot is None or not jobs:
+                return results
+            
+            def run(template_name: str, options: Dict[str, Any]) -> List[TemplateMatchResult]:
+                # 整帧只做一次颜色空间转换，各模板裁剪转换后的帧
+                frame = self._convert_frame(screenshot, options['color_mode'])
+                frame, options['region'] = self._crop_frame(frame, frame_region, options['region'])
+                if frame is None:
+                    return []
+                return self._search_in_frame(template_name, frame, options, converted=True)
+            
+            executor = self._get_executor()
+            futures = {key: executor.submit(run, name, options) for key, name, options in jobs}
+            for key, future in futures.items():
+                try:
+                    matches = future.result()
+                    results[key] = matches[0] if matches else None
+                except Exception as e:
+                    logger.error(f"模板匹配失败: {key} - {e}")
             
             return results
             
         except Exception as e:
-            logger.error(f"模板匹配失败: {template_name} - {e}")
+            logger.error(f"批量模板匹配失败: {e}")
+            return results
+    
+    def find_composite(self, composite: Union[str, Dict[str, Any]],
+                       **kwargs) -> Dict[str, Optional[TemplateMatchResult]]:
+        """
+        查找组合模板
+        
+        组合模板由一个锚点模板和若干子模板组成，子模板记录相对锚点左上角的偏移。
+        只有锚点在整帧（或 region）中搜索，子模板只在预期位置周围 margin 像素的
+        小窗口内验证，一次调用得到面板上所有元素的位置。
+        
+        Args:
+            composite: 组合模板名称（定义在模板目录的 templates.json 的 composites 中），
+                       或定义字典 {'anchor': 锚点模板, 'margin': 搜索余量,
+                       'children': {键名: {'template': 模板, 'offset': [dx, dy], 其他匹配参数}}}
+            **kwargs: 锚点和子模板共用的参数，同 find_template
+                - margin: 子模板窗口的搜索余量 (default: 定义中的 margin 或 template_matcher.composite_margin)
+                
+        Returns:
+            {键名: 匹配结果}，包含锚点（以锚点模板名称为键）和所有子模板，
+            锚点未找到时全部为 None
+        """
+        results: Dict[str, Optional[TemplateMatchResult]] = {}
+        
+        try:
+            options = self._resolve_options(kwargs, default_max_results=1)
+            definition = composite
+            if isinstance(composite, str):
+                definition = self.template_meta.get_composite(options['templates_dir'] or self.templates_dir,
+                                                              composite)
+                if not definition:
+                    logger.error(f"未定义的组合模板: {composite}")
+                    return results
+            
+            anchor_name = definition['anchor']
+            children = definition.get('children', {})
+            results[anchor_name] = None
+            results.update({key: None for key in children})
+            
+            screenshot = self._get_screenshot(options['region'], options['screenshot'], options['frame_source'],
+                                              options['min_version'], options['frame'])
+            if screenshot is None:
+                return results
+            
+            frame = self._convert_frame(screenshot, options['color_mode'])
+            frames = {options['color_mode']: frame}  # 颜色模式 -> 转换后的截图，子模板可使用不同的颜色模式
+            anchors = self._search_in_frame(anchor_name, frame, options, converted=True)
+            if not anchors:
+                return results
+            anchor = results[anchor_name] = anchors[0]
+            
+            # 子模板窗口以截图内坐标计算
+            region = options['region']
+            origin_x = anchor.location[0] - (region[0] if region else 0)
+            origin_y = anchor.location[1] - (region[1] if region else 0)
+            margin = kwargs.get('margin', definition.get('margin',
+                                                         self.engine.get_config('template_matcher.composite_margin', 16)))
+            frame_height, frame_width = frame.shape[:2]
+            
+            for key, child in children.items():
+                # 子模板的参数覆盖共用参数，窗口搜索相关的参数固定
+                child_options = dict(options)
+                child_options.update({k: v for k, v in child.items() if k in options})
+                child_options.update(region=None, use_hints=False, multi_scale=False, search_mode='full')
+                color_mode = child_options['color_mode']
+                if color_mode not in frames:
+                    frames[color_mode] = self._convert_frame(screenshot, color_mode)
+                
+                template_name = child.get('template', key)
+                template = self._load_template(template_name, child_options['templates_dir'])
+                if template is None:
+                    continue
+                
+                template_height, template_width = template.shape[:2]
+                dx, dy = child['offset']
+                x0 = max(origin_x + dx - margin, 0)
+                y0 = max(origin_y + dy - margin, 0)
+                x1 = min(origin_x + dx + template_width + margin, frame_width)
+                y1 = min(origin_y + dy + template_height + margin, frame_height)
+                if x1 - x0 < template_width or y1 - y0 < template_height:
+                    continue
+                
+                matches = self._search_in_frame(template_name, frames[color_mode][y0:y1, x0:x1], child_options,
+                                                converted=True)
+                if matches:
+                    result = matches[0]
+                    shift_x = x0 + (region[0] if region else 0)
+                    shift_y = y0 + (region[1] if region else 0)
+                    result.location = (result.location[0] + shift_x, result.location[1] + shift_y)
+                    result.center = (result.center[0] + shift_x, result.center[1] + shift_y)
+                    results[key] = result
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"组合模板匹配失败: {composite} - {e}")
+            return results
+    
+    def _resolve_options(self, kwargs: Dict[str, Any], default_max_results: int) -> Dict[str, Any]:
+        """
+        解析匹配参数，未指定的参数使用配置中的默认值
+        
+        Args:
+            kwargs: 调用参数
+            default_max_results: 默认最大结果数量
+            
+        Returns:
+            匹配参数字典
+        """
+        get_config = self.engine.get_config
+        return {
+            'threshold': kwargs.get('threshold', get_config('template_matcher.threshold', 0.8)),
+            'region': kwargs.get('region', None),
+            'method': kwargs.get('method', cv2.TM_CCOEFF_NORMED),
+            'max_results': kwargs.get('max_results', default_max_results),
+            'screenshot': kwargs.get('screenshot', False),
+            'search_mode': kwargs.get('search_mode', get_config('template_matcher.search_mode', 'full')),
+            'pyramid_scale': kwargs.get('pyramid_scale', get_config('template_matcher.pyramid_scale', 0.5)),
+            'templates_dir': kwargs.get('templates_dir', None),
+            'color_mode': kwargs.get('color_mode', get_config('template_matcher.color_mode', 'bgr')),
+            'use_hints': kwargs.get('use_hints', get_config('template_matcher.use_hints', False)),
+            'multi_scale': kwargs.get('multi_scale', get_config('template_matcher.multi_scale', False)),
+            'scales': kwargs.get('scales', None) or self._get_scales(),
+            'backend': kwargs.get('backend', get_config('template_matcher.backend', 'auto')),
+            'frame_source': kwargs.get('frame_source', None),
+            'min_version': kwargs.get('min_version', None),
+            'exact': kwargs.get('exact', None),
+            'exact_tolerance': kwargs.get('exact_tolerance', None),
+            'frame': kwargs.get('frame', None),
+        }
+    
+    def _get_scales(self) -> List[float]:
+        """根据 template_matcher.scale_range / scale_step 配置生成多尺度匹配的缩放比例列表"""
+        min_scale, max_scale = self.engine.get_config('template_matcher.scale_range', [0.5, 2.0])
+        step = self.engine.get_config('template_matcher.scale_step', 0.1)
+        count = int(round((max_scale - min_scale) / step)) + 1
+        return [round(min_scale + i * step, 4) for i in range(count)]
+    
+    def _search_in_frame(self, template_name: str, screenshot: np.ndarray,
+                         options: Dict[str, Any], converted: bool = False) -> List[TemplateMatchResult]:
+        """
+        在给定截图中查找模板
+        
+        Args:
+            template_name: 模板名称
+            screenshot: 截图图像（若指定了 region，则为该区域的截图）
+            options: 匹配参数（见 _resolve_options）
+            converted: 截图是否已转换到 options['color_mode'] 颜色空间
+            
+        Returns:
+            匹配结果列表，坐标为屏幕坐标
+        """
+        color_mode = options['color_mode']
+        templates_dir = options['templates_dir']
+        
+        # 加载模板（非BGR颜色空间使用缓存的转换结果）
+        template = self._load_template(template_name, templates_dir)
+        if template is None:
             return []
+        if color_mode != 'bgr':
+            template = self._load_template_variant(template_name, templates_dir, color_mode,
+                                                   lambda image: convert_color(image, color_mode))
+        
+        if not converted:
+            screenshot = self._convert_frame(screenshot, color_mode)
+        
+        template_key = os.path.join(templates_dir or self.templates_dir, template_name)
+        frame_width, frame_height = self._frame_resolution(screenshot, options)
+        scale_key = (template_key, frame_width, frame_height)
+        
+        # 多尺度模式下使用该分辨率已学习到的缩放比例
+        learned_scale = self.scale_cache.get(scale_key) if options['multi_scale'] else None
+        if learned_scale is not None and learned_scale != 1.0:
+            template = self._load_scaled_template(template_name, templates_dir, color_mode, learned_scale)
+        
+        # 金字塔模式使用缓存（或模板包中预计算）的缩小模板
+        small_template = None
+        if options['search_mode'] == 'pyramid' and 0 < options['pyramid_scale'] < 1 and learned_scale in (None, 1.0):
+            scale = options['pyramid_scale']
+            small_template = self._load_template_variant(
+                template_name, templates_dir, scaled_variant_name(scale, color_mode),
+                lambda image: cv2.resize(convert_color(image, color_mode),
+                                         (int(image.shape[1] * scale), int(image.shape[0] * scale)),
+                                         interpolation=cv2.INTER_AREA)
+            )
+        
+        region = options['region']
+        offset = (region[0], region[1]) if region else (0, 0)
+        use_hints = options['use_hints'] and options['max_results'] == 1
+        
+        # 先搜索位置提示区域，未命中再全帧搜索
+        results = []
+        if use_hints:
+            results = self._search_hint_regions(template_key, screenshot, offset, template, options)
+        
+        # 该分辨率下最近遍历过所有比例都未命中时，在 scale_miss_ttl 内只按原始尺寸匹配
+        missed_at = self.scale_misses.get(scale_key)
+        recently_missed = missed_at is not None and time.time() - missed_at < self.scale_miss_ttl
+        
+        if not results and options['multi_scale'] and learned_scale is None and not recently_missed:
+            # 该分辨率下首次查找：遍历所有缩放比例，记住最优比例
+            results, best_scale = self._match_multi_scale(template_name, screenshot, options)
+            if results:
+                self.scale_cache[scale_key] = best_scale
+                self.scale_misses.pop(scale_key, None)
+                logger.debug(f"模板 {template_name} 在 {frame_width}x{frame_height} 下的最佳缩放比例: {best_scale:g}")
+            else:
+                self.scale_misses[scale_key] = time.time()
+        elif not results:
+            # 元数据标记为精确的模板先做像素精确查找，没有精确命中再做相关匹配
+            meta = self.template_meta.get(templates_dir or self.templates_dir, template_name)
+            exact = options['exact'] if options['exact'] is not None else meta.get('exact', False)
+            if exact:
+                tolerance = options['exact_tolerance']
+                if tolerance is None:
+                    tolerance = meta.get('tolerance', self.engine.get_config('template_matcher.exact_tolerance', 0))
+                results = self._match_exact(screenshot, template, options['max_results'], tolerance,
+                                            options['method'], options['threshold'])
+            if not results:
+                results = self._match_template(screenshot, template, options['method'], options['threshold'],
+                                               options['max_results'], search_mode=options['search_mode'],
+                                               pyramid_scale=options['pyramid_scale'],
+                                               small_template=small_template, backend=options['backend'])
+        
+        # 如果有区域限制，需要调整坐标
+        for result in results:
+            if region:
+                result.location = (result.location[0] + offset[0], result.location[1] + offset[1])
+                result.center = (result.center[0] + offset[0], result.center[1] + offset[1])
+            result.template_name = template_name
+        
+        if use_hints and results:
+            self.location_hints.record(template_key, results[0].location, results[0].size)
+        
+        return results
+    
+    def _frame_resolution(self, screenshot: np.ndarray, options: Dict[str, Any]) -> Tuple[int, int]:
+        """
+        获取截图所属整帧的分辨率（多尺度缓存的键）
+        
+        指定 region 时截图只是整帧的一部分，区域大小不代表游戏窗口的分辨率。
+        
+        Args:
+            screenshot: 截图（可能是区域）
+            options: 匹配参数
+            
+        Returns:
+            (宽, 高)；取不到整帧时使用截图自身的尺寸
+        """
+        frame = options['frame']
+        if frame is None and options['region']:
+            # 只截取了区域时最新整帧可能不存在，改用画面来源报告的尺寸
+            try:
+                source = self.engine.get_frame_source(options['frame_source'])
+                latest = self.engine.frame_store.latest(source)
+                if latest is not None:
+                    frame = latest.image
+                else:
+                    size = source.size()
+                    if size:
+                        return size
+            except Exception as e:
+                logger.debug(f"获取整帧分辨率失败: {e}")
+        if frame is None:
+            frame = screenshot
+        return frame.shape[1], frame.shape[0]
+    
+    def _match_multi_scale(self, template_name: str, frame: np.ndarray,
+                           options: Dict[str, Any]) -> Tuple[List[TemplateMatchResult], float]:
+        """
+        在多个缩放比例下匹配模板，返回最佳比例的结果
+        
+        Args:
+            template_name: 模板名称
+            frame: 截图（已转换颜色空间）
+            options: 匹配参数
+            
+        Returns:
+            (最佳比例的匹配结果列表, 最佳缩放比例)
+        """
+        frame_height, frame_width = frame.shape[:2]
+        best_results: List[TemplateMatchResult] = []
+        best_scale = 1.0
+        
+        # 从接近原始尺寸的比例开始尝试
+        for scale in sorted(options['scales'], key=lambda value: abs(np.log(value))):
+            template = self._load_scaled_template(template_name, options['templates_dir'],
+                                                  options['color_mode'], scale)
+            if template is None:
+                continue
+            height, width = template.shape[:2]
+            if width > frame_width or height > frame_height or min(width, height) < 4:
+                continue
+            
+            results = self._match_template(frame, template, options['method'], options['threshold'],
+                                           options['max_results'], search_mode=options['search_mode'],
+                                           pyramid_scale=options['pyramid_scale'], backend=options['backend'])
+            if results and (not best_results or results[0].confidence > best_results[0].confidence):
+                best_results, best_scale = results, scale
+        
+        return best_results, best_scale
+    
+    def _load_scaled_template(self, template_name: str, templates_dir: Optional[str], color_mode: str,
+                              scale: float) -> Optional[np.ndarray]:
+        """
+        加载按比例缩放（并转换颜色空间）的模板，结果作为模板变体缓存
+        
+        Args:
+            template_name: 模板名称
+            templates_dir: 模板目录
+            color_mode: 颜色空间
+            scale: 缩放比例
+            
+        Returns:
+            缩放后的模板
+        """
+        if scale == 1.0:
+            template = self._load_template(template_name, templates_dir)
+            if template is None or color_mode == 'bgr':
+                return template
+            return self._load_template_variant(template_name, templates_dir, color_mode,
+                                               lambda image: convert_color(image, color_mode))
+        
+        interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+        return self._load_template_variant(
+            template_name, templates_dir, f"{color_mode}_x{scale:g}",
+            lambda image: cv2.resize(convert_color(image, color_mode),
+                                     (max(int(round(image.shape[1] * scale)), 1),
+                                      max(int(round(image.shape[0] * scale)), 1)),
+                                     interpolation=interpolation)
+        )
+    
+    def _search_hint_regions(self, hint_key: str, frame: np.ndarray, offset: Tuple[int, int],
+                             template: np.ndarray, options: Dict[str, Any]) -> List[TemplateMatchResult]:
+        """
+        在位置提示区域内查找模板
+        
+        Args:
+            hint_key: 位置提示键
+            frame: 截图（已转换颜色空间）
+            offset: 截图左上角对应的屏幕坐标
+            template: 模板图像
+            options: 匹配参数
+            
+        Returns:
+            匹配结果列表（截图内坐标），未命中返回空列表
+        """
+        template_height, template_width = template.shape[:2]
+        frame_height, frame_width = frame.shape[:2]
+        padding = self.engine.get_config('template_matcher.hint_padding', 32)
+        
+        regions = self.location_hints.get_regions(hint_key, (template_width, template_height), padding)
+        for x, y, w, h in regions:
+            # 屏幕坐标转换为截图内坐标并裁剪到截图范围
+            x0, y0 = max(x - offset[0], 0), max(y - offset[1], 0)
+            x1, y1 = min(x + w - offset[0], frame_width), min(y + h - offset[1], frame_height)
+            if x1 - x0 < template_width or y1 - y0 < template_height:
+                continue
+            
+            results = self._match_template(frame[y0:y1, x0:x1], template, options['method'],
+                                           options['threshold'], 1, backend=options['backend'])
+            if results:
+                result = results[0]
+                result.location = (result.location[0] + x0, result.location[1] + y0)
+                result.center = (result.center[0] + x0, result.center[1] + y0)
+                self.location_hints.hits += 1
+                return results
+        
+        if regions:
+            self.location_hints.misses += 1
+        return []
+    
+    def _convert_frame(self, frame: np.ndarray, color_mode: str) -> np.ndarray:
+        """
+        将截图转换到指定颜色空间
+        
+        同一帧的转换结果会被缓存，多个模板对同一帧匹配时只转换一次。
+        
+        Args:
+            frame: BGR截图
+            color_mode: 颜色空间
+            
+        Returns:
+            转换后的截图
+        """
+        if color_mode == 'bgr':
+            return frame
+        
+        with self._frame_variants_lock:
+            if self._frame_variants_source is not frame:
+                self._frame_variants_source = frame
+                self._frame_variants = {}
+            
+            converted = self._frame_variants.get(color_mode)
+            if converted is None:
+                converted = convert_color(frame, color_mode)
+                self._frame_variants[color_mode] = converted
+            return converted
+    
+    def _crop_frame(self, frame: np.ndarray, frame_region: Optional[Tuple[int, int, int, int]],
+                    region: Optional[Tuple[int, int, int, int]]
+                    ) -> Tuple[Optional[np.ndarray], Optional[Tuple[int, int, int, int]]]:
+        """
+        从已截取的帧中裁剪出指定的屏幕区域（返回视图，不复制数据）
+        
+        区域超出该帧时只裁剪两者的交集，并返回交集对应的屏幕区域，
+        匹配结果的坐标应以该区域的左上角为偏移。
+        
+        Args:
+            frame: 已截取的帧
+            frame_region: 该帧对应的屏幕区域，None 表示全屏
+            region: 需要的屏幕区域，None 表示整帧
+            
+        Returns:
+            (裁剪后的图像, 实际裁剪的屏幕区域)，交集为空时为 (None, None)
+        """
+        if not region or region == frame_region:
+            return frame, frame_region
+        
+        # 截取时区域被裁到屏幕内，帧左上角不小于 0
+        origin_x, origin_y = (max(frame_region[0], 0), max(frame_region[1], 0)) if frame_region else (0, 0)
+        frame_height, frame_width = frame.shape[:2]
+        x, y, w, h = region
+        x0, y0 = max(x, origin_x), max(y, origin_y)
+        x1, y1 = min(x + w, origin_x + frame_width), min(y + h, origin_y + frame_height)
+        if x1 <= x0 or y1 <= y0:
+            return None, None
+        return frame[y0 - origin_y:y1 - origin_y, x0 - origin_x:x1 - origin_x], (x0, y0, x1 - x0, y1 - y0)
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """获取（按需创建）批量匹配使用的线程池"""
+        with self._executor_lock:
+            if self._executor is None:
+                max_workers = self.engine.get_config(
+                    'template_matcher.max_workers',
+                    self.engine.get_config('engine.max_workers', 4)
+                )
+                self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                                    thread_name_prefix='template-matcher')
+            return self._executor
+    
+    def shutdown(self):
+        """关闭批量匹配线程池并保存位置提示"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+        self.location_hints.save(self.hints_file)
     
     def wait_for_template(self, template_name: str, timeout: float = 10.0, **kwargs) -> Optional[TemplateMatchResult]:
         """
         等待模板出现
         
+        每次轮询都会获取新截图，但只有当截图（或搜索区域）相对上一次匹配的
+        截图发生变化时才重新匹配，画面静止时跳过匹配。
+        
         Args:
             template_name: 模板名称
             timeout: 超时时间（秒）
-            **kwargs: 其他参数
+            **kwargs: 其他参数，同 find_template，另外支持:
+                - skip_unchanged: 画面未变化时跳过匹配 (default: template_matcher.skip_unchanged)
+                - change_threshold: 判定画面变化的灰度差阈值 (default: template_matcher.change_threshold)
+                - stats: 传入字典以接收统计信息 {'match_passes', 'skipped_passes'}
                 
         Returns:
             匹配结果
@@ -163,15 +707,37 @@ class TemplateMatcher:
         import time
         start_time = time.time()
         
+        options = self._resolve_options(kwargs, default_max_results=1)
+        skip_unchanged = kwargs.get('skip_unchanged', self.engine.get_config('template_matcher.skip_unchanged', True))
+        change_threshold = kwargs.get('change_threshold',
+                                      self.engine.get_config('template_matcher.change_threshold', 3.0))
+        stats = kwargs.get('stats', {})
+        stats.update({'match_passes': 0, 'skipped_passes': 0})
+        last_signature = None
+        
         while time.time() - start_time < timeout:
-            # 强制使用新截图
-            kwargs['screenshot'] = True
-            result = self.find_template(template_name, **kwargs)
-            if result:
-                return result
+            try:
+                # 强制使用新截图
+                screenshot = self._get_screenshot(options['region'], True, options['frame_source'])
+                if screenshot is not None:
+                    signature = frame_signature(screenshot) if skip_unchanged else None
+                    if signature is not None and last_signature is not None and \
+                            not frame_changed(last_signature, signature, change_threshold):
+                        stats['skipped_passes'] += 1
+                    else:
+                        last_signature = signature
+                        stats['match_passes'] += 1
+                        results = self._search_in_frame(template_name, screenshot, options)
+                        if results:
+                            logger.debug(f"等待模板成功: {template_name} (匹配 {stats['match_passes']} 次, "
+                                         f"跳过 {stats['skipped_passes']} 次)")
+                            return results[0]
+            except Exception as e:
+                logger.error(f"模板匹配失败: {template_name} - {e}")
             time.sleep(0.1)
         
-        logger.warning(f"等待模板超时: {template_name}")
+        logger.warning(f"等待模板超时: {template_name} (匹配 {stats['match_passes']} 次, "
+                       f"跳过 {stats['skipped_passes']} 次)")
         return None
     
     def click_template(self, template_name: str, **kwargs) -> bool:
@@ -204,8 +770,10 @@ class TemplateMatcher:
             clicks = kwargs.get('clicks', 1)
             interval = kwargs.get('interval', 0.1)
             
-            # 执行点击
-            pyautogui.click(click_x, click_y, clicks=clicks, interval=interval, button=button)
+            # 在匹配所用的画面来源上执行点击
+            source = self.engine.get_frame_source(kwargs.get('frame_source'))
+            source.click(click_x, click_y, clicks=clicks, interval=interval, button=button)
+            self.engine.frame_store.mark_input(source)
             
             logger.info(f"点击模板成功: {template_name} at ({click_x}, {click_y})")
             return True
@@ -214,27 +782,42 @@ class TemplateMatcher:
             logger.error(f"点击模板失败: {template_name} - {e}")
             return False
     
-    def _load_template(self, template_name: str) -> Optional[np.ndarray]:
+    def _load_template(self, template_name: str, templates_dir: Optional[str] = None) -> Optional[np.ndarray]:
         """
         加载模板图像
         
         Args:
             template_name: 模板名称
+            templates_dir: 模板目录，默认为 self.templates_dir
             
         Returns:
             模板图像
         """
+        templates_dir = templates_dir or self.templates_dir
+        cache_key = os.path.join(templates_dir, template_name)
+        
         # 检查缓存
-        if template_name in self.templates_cache:
-            return self.templates_cache[template_name]
+        template = self.templates_cache.get(cache_key)
+        if template is not None:
+            return template
+        
+        # 优先使用模板包中的内存映射数据
+        pack = self._get_template_pack(templates_dir)
+        if pack is not None:
+            template = pack.get(template_name)
+            if template is not None:
+                source_path = pack.get_source_path(template_name)
+                self.templates_cache.put(cache_key, source_path if os.path.exists(source_path) else pack.path,
+                                         template)
+                return template
         
         # 构建模板路径
-        template_path = os.path.join(self.templates_dir, f"{template_name}.png")
+        template_path = os.path.join(templates_dir, f"{template_name}.png")
         
         # 尝试其他格式
         if not os.path.exists(template_path):
             for ext in ['.jpg', '.jpeg', '.bmp']:
-                alt_path = os.path.join(self.templates_dir, f"{template_name}{ext}")
+                alt_path = os.path.join(templates_dir, f"{template_name}{ext}")
                 if os.path.exists(alt_path):
                     template_path = alt_path
                     break
@@ -251,7 +834,7 @@ class TemplateMatcher:
                 return None
             
             # 缓存模板
-            self.templates_cache[template_name] = template
+            self.templates_cache.put(cache_key, template_path, template)
             
             logger.debug(f"模板加载成功: {template_name}")
             return template
@@ -260,54 +843,110 @@ class TemplateMatcher:
             logger.error(f"加载模板失败: {template_name} - {e}")
             return None
     
+    def _load_template_variant(self, template_name: str, templates_dir: Optional[str], variant: str,
+                               builder: Callable[[np.ndarray], np.ndarray]) -> Optional[np.ndarray]:
+        """
+        加载模板的派生变体（灰度、缩放等）
+        
+        依次查找缓存、模板包，都没有时由原模板现场生成并缓存。
+        
+        Args:
+            template_name: 模板名称
+            templates_dir: 模板目录，默认为 self.templates_dir
+            variant: 变体名称
+            builder: 由原模板生成变体的函数
+            
+        Returns:
+            变体图像
+        """
+        templates_dir = templates_dir or self.templates_dir
+        cache_key = os.path.join(templates_dir, template_name)
+        
+        image = self.templates_cache.get_variant(cache_key, variant)
+        if image is not None:
+            return image
+        
+        pack = self._get_template_pack(templates_dir)
+        if pack is not None:
+            image = pack.get(template_name, variant)
+        
+        if image is None:
+            template = self._load_template(template_name, templates_dir)
+            if template is None:
+                return None
+            image = builder(template)
+        
+        self.templates_cache.put_variant(cache_key, variant, image)
+        return image
+    
+    def _get_template_pack(self, templates_dir: str) -> Optional[TemplatePack]:
+        """
+        获取模板目录对应的模板包
+        
+        模板包文件重新编译（或新建、删除）后重新映射，不会继续读取旧的映射。
+        
+        Args:
+            templates_dir: 模板目录
+            
+        Returns:
+            模板包，不存在时返回 None
+        """
+        if not self.engine.get_config('template_matcher.use_pack', True):
+            return None
+        
+        pack_path = None
+        if templates_dir == self.templates_dir:
+            pack_path = self.engine.get_config('template_matcher.pack_path', None)
+        pack_path = pack_path or os.path.join(templates_dir, PACK_FILENAME)
+        try:
+            stat = os.stat(pack_path)
+            signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except OSError:
+            signature = None
+        
+        cached = self.template_packs.get(templates_dir)
+        if cached is not None and cached[1] == signature:
+            return cached[0]
+        
+        pack = load_template_pack(templates_dir, pack_path) if signature is not None else None
+        self.template_packs[templates_dir] = (pack, signature)
+        return pack
+    
     def _get_screenshot(self, region: Optional[Tuple[int, int, int, int]] = None, 
-                       force_new: bool = False) -> Optional[np.ndarray]:
+                       force_new: bool = False, frame_source: Any = None,
+                       min_version: Optional[int] = None, frame: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
         """
         获取屏幕截图
         
+        截图由引擎的帧存储统一管理：最新整帧足够新时直接返回其区域视图，否则截取新的整帧。
+        
         Args:
             region: 截图区域 (x, y, width, height)
             force_new: 是否强制获取新截图
+            frame_source: 画面来源名称或实例，为 None 时使用任务绑定的来源或默认来源
+            min_version: 要求帧的版本号不小于该值
+            frame: 调用方给定的整帧图像，给定时直接裁剪该图像
             
         Returns:
-            截图图像
+            截图图像（只读视图）
         """
-        import time
-        current_time = time.time()
-        
-        # 检查缓存（100ms内的截图可以重用）
-        if not force_new and self.screenshot_cache is not None and \
-           current_time - self.screenshot_timestamp < 0.1:
-            screenshot = self.screenshot_cache
-        else:
-            # 获取新截图
-            try:
-                if region:
-                    screenshot = pyautogui.screenshot(region=region)
-                else:
-                    screenshot = pyautogui.screenshot()
-                
-                # 转换为OpenCV格式
-                screenshot = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
-                
-                # 更新缓存
-                if not region:  # 只缓存全屏截图
-                    self.screenshot_cache = screenshot
-                    self.screenshot_timestamp = current_time
-                
-            except Exception as e:
-                logger.error(f"获取截图失败: {e}")
-                return None
+        if frame is not None:
+            return crop_region(frame, region)
         
-        # 如果有区域限制，裁剪截图
-        if region and self.screenshot_cache is not None:
-            x, y, w, h = region
-            screenshot = screenshot[y:y+h, x:x+w]
+        try:
+            source = self.engine.get_frame_source(frame_source)
+        except Exception as e:
+            logger.error(f"获取画面来源失败: {e}")
+            return None
         
-        return screenshot
+        frame = self.engine.frame_store.get(source, region, min_version=min_version, force_new=force_new)
+        return frame.image if frame is not None else None
     
     def _match_template(self, screenshot: np.ndarray, template: np.ndarray, 
-                       method: int, threshold: float, max_results: int) -> List[TemplateMatchResult]:
+                       method: int, threshold: float, max_results: int,
+                       search_mode: str = 'full', pyramid_scale: float = 0.5,
+                       small_template: Optional[np.ndarray] = None,
+                       backend: str = 'auto') -> List[TemplateMatchResult]:
         """
         执行模板匹配
         
@@ -317,48 +956,36 @@ class TemplateMatcher:
             method: 匹配方法
             threshold: 匹配阈值
             max_results: 最大结果数量
+            search_mode: 搜索模式 'full'（全分辨率）或 'pyramid'（先缩小粗搜再全分辨率精修）
+            pyramid_scale: 金字塔模式的缩放比例 (0-1)
+            small_template: 预先缩小的模板，为 None 时在金字塔模式中现场缩放
+            backend: 相关计算后端 'auto'、'spatial' 或 'fft'（见 _compute_score_map）
             
         Returns:
             匹配结果列表
         """
+        if search_mode == 'pyramid':
+            return self._match_template_pyramid(screenshot, template, method, threshold,
+                                                max_results, pyramid_scale, small_template, backend)
+        
         try:
             # 获取模板尺寸
             template_height, template_width = template.shape[:2]
             
             # 执行模板匹配
-            result = cv2.matchTemplate(screenshot, template, method)
+            result = self._compute_score_map(screenshot, template, method, backend)
             
-            # 查找匹配位置
-            results = []
+            # 提取峰值位置
+            xs, ys, confidences = self._extract_peaks(result, method, threshold, max_results,
+                                                      template_width, template_height)
             
-            if method in [cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED]:
-                # 对于SQDIFF方法，值越小越好
-                locations = np.where(result <= (1.0 - threshold))
-                confidences = 1.0 - result[locations]
-            else:
-                # 对于其他方法，值越大越好
-                locations = np.where(result >= threshold)
-                confidences = result[locations]
-            
-            # 组合坐标和置信度
-            points = list(zip(locations[1], locations[0], confidences))
-            
-            # 按置信度排序
-            points.sort(key=lambda x: x[2], reverse=True)
-            
-            # 非极大值抑制
-            filtered_points = self._non_max_suppression(points, template_width, template_height)
+            # 非极大值抑制（按置信度排序并去除重叠结果）
+            keep = self._non_max_suppression(xs, ys, confidences, template_width, template_height,
+                                             max_results=max_results)
             
             # 创建结果对象
-            for i, (x, y, confidence) in enumerate(filtered_points[:max_results]):
-                result = TemplateMatchResult(
-                    template_name="",
-                    confidence=float(confidence),
-                    location=(int(x), int(y)),
-                    size=(template_width, template_height),
-                    center=(int(x + template_width // 2), int(y + template_height // 2))
-                )
-                results.append(result)
+            results = self._make_results(xs[keep], ys[keep], confidences[keep],
+                                         template_width, template_height)
             
             return results
             
@@ -366,89 +993,361 @@ class TemplateMatcher:
             logger.error(f"模板匹配执行失败: {e}")
             return []
     
-    def _non_max_suppression(self, points: List[Tuple[int, int, float]], 
-                            width: int, height: int, overlap_threshold: float = 0.5) -> List[Tuple[int, int, float]]:
+    def _compute_score_map(self, screenshot: np.ndarray, template: np.ndarray, method: int,
+                           backend: str = 'auto') -> np.ndarray:
         """
-        非极大值抑制，去除重叠的检测结果
+        计算匹配得分图
+        
+        'spatial' 直接调用 cv2.matchTemplate；'fft' 使用频域实现（仅支持 TM_CCOEFF_NORMED /
+        TM_CCORR_NORMED，其他方法回退到空间域）；'auto' 按模板与截图的面积比选择：
+        多通道截图上模板面积占比达到 template_matcher.fft_area_ratio 时使用频域实现。
+        单通道时 cv2.matchTemplate 自身已对大模板使用DFT，始终更快，不切换。
         
         Args:
-            points: 检测点列表 (x, y, confidence)
-            width: 模板宽度
-            height: 模板高度
-            overlap_threshold: 重叠阈值
+            screenshot: 屏幕截图
+            template: 模板图像
+            method: 匹配方法
+            backend: 计算后端 'auto'、'spatial' 或 'fft'
             
         Returns:
-            过滤后的点列表
+            得分图
         """
-        if not points:
+        if backend == 'auto':
+            area_ratio = template.shape[0] * template.shape[1] / (screenshot.shape[0] * screenshot.shape[1])
+            min_ratio = self.engine.get_config('template_matcher.fft_area_ratio', 0.005)
+            backend = 'fft' if screenshot.ndim == 3 and area_ratio >= min_ratio else 'spatial'
+        
+        if backend == 'fft' and method in FFT_METHODS:
+            return match_template_fft(screenshot, template, method)
+        
+        # 得分图写入线程私有的复用缓冲区，轮询时不再每次分配整帧大小的矩阵
+        if self.reuse_buffers:
+            result = self.match_buffers.get(screenshot.shape, template.shape, method)
+            return cv2.matchTemplate(screenshot, template, method, result=result)
+        return cv2.matchTemplate(screenshot, template, method)
+    
+    def _match_exact(self, screenshot: np.ndarray, template: np.ndarray, max_results: int,
+                     tolerance: int = 0, method: int = cv2.TM_CCOEFF_NORMED,
+                     threshold: float = 0.8) -> List[TemplateMatchResult]:
+        """
+        像素精确匹配
+        
+        先用几个探针像素过滤候选位置：每个探针对截图的平移视图做一次 cv2.inRange
+        （单遍 SIMD 比较，开销接近内存带宽），候选位置的掩码逐个相与；
+        剩下的少量候选再逐个与整个模板比较最大像素误差。
+        
+        置信度与相关匹配同一标度：完全一致的命中为 1.0，容差内但不完全一致的命中
+        用 method 计算该位置的相关得分，低于 threshold 的命中丢弃。
+        
+        Args:
+            screenshot: 屏幕截图
+            template: 模板图像（与截图相同的颜色空间）
+            max_results: 最大结果数量
+            tolerance: 每通道允许的最大像素误差，0 为完全一致
+            method: 容差内命中的评分方法
+            threshold: 匹配阈值
+            
+        Returns:
+            匹配结果列表，没有精确命中时为空
+        """
+        template_height, template_width = template.shape[:2]
+        rows = screenshot.shape[0] - template_height + 1
+        cols = screenshot.shape[1] - template_width + 1
+        if rows <= 0 or cols <= 0 or screenshot.ndim != template.ndim:
             return []
         
-        # 转换为边界框
-        boxes = []
-        for x, y, confidence in points:
-            boxes.append([x, y, x + width, y + height, confidence])
+        max_candidates = self.engine.get_config('template_matcher.exact_max_candidates', 4096)
+        mask = None
+        for y, x in self._exact_probes(template):
+            value = np.atleast_1d(template[y, x]).astype(np.int16)
+            lower = tuple(np.clip(value - tolerance, 0, 255).tolist())
+            upper = tuple(np.clip(value + tolerance, 0, 255).tolist())
+            probe = cv2.inRange(screenshot[y:y + rows, x:x + cols], lower, upper)
+            mask = probe if mask is None else cv2.bitwise_and(mask, probe, dst=mask)
+            if cv2.countNonZero(mask) <= 64:
+                break
         
-        # 按置信度排序
-        boxes.sort(key=lambda x: x[4], reverse=True)
+        ys, xs = np.nonzero(mask)
+        if len(xs) == 0 or len(xs) > max_candidates:
+            # 没有命中，或模板过于单调导致候选太多，交给相关匹配
+            return []
         
-        # 非极大值抑制
-        keep = []
-        while boxes:
-            # 选择置信度最高的框
-            best = boxes.pop(0)
-            keep.append(best)
+        points = []
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            roi = screenshot[y:y + template_height, x:x + template_width]
+            error = cv2.norm(roi, template, cv2.NORM_INF)
+            if error > tolerance:
+                continue
+            if error == 0:
+                points.append((x, y, 1.0))
+                continue
+            score = float(cv2.matchTemplate(roi, template, method)[0, 0])
+            if method in [cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED]:
+                score = 1.0 - score
+            if score >= threshold:
+                points.append((x, y, score))
+        
+        if not points:
+            return []
+        
+        xs, ys, confidences = (np.array(column) for column in zip(*points))
+        keep = self._non_max_suppression(xs, ys, confidences, template_width, template_height,
+                                         max_results=max_results)
+        return self._make_results(xs[keep], ys[keep], confidences[keep], template_width, template_height)
+    
+    def _exact_probes(self, template: np.ndarray, count: int = 4) -> List[Tuple[int, int]]:
+        """
+        选择精确匹配的探针像素：按颜色在模板内出现的次数从少到多，每种颜色取一个像素
+        
+        Args:
+            template: 模板图像
+            count: 探针数量
             
-            # 计算与其他框的重叠
-            remaining = []
-            for box in boxes:
-                if self._calculate_overlap(best, box) < overlap_threshold:
-                    remaining.append(box)
+        Returns:
+            探针坐标列表 [(y, x)]
+        """
+        height, width = template.shape[:2]
+        pixels = template.reshape(height * width, -1).astype(np.uint32)
+        codes = pixels[:, 0]
+        for channel in range(1, pixels.shape[1]):
+            codes = (codes << 8) | pixels[:, channel]
+        
+        _, first_index, counts = np.unique(codes, return_index=True, return_counts=True)
+        rarest = first_index[np.argsort(counts, kind='stable')][:count]
+        return [(int(index) // width, int(index) % width) for index in rarest]
+    
+    def _extract_peaks(self, result: np.ndarray, method: int, threshold: float, max_results: int,
+                       width: int, height: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        从匹配得分图中提取峰值位置
+        
+        单结果时直接用 minMaxLoc 取最优位置；多结果时用膨胀求局部极大值，
+        只有超过阈值的局部极大值点才会进入后续的非极大值抑制。
+        得分图会被原地修改，膨胀结果和掩码使用复用缓冲区。
+        
+        Args:
+            result: cv2.matchTemplate 输出的得分图
+            method: 匹配方法
+            threshold: 匹配阈值
+            max_results: 最大结果数量
+            width: 模板宽度
+            height: 模板高度
             
-            boxes = remaining
+        Returns:
+            (x坐标数组, y坐标数组, 置信度数组)
+        """
+        empty = (np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32))
+        
+        # 统一为值越大越好的置信度（原地转换）
+        if method in [cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED]:
+            scores = np.subtract(1.0, result, out=result)
+        else:
+            scores = result
+        
+        _, max_val, _, max_loc = cv2.minMaxLoc(scores)
+        if max_val < threshold:
+            return empty
+        
+        # 单结果快速路径
+        if max_results == 1:
+            return (np.array([max_loc[0]], dtype=np.intp), np.array([max_loc[1]], dtype=np.intp),
+                    np.array([max_val], dtype=np.float32))
+        
+        # 局部极大值：邻域窗口取模板尺寸的一半
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(3, (width // 2) | 1), max(3, (height // 2) | 1)))
+        if self.reuse_buffers:
+            frame_shape = (scores.shape[0] + height - 1, scores.shape[1] + width - 1)
+            dilated = cv2.dilate(scores, kernel, dst=self.match_buffers.get(
+                frame_shape, (height, width), method, 'dilated', scores.dtype))
+            mask = self.match_buffers.get(frame_shape, (height, width), method, 'mask', np.bool_)
+        else:
+            dilated = cv2.dilate(scores, kernel)
+            mask = np.empty(scores.shape, dtype=np.bool_)
+        
+        # scores >= max(dilated, threshold) 等价于“是局部极大值且不低于阈值”，一次比较完成
+        np.maximum(dilated, threshold, out=dilated)
+        ys, xs = np.nonzero(np.greater_equal(scores, dilated, out=mask))
         
-        # 转换回点格式
-        result = []
-        for box in keep:
-            result.append((box[0], box[1], box[4]))
+        return xs, ys, scores[ys, xs]
+    
+    def _match_template_pyramid(self, screenshot: np.ndarray, template: np.ndarray,
+                                method: int, threshold: float, max_results: int,
+                                scale: float, small_template: Optional[np.ndarray] = None,
+                                backend: str = 'auto') -> List[TemplateMatchResult]:
+        """
+        金字塔模式模板匹配
+        
+        先在缩小后的截图上用放宽的阈值搜索候选位置，再在全分辨率截图上
+        只对候选位置的邻域做精确匹配，返回的坐标和置信度均来自全分辨率结果。
         
-        return result
+        Args:
+            screenshot: 屏幕截图
+            template: 模板图像
+            method: 匹配方法
+            threshold: 匹配阈值
+            max_results: 最大结果数量
+            scale: 缩放比例 (0-1)
+            small_template: 预先缩小的模板，为 None 时现场缩放
+            backend: 相关计算后端
+            
+        Returns:
+            匹配结果列表
+        """
+        try:
+            template_height, template_width = template.shape[:2]
+            screen_height, screen_width = screenshot.shape[:2]
+            
+            small_width = int(template_width * scale)
+            small_height = int(template_height * scale)
+            min_size = self.engine.get_config('template_matcher.pyramid_min_size', 8)
+            
+            # 缩放后模板太小时粗搜不可靠，退回全分辨率匹配
+            if not 0 < scale < 1 or min(small_width, small_height) < min_size:
+                return self._match_template(screenshot, template, method, threshold, max_results,
+                                            backend=backend)
+            
+            # 粗搜：缩小截图和模板，放宽阈值，多保留几个候选
+            small_screenshot = cv2.resize(screenshot, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            if small_template is None:
+                small_template = cv2.resize(template, (small_width, small_height), interpolation=cv2.INTER_AREA)
+            margin = self.engine.get_config('template_matcher.pyramid_margin', 0.15)
+            candidates = self._match_template(small_screenshot, small_template, method,
+                                              threshold - margin, max_results + 3, backend=backend)
+            
+            # 精修：在全分辨率截图上只匹配候选邻域
+            pad = int(np.ceil(1.0 / scale)) + 2
+            points = []
+            for candidate in candidates:
+                x0 = max(int(round(candidate.location[0] / scale)) - pad, 0)
+                y0 = max(int(round(candidate.location[1] / scale)) - pad, 0)
+                x1 = min(x0 + template_width + 2 * pad, screen_width)
+                y1 = min(y0 + template_height + 2 * pad, screen_height)
+                if x1 - x0 < template_width or y1 - y0 < template_height:
+                    continue
+                
+                result = self._compute_score_map(screenshot[y0:y1, x0:x1], template, method, backend)
+                min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+                
+                if method in [cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED]:
+                    confidence, loc = 1.0 - min_val, min_loc
+                else:
+                    confidence, loc = max_val, max_loc
+                
+                if confidence >= threshold:
+                    points.append((x0 + loc[0], y0 + loc[1], confidence))
+            
+            if not points:
+                return []
+            
+            xs, ys, confidences = (np.array(column) for column in zip(*points))
+            keep = self._non_max_suppression(xs, ys, confidences, template_width, template_height,
+                                             max_results=max_results)
+            results = self._make_results(xs[keep], ys[keep], confidences[keep],
+                                         template_width, template_height)
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"金字塔模板匹配执行失败: {e}")
+            return []
     
-    def _calculate_overlap(self, box1: List[float], box2: List[float]) -> float:
+    def _non_max_suppression(self, xs: np.ndarray, ys: np.ndarray, scores: np.ndarray,
+                            width: int, height: int, overlap_threshold: float = 0.5,
+                            max_results: Optional[int] = None) -> np.ndarray:
         """
-        计算两个边界框的重叠度
+        非极大值抑制，去除重叠的检测结果
+        
+        所有候选框尺寸相同（模板尺寸），每轮保留当前置信度最高的框，
+        并用数组运算一次性计算它与剩余框的IoU，剔除重叠框。
         
         Args:
-            box1: 边界框1 [x1, y1, x2, y2, confidence]
-            box2: 边界框2 [x1, y1, x2, y2, confidence]
+            xs: 候选框左上角x坐标数组
+            ys: 候选框左上角y坐标数组
+            scores: 候选框置信度数组
+            width: 模板宽度
+            height: 模板高度
+            overlap_threshold: 重叠阈值 (IoU)
+            max_results: 保留结果数量上限，达到后提前结束
             
         Returns:
-            重叠度 (0-1)
+            保留的候选下标数组，按置信度从高到低排列
         """
-        # 计算交集
-        x1 = max(box1[0], box2[0])
-        y1 = max(box1[1], box2[1])
-        x2 = min(box1[2], box2[2])
-        y2 = min(box1[3], box2[3])
+        if len(scores) == 0:
+            return np.empty(0, dtype=np.intp)
         
-        if x2 <= x1 or y2 <= y1:
-            return 0.0
+        # 按置信度从高到低排序
+        order = np.argsort(-np.asarray(scores), kind='stable')
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        area = width * height
         
-        intersection = (x2 - x1) * (y2 - y1)
+        keep = []
+        while order.size > 0:
+            best = order[0]
+            keep.append(best)
+            if max_results is not None and len(keep) >= max_results:
+                break
+            
+            # 计算最优框与剩余框的交集面积
+            rest = order[1:]
+            inter_w = np.clip(width - np.abs(xs[rest] - xs[best]), 0, None)
+            inter_h = np.clip(height - np.abs(ys[rest] - ys[best]), 0, None)
+            intersection = inter_w * inter_h
+            
+            # 同尺寸框的并集 = 2 * 面积 - 交集
+            overlap = intersection / (2 * area - intersection)
+            order = rest[overlap < overlap_threshold]
         
-        # 计算并集
-        area1 = (box1[2] - box1[0]) * (box1[3] - box1[1])
-        area2 = (box2[2] - box2[0]) * (box2[3] - box2[1])
-        union = area1 + area2 - intersection
+        return np.array(keep, dtype=np.intp)
+    
+    def _make_results(self, xs: np.ndarray, ys: np.ndarray, confidences: np.ndarray,
+                      width: int, height: int) -> List[TemplateMatchResult]:
+        """
+        根据坐标和置信度数组创建匹配结果对象
         
-        return intersection / union if union > 0 else 0.0
+        Args:
+            xs: 左上角x坐标数组
+            ys: 左上角y坐标数组
+            confidences: 置信度数组
+            width: 模板宽度
+            height: 模板高度
+            
+        Returns:
+            匹配结果列表
+        """
+        results = []
+        for x, y, confidence in zip(xs, ys, confidences):
+            results.append(TemplateMatchResult(
+                template_name="",
+                confidence=float(confidence),
+                location=(int(x), int(y)),
+                size=(width, height),
+                center=(int(x + width // 2), int(y + height // 2))
+            ))
+        return results
     
     def clear_cache(self):
         """清理缓存"""
         self.templates_cache.clear()
-        self.screenshot_cache = None
-        self.screenshot_timestamp = 0
+        self.template_packs.clear()
+        self.scale_cache.clear()
+        self.scale_misses.clear()
+        self.template_meta.clear()
+        with self._frame_variants_lock:
+            self._frame_variants_source = None
+            self._frame_variants = {}
+        self.engine.frame_store.invalidate()
+        self.match_buffers.clear()
         logger.info("模板匹配器缓存已清理")
     
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取模板缓存统计信息（命中/未命中/淘汰次数等）"""
+        return self.templates_cache.get_stats()
+    
+    def get_hint_stats(self) -> Dict[str, Any]:
+        """获取位置提示统计信息（提示区域命中率等）"""
+        return self.location_hints.get_stats()
+    
     def get_template_list(self) -> List[str]:
         """获取可用模板列表"""
         templates = []
@@ -457,4 +1356,9 @@ class TemplateMatcher:
                 if file.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')):
                     name = os.path.splitext(file)[0]
                     templates.append(name)
+        
+        # 只存在于模板包中的模板
+        pack = self._get_template_pack(self.templates_dir)
+        if pack is not None:
+            templates.extend(name for name in pack.names() if name not in templates)
         return templates
\ No newline at end of file
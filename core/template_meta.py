@@ -0,0 +1,115 @@
+"""
+模板元数据
+读取模板目录下的 templates.json，为模板声明匹配方式等附加属性，并定义组合模板
+
+文件格式示例:
+    {
+        "templates": {
+            "close_button": {"exact": true, "tolerance": 0}
+        },
+        "composites": {
+            "shop_panel": {
+                "anchor": "shop_title",
+                "margin": 16,
+                "children": {
+                    "buy": {"template": "buy_button", "offset": [120, 340]},
+                    "close": {"template": "close_button", "offset": [410, -8], "threshold": 0.9}
+                }
+            }
+        }
+    }
+"""
+import os
+import json
+import time
+import threading
+from typing import Any, Dict, Optional, Tuple
+from loguru import logger
+
+
+META_FILENAME = 'templates.json'
+
+
+class TemplateMetadata:
+    """模板元数据（按目录缓存，文件修改后自动重新加载）"""
+    
+    def __init__(self, check_interval: float = 1.0):
+        """
+        初始化元数据缓存
+        
+        Args:
+            check_interval: 检查 templates.json 是否变更的最小间隔（秒），0 表示每次访问都检查
+        """
+        self.check_interval = check_interval
+        # 模板目录 -> (文件的 mtime_ns（不存在时为 None）, 元数据, 上次检查时间)
+        self._entries: Dict[str, Tuple[Optional[int], Dict[str, Any], float]] = {}
+        self._lock = threading.Lock()
+    
+    def get_all(self, templates_dir: str) -> Dict[str, Any]:
+        """
+        获取目录的全部元数据
+        
+        Args:
+            templates_dir: 模板目录
+        
+        Returns:
+            元数据字典，文件不存在时为空字典
+        """
+        now = time.time()
+        with self._lock:
+            cached = self._entries.get(templates_dir)
+        if cached is not None and now - cached[2] < self.check_interval:
+            return cached[1]
+        
+        path = os.path.join(templates_dir, META_FILENAME)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        
+        if cached is not None and cached[0] == mtime_ns:
+            data = cached[1]
+        elif mtime_ns is None:
+            data = {}
+        else:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.error(f"加载模板元数据失败: {path} - {e}")
+                data = {}
+        
+        with self._lock:
+            self._entries[templates_dir] = (mtime_ns, data, now)
+        return data
+    
+    def get(self, templates_dir: str, template_name: str) -> Dict[str, Any]:
+        """
+        获取单个模板的元数据
+        
+        Args:
+            templates_dir: 模板目录
+            template_name: 模板名称
+        
+        Returns:
+            元数据字典，未声明时为空字典
+        """
+        return self.get_all(templates_dir).get('templates', {}).get(template_name, {})
+    
+    def get_composite(self, templates_dir: str, composite_name: str) -> Dict[str, Any]:
+        """
+        获取组合模板定义
+        
+        Args:
+            templates_dir: 模板目录
+            composite_name: 组合模板名称
+        
+        Returns:
+            组合模板定义，未定义时为空字典
+        """
+        return self.get_all(templates_dir).get('composites', {}).get(composite_name, {})
+    
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
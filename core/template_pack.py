@@ -0,0 +1,211 @@
+"""
+模板包
+将模板目录预编译为单个二进制文件，运行时通过内存映射零拷贝加载
+"""
+import os
+import json
+import struct
+import cv2
+import numpy as np
+from typing import Dict, Any, List, Optional, Sequence
+from loguru import logger
+
+
+PACK_MAGIC = b'ASTPACK1'
+PACK_FILENAME = 'templates.pack'
+PACK_ALIGNMENT = 64
+TEMPLATE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+def scaled_variant_name(scale: float, color_mode: str = 'bgr') -> str:
+    """缩放变体的名称，例如 scale_0.5、gray_scale_0.5"""
+    name = f"scale_{scale:g}"
+    return name if color_mode == 'bgr' else f"{color_mode}_{name}"
+
+
+def build_template_pack(templates_dir: str, output_path: Optional[str] = None,
+                        scales: Sequence[float] = (0.5,)) -> Optional[str]:
+    """
+    将模板目录编译为模板包
+    
+    每个模板保存原始BGR数据、灰度数据以及它们按指定比例缩小的版本，
+    数据块按 64 字节对齐，便于内存映射后直接作为 numpy 数组使用。
+    
+    Args:
+        templates_dir: 模板目录
+        output_path: 输出路径，默认为 <templates_dir>/templates.pack
+        scales: 预计算的缩小比例
+    
+    Returns:
+        模板包路径，失败返回 None
+    """
+    output_path = output_path or os.path.join(templates_dir, PACK_FILENAME)
+    
+    try:
+        index: Dict[str, Any] = {}
+        blobs: List[np.ndarray] = []
+        offset = 0
+        
+        def add_blob(array: np.ndarray) -> Dict[str, Any]:
+            nonlocal offset
+            array = np.ascontiguousarray(array)
+            info = {'offset': offset, 'shape': list(array.shape), 'dtype': array.dtype.str}
+            blobs.append(array)
+            offset += _aligned(array.nbytes)
+            return info
+        
+        # 与 _load_template 的查找顺序保持一致：同名模板按 TEMPLATE_EXTENSIONS 的顺序选择源文件
+        sources: Dict[str, Dict[str, str]] = {}
+        for file in os.listdir(templates_dir):
+            name, ext = os.path.splitext(file)
+            if ext.lower() in TEMPLATE_EXTENSIONS:
+                sources.setdefault(name, {}).setdefault(ext.lower(), file)
+        
+        for name in sorted(sources):
+            file = next(sources[name][ext] for ext in TEMPLATE_EXTENSIONS if ext in sources[name])
+            path = os.path.join(templates_dir, file)
+            image = cv2.imread(path)
+            if image is None:
+                logger.warning(f"无法加载模板图像，已跳过: {path}")
+                continue
+            
+            stat = os.stat(path)
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            variants = {
+                'bgr': add_blob(image),
+                'gray': add_blob(gray)
+            }
+            height, width = image.shape[:2]
+            for scale in scales:
+                size = (int(width * scale), int(height * scale))
+                if min(size) > 0:
+                    variants[scaled_variant_name(scale)] = add_blob(
+                        cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+                    )
+                    variants[scaled_variant_name(scale, 'gray')] = add_blob(
+                        cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+                    )
+            
+            index[name] = {
+                'source': file,
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'variants': variants
+            }
+        
+        header = json.dumps({'version': 1, 'templates': index}, ensure_ascii=False).encode('utf-8')
+        data_start = _aligned(len(PACK_MAGIC) + 8 + len(header))
+        
+        # 先写临时文件再替换，避免正在映射旧包的进程读到半写入的数据
+        tmp_path = output_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(PACK_MAGIC)
+            f.write(struct.pack('<Q', len(header)))
+            f.write(header)
+            f.write(b'\0' * (data_start - f.tell()))
+            for blob in blobs:
+                f.write(blob.tobytes())
+                f.write(b'\0' * (_aligned(blob.nbytes) - blob.nbytes))
+        os.replace(tmp_path, output_path)
+        
+        logger.info(f"模板包编译完成: {output_path} ({len(index)} 个模板)")
+        return output_path
+    
+    except Exception as e:
+        logger.error(f"编译模板包失败: {templates_dir} - {e}")
+        return None
+
+
+class TemplatePack:
+    """内存映射的模板包"""
+    
+    def __init__(self, path: str, templates_dir: Optional[str] = None):
+        """
+        打开模板包
+        
+        Args:
+            path: 模板包路径
+            templates_dir: 模板源文件目录，默认为模板包所在目录
+        """
+        self.path = path
+        self.templates_dir = templates_dir or os.path.dirname(path)
+        
+        with open(path, 'rb') as f:
+            if f.read(len(PACK_MAGIC)) != PACK_MAGIC:
+                raise ValueError(f"不是有效的模板包: {path}")
+            header_size, = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(header_size).decode('utf-8'))
+        
+        self.index: Dict[str, Any] = header['templates']
+        self._data_start = _aligned(len(PACK_MAGIC) + 8 + header_size)
+        # 只读映射：多个工作进程映射同一文件时共享物理页
+        self._data = np.memmap(path, dtype=np.uint8, mode='r')
+        
+        logger.info(f"模板包已加载: {path} ({len(self.index)} 个模板)")
+    
+    def get(self, template_name: str, variant: str = 'bgr') -> Optional[np.ndarray]:
+        """
+        获取模板数据（内存映射视图，不复制数据）
+        
+        模板源文件在编译后被修改过时返回 None，由调用方回退到读取源文件。
+        
+        Args:
+            template_name: 模板名称
+            variant: 变体名称 ('bgr', 'gray', 'scale_0.5' 等)
+        
+        Returns:
+            模板图像
+        """
+        entry = self.index.get(template_name)
+        if entry is None or variant not in entry['variants'] or not self._is_fresh(entry):
+            return None
+        
+        info = entry['variants'][variant]
+        dtype = np.dtype(info['dtype'])
+        start = self._data_start + info['offset']
+        count = int(np.prod(info['shape'])) * dtype.itemsize
+        return self._data[start:start + count].view(dtype).reshape(info['shape'])
+    
+    def get_source_path(self, template_name: str) -> Optional[str]:
+        """获取模板源文件路径"""
+        entry = self.index.get(template_name)
+        return os.path.join(self.templates_dir, entry['source']) if entry else None
+    
+    def names(self) -> List[str]:
+        """获取模板包中的模板名称列表"""
+        return list(self.index.keys())
+    
+    def _is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """检查模板源文件是否在编译后被修改（源文件不存在时以包内数据为准）"""
+        try:
+            stat = os.stat(os.path.join(self.templates_dir, entry['source']))
+        except OSError:
+            return True
+        return stat.st_mtime_ns == entry['mtime_ns'] and stat.st_size == entry['size']
+
+
+def load_template_pack(templates_dir: str, path: Optional[str] = None) -> Optional[TemplatePack]:
+    """
+    加载模板目录对应的模板包
+    
+    Args:
+        templates_dir: 模板目录
+        path: 模板包路径，默认为 <templates_dir>/templates.pack
+    
+    Returns:
+        模板包，不存在或无法加载时返回 None
+    """
+    path = path or os.path.join(templates_dir, PACK_FILENAME)
+    if not os.path.exists(path):
+        return None
+    
+    try:
+        return TemplatePack(path, templates_dir)
+    except Exception as e:
+        logger.error(f"加载模板包失败: {path} - {e}")
+        return None
+
+
+def _aligned(size: int) -> int:
+    """按 PACK_ALIGNMENT 向上对齐"""
+    return (size + PACK_ALIGNMENT - 1) // PACK_ALIGNMENT * PACK_ALIGNMENT
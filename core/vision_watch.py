@@ -0,0 +1,297 @@
+"""
+视觉监视列表
+脚本登记需要持续关注的检测（模板、文字、像素特征），由后台线程对每个新帧只计算一次，
+结果发布给所有订阅者读取或等待，避免多个脚本各自截图、各自匹配同一帧
+"""
+import json
+import time
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+from loguru import logger
+
+from .frame_source import FrameSource, frame_signature, frame_changed
+
+
+@dataclass
+class WatchResult:
+    """检测结果"""
+    key: str
+    value: Any           # 模板为 TemplateMatchResult，文字为 find_text/recognize_text 的结果，像素特征为 bool
+    version: int         # 结果所对应帧的版本号
+    timestamp: float     # 帧的截取时间
+    
+    @property
+    def found(self) -> bool:
+        """检测是否命中"""
+        return bool(self.value)
+
+
+class _Watch:
+    """一个去重后的检测项"""
+    
+    def __init__(self, key: str, kind: str, target: Any, source: FrameSource, params: Dict[str, Any]):
+        self.key = key
+        self.kind = kind
+        self.target = target
+        self.source = source
+        self.params = params
+        self.intervals: List[float] = []  # 每个订阅者要求的刷新间隔
+        self.version = 0                  # 最近一次计算所用帧的版本号
+        self.signature: Optional[np.ndarray] = None  # 最近一次计算所用帧的缩略签名
+        self.next_due = 0.0
+    
+    @property
+    def interval(self) -> float:
+        return min(self.intervals)
+
+
+def _detect_template(engine, target: str, image: np.ndarray, **params) -> Any:
+    return engine.template_matcher.find_template(target, frame=image, **params)
+
+
+def _detect_text(engine, target: str, image: np.ndarray, **params) -> Any:
+    return engine.ocr_engine.find_text(target, image=image, **params)
+
+
+def _detect_ocr(engine, target: Any, image: np.ndarray, **params) -> Any:
+    return engine.ocr_engine.recognize_text(region=tuple(target) if target else None, image=image, **params)
+
+
+def _detect_pixels(engine, target: Any, image: np.ndarray, **params) -> Any:
+    return engine.pixel_detector.check(target, image=image, **params)
+
+
+class VisionWatch:
+    """视觉监视列表服务"""
+    
+    # 检测类型 -> 检测函数 (engine, target, image, **params)
+    DETECTORS: Dict[str, Callable[..., Any]] = {
+        'template': _detect_template,   # target 为模板名称
+        'text': _detect_text,           # target 为要查找的文字
+        'ocr': _detect_ocr,             # target 为识别区域 (x, y, width, height)
+        'pixels': _detect_pixels,       # target 为像素特征名称或检查点列表
+    }
+    
+    def __init__(self, engine):
+        """
+        初始化监视列表
+        
+        Args:
+            engine: 主引擎实例
+        """
+        self.engine = engine
+        self.detectors = dict(self.DETECTORS)
+        
+        self._watches: Dict[str, _Watch] = {}
+        self._results: Dict[str, WatchResult] = {}
+        self._lock = threading.Lock()
+        self._updated = threading.Condition(self._lock)
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        
+        self.evaluations = 0
+        self.skipped = 0
+    
+    def register_detector(self, kind: str, detector: Callable[..., Any]):
+        """
+        注册自定义检测类型
+        
+        Args:
+            kind: 检测类型名称
+            detector: 检测函数 (engine, target, image, **params) -> 结果
+        """
+        self.detectors[kind] = detector
+    
+    def watch(self, kind: str, target: Any, interval: Optional[float] = None,
+              frame_source: Any = None, **params) -> str:
+        """
+        登记检测
+        
+        相同的检测（类型、目标、画面来源和参数都相同）只计算一次，按所有订阅者中最短的间隔刷新。
+        
+        Args:
+            kind: 检测类型 'template'/'text'/'ocr'/'pixels' 或自定义类型
+            target: 检测目标
+            interval: 期望的刷新间隔（秒） (default: vision_watch.interval)
+            frame_source: 画面来源名称或实例 (default: 任务绑定的来源或 engine.frame_source)
+            **params: 传给检测函数的参数，例如 threshold/region
+        
+        Returns:
+            检测键，用于读取、等待和注销
+        """
+        if kind not in self.detectors:
+            raise ValueError(f"未知的检测类型: {kind}")
+        
+        if interval is None:
+            interval = self.engine.get_config('vision_watch.interval', 0.1)
+        source = self.engine.get_frame_source(frame_source)
+        key = self._make_key(kind, target, source, params)
+        
+        with self._lock:
+            watch = self._watches.get(key)
+            if watch is None:
+                watch = self._watches[key] = _Watch(key, kind, target, source, params)
+                logger.debug(f"登记视觉检测: {kind} {target!r} ({key})")
+            watch.intervals.append(interval)
+            watch.next_due = 0.0
+        
+        self._ensure_thread()
+        self._wakeup.set()
+        return key
+    
+    def unwatch(self, key: str, interval: Optional[float] = None):
+        """
+        注销订阅，最后一个订阅注销后停止计算该检测
+        
+        Args:
+            key: 检测键
+            interval: 登记时使用的间隔，只注销该间隔的一个订阅；为 None 时注销该检测的所有订阅
+        """
+        with self._lock:
+            watch = self._watches.get(key)
+            if watch is None:
+                return
+            if interval is None:
+                watch.intervals.clear()
+            elif interval in watch.intervals:
+                watch.intervals.remove(interval)
+            else:
+                logger.warning(f"未找到间隔为 {interval} 的订阅: {key}")
+            if not watch.intervals:
+                del self._watches[key]
+                self._results.pop(key, None)
+    
+    def get(self, key: str) -> Optional[WatchResult]:
+        """获取最新结果，尚未计算时返回 None"""
+        with self._lock:
+            return self._results.get(key)
+    
+    def wait(self, key: str, timeout: float = 10.0, predicate: Optional[Callable[[Any], bool]] = bool,
+             min_version: Optional[int] = None) -> Optional[WatchResult]:
+        """
+        等待满足条件的结果
+        
+        Args:
+            key: 检测键
+            timeout: 超时时间（秒）
+            predicate: 对结果值的判断，默认要求命中；为 None 时任何结果都满足
+            min_version: 要求结果所对应帧的版本号不小于该值，例如点击之后的新帧
+        
+        Returns:
+            满足条件的结果，超时返回 None
+        """
+        def ready() -> Optional[WatchResult]:
+            result = self._results.get(key)
+            if result is None or (min_version is not None and result.version < min_version):
+                return None
+            if predicate is not None and not predicate(result.value):
+                return None
+            return result
+        
+        deadline = time.time() + timeout
+        with self._updated:
+            while True:
+                result = ready()
+                if result is not None:
+                    return result
+                remaining = deadline - time.time()
+                if remaining <= 0 or key not in self._watches:
+                    return None
+                self._updated.wait(remaining)
+    
+    def stop(self):
+        """停止后台线程"""
+        self._running = False
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        with self._lock:
+            return {
+                'watches': len(self._watches),
+                'subscribers': sum(len(watch.intervals) for watch in self._watches.values()),
+                'evaluations': self.evaluations,
+                'skipped': self.skipped
+            }
+    
+    def _make_key(self, kind: str, target: Any, source: FrameSource, params: Dict[str, Any]) -> str:
+        """由检测内容生成稳定的键"""
+        content = json.dumps([kind, target, params], sort_keys=True, default=str)
+        digest = hashlib.sha1(f"{content}|{id(source)}".encode('utf-8')).hexdigest()[:12]
+        return f"{kind}:{digest}"
+    
+    def _ensure_thread(self):
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="vision-watch", daemon=True)
+            self._thread.start()
+    
+    def _run(self):
+        """后台循环：到期的检测按画面来源分组，每个来源取一帧，每个检测每帧最多计算一次"""
+        skip_unchanged = self.engine.get_config('vision_watch.skip_unchanged', True)
+        threshold = self.engine.get_config('vision_watch.change_threshold', 3.0)
+        
+        while self._running:
+            self._wakeup.clear()
+            now = time.time()
+            with self._lock:
+                due = [watch for watch in self._watches.values() if watch.next_due <= now]
+                next_due = min((watch.next_due for watch in self._watches.values()), default=None)
+            
+            groups: Dict[FrameSource, List[_Watch]] = {}
+            for watch in due:
+                groups.setdefault(watch.source, []).append(watch)
+            
+            for source, watches in groups.items():
+                # 间隔内其他调用截取的帧可以直接复用
+                max_age = min(watch.interval for watch in watches)
+                frame = self.engine.frame_store.get(source, max_age=max_age)
+                signature = frame_signature(frame.image) if frame is not None and skip_unchanged else None
+                for watch in watches:
+                    watch.next_due = time.time() + watch.interval
+                    if frame is None or frame.version == watch.version:
+                        continue
+                    with self._lock:
+                        previous = self._results.get(watch.key)
+                    if previous is not None and signature is not None and \
+                            not frame_changed(watch.signature, signature, threshold):
+                        # 画面没有变化，沿用上次结果，只更新帧版本
+                        self._publish(watch, previous.value, frame)
+                        self.skipped += 1
+                        continue
+                    self._evaluate(watch, frame, signature)
+            
+            if due:
+                with self._lock:
+                    next_due = min((watch.next_due for watch in self._watches.values()), default=None)
+            timeout = 1.0 if next_due is None else max(next_due - time.time(), 0.001)
+            self._wakeup.wait(timeout)
+    
+    def _evaluate(self, watch: _Watch, frame, signature: Optional[np.ndarray]):
+        """在指定帧上计算检测并发布结果"""
+        try:
+            value = self.detectors[watch.kind](self.engine, watch.target, frame.image, **watch.params)
+        except Exception as e:
+            logger.error(f"视觉检测失败: {watch.kind} {watch.target!r} - {e}")
+            return
+        
+        watch.signature = signature
+        self.evaluations += 1
+        self._publish(watch, value, frame)
+    
+    def _publish(self, watch: _Watch, value: Any, frame):
+        """发布结果并唤醒等待者"""
+        watch.version = frame.version
+        with self._updated:
+            if watch.key in self._watches:
+                self._results[watch.key] = WatchResult(watch.key, value, frame.version, frame.timestamp)
+                self._updated.notify_all()
@@ -0,0 +1,328 @@
+"""
+X11 屏幕截图
+通过 ctypes 直接调用 Xlib / MIT-SHM，把屏幕像素读入可复用的共享内存缓冲区，
+只截取请求的区域，避免 pyautogui -> PIL -> numpy 的多次复制
+"""
+import os
+import sys
+import ctypes
+import ctypes.util
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+import cv2
+import numpy as np
+from loguru import logger
+
+
+Z_PIXMAP = 2
+ALL_PLANES = ctypes.c_ulong(-1).value
+IPC_PRIVATE = 0
+IPC_CREAT = 0o1000
+IPC_RMID = 0
+
+
+class XImage(ctypes.Structure):
+    """Xlib XImage 结构（只声明用到的前部字段）"""
+    _fields_ = [
+        ('width', ctypes.c_int),
+        ('height', ctypes.c_int),
+        ('xoffset', ctypes.c_int),
+        ('format', ctypes.c_int),
+        ('data', ctypes.c_void_p),
+        ('byte_order', ctypes.c_int),
+        ('bitmap_unit', ctypes.c_int),
+        ('bitmap_bit_order', ctypes.c_int),
+        ('bitmap_pad', ctypes.c_int),
+        ('depth', ctypes.c_int),
+        ('bytes_per_line', ctypes.c_int),
+        ('bits_per_pixel', ctypes.c_int),
+        ('red_mask', ctypes.c_ulong),
+        ('green_mask', ctypes.c_ulong),
+        ('blue_mask', ctypes.c_ulong),
+    ]
+
+
+class XShmSegmentInfo(ctypes.Structure):
+    """MIT-SHM 共享内存段信息"""
+    _fields_ = [
+        ('shmseg', ctypes.c_ulong),
+        ('shmid', ctypes.c_int),
+        ('shmaddr', ctypes.c_void_p),
+        ('readOnly', ctypes.c_int),
+    ]
+
+
+class XErrorEvent(ctypes.Structure):
+    """Xlib 错误事件"""
+    _fields_ = [
+        ('type', ctypes.c_int),
+        ('display', ctypes.c_void_p),
+        ('resourceid', ctypes.c_ulong),
+        ('serial', ctypes.c_ulong),
+        ('error_code', ctypes.c_ubyte),
+        ('request_code', ctypes.c_ubyte),
+        ('minor_code', ctypes.c_ubyte),
+    ]
+
+
+_X_ERROR_HANDLER = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.POINTER(XErrorEvent))
+_libs = None
+_libs_lock = threading.Lock()
+_last_error: Optional[Tuple[int, int]] = None
+
+
+@_X_ERROR_HANDLER
+def _on_x_error(display, event):
+    # Xlib 默认的错误处理会直接退出进程，这里只记录错误码，由调用方检查
+    global _last_error
+    _last_error = (event.contents.error_code, event.contents.request_code)
+    return 0
+
+
+def _load_libs():
+    """加载 libX11 / libXext / libc 并声明函数签名（进程内只做一次）"""
+    global _libs
+    with _libs_lock:
+        if _libs is not None:
+            return _libs
+        
+        xlib = ctypes.CDLL(ctypes.util.find_library('X11') or 'libX11.so.6')
+        xext = ctypes.CDLL(ctypes.util.find_library('Xext') or 'libXext.so.6')
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        
+        display_p, ximage_p = ctypes.c_void_p, ctypes.POINTER(XImage)
+        shminfo_p = ctypes.POINTER(XShmSegmentInfo)
+        signatures = [
+            (xlib.XInitThreads, [], ctypes.c_int),
+            (xlib.XOpenDisplay, [ctypes.c_char_p], display_p),
+            (xlib.XCloseDisplay, [display_p], ctypes.c_int),
+            (xlib.XDefaultScreen, [display_p], ctypes.c_int),
+            (xlib.XRootWindow, [display_p, ctypes.c_int], ctypes.c_ulong),
+            (xlib.XDefaultVisual, [display_p, ctypes.c_int], ctypes.c_void_p),
+            (xlib.XDefaultDepth, [display_p, ctypes.c_int], ctypes.c_int),
+            (xlib.XDisplayWidth, [display_p, ctypes.c_int], ctypes.c_int),
+            (xlib.XDisplayHeight, [display_p, ctypes.c_int], ctypes.c_int),
+            (xlib.XGetImage, [display_p, ctypes.c_ulong, ctypes.c_int, ctypes.c_int, ctypes.c_uint,
+                              ctypes.c_uint, ctypes.c_ulong, ctypes.c_int], ximage_p),
+            (xlib.XDestroyImage, [ximage_p], ctypes.c_int),
+            (xlib.XSync, [display_p, ctypes.c_int], ctypes.c_int),
+            (xlib.XSetErrorHandler, [_X_ERROR_HANDLER], ctypes.c_void_p),
+            (xext.XShmQueryExtension, [display_p], ctypes.c_int),
+            (xext.XShmCreateImage, [display_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_void_p,
+                                    shminfo_p, ctypes.c_uint, ctypes.c_uint], ximage_p),
+            (xext.XShmAttach, [display_p, shminfo_p], ctypes.c_int),
+            (xext.XShmDetach, [display_p, shminfo_p], ctypes.c_int),
+            (xext.XShmGetImage, [display_p, ctypes.c_ulong, ximage_p, ctypes.c_int, ctypes.c_int,
+                                 ctypes.c_ulong], ctypes.c_int),
+            (libc.shmget, [ctypes.c_int, ctypes.c_size_t, ctypes.c_int], ctypes.c_int),
+            (libc.shmat, [ctypes.c_int, ctypes.c_void_p, ctypes.c_int], ctypes.c_void_p),
+            (libc.shmdt, [ctypes.c_void_p], ctypes.c_int),
+            (libc.shmctl, [ctypes.c_int, ctypes.c_int, ctypes.c_void_p], ctypes.c_int),
+        ]
+        for func, argtypes, restype in signatures:
+            func.argtypes, func.restype = argtypes, restype
+        
+        xlib.XInitThreads()
+        xlib.XSetErrorHandler(_on_x_error)
+        _libs = (xlib, xext, libc)
+        return _libs
+
+
+def is_x11_available() -> bool:
+    """当前进程是否可以使用 X11 截图（Linux 且设置了 DISPLAY）"""
+    return sys.platform.startswith('linux') and bool(os.environ.get('DISPLAY'))
+
+
+class _ShmImage:
+    """一块绑定到 X 服务器的共享内存图像"""
+    
+    def __init__(self, image, info: XShmSegmentInfo):
+        self.image = image
+        self.info = info
+        contents = image.contents
+        size = contents.bytes_per_line * contents.height
+        buffer = (ctypes.c_ubyte * size).from_address(info.shmaddr)
+        # 共享内存的 numpy 视图：每次截图原地覆盖，不重新分配
+        self.array = np.frombuffer(buffer, dtype=np.uint8).reshape(contents.height, contents.bytes_per_line)
+        self.output = np.empty((contents.height, contents.width, 3), dtype=np.uint8)
+
+
+class X11Capture:
+    """基于 XShmGetImage / XGetImage 的屏幕截图"""
+    
+    def __init__(self, display_name: Optional[str] = None, use_shm: bool = True, max_buffers: int = 4):
+        """
+        连接 X 服务器
+        
+        Args:
+            display_name: 显示名称，默认读取 DISPLAY 环境变量
+            use_shm: 是否使用 MIT-SHM 共享内存（远程显示不可用时自动退回 XGetImage）
+            max_buffers: 按区域尺寸缓存的共享内存图像数量上限
+        """
+        self._xlib, self._xext, self._libc = _load_libs()
+        self._lock = threading.Lock()
+        self._buffers: "OrderedDict[Tuple[int, int], _ShmImage]" = OrderedDict()
+        self.max_buffers = max_buffers
+        
+        self.display = self._xlib.XOpenDisplay(display_name.encode() if display_name else None)
+        if not self.display:
+            raise RuntimeError(f"无法连接X服务器: {display_name or os.environ.get('DISPLAY')}")
+        
+        screen = self._xlib.XDefaultScreen(self.display)
+        self.root = self._xlib.XRootWindow(self.display, screen)
+        self.visual = self._xlib.XDefaultVisual(self.display, screen)
+        self.depth = self._xlib.XDefaultDepth(self.display, screen)
+        self.width = self._xlib.XDisplayWidth(self.display, screen)
+        self.height = self._xlib.XDisplayHeight(self.display, screen)
+        if self.depth not in (24, 32):
+            self.close()
+            raise RuntimeError(f"不支持的X显示色深: {self.depth}")
+        
+        self.use_shm = use_shm and bool(self._xext.XShmQueryExtension(self.display))
+        
+        logger.info(f"X11截图已启用: {self.width}x{self.height} ({'XShm' if self.use_shm else 'XGetImage'})")
+    
+    @property
+    def screen_size(self) -> Tuple[int, int]:
+        """屏幕尺寸 (width, height)"""
+        return self.width, self.height
+    
+    def grab(self, region: Optional[Tuple[int, int, int, int]] = None, copy: bool = True) -> Optional[np.ndarray]:
+        """
+        截取屏幕或区域
+        
+        Args:
+            region: 区域 (x, y, width, height)，超出屏幕的部分会被裁掉
+            copy: 为 False 时返回复用的输出缓冲区，下次同尺寸截图会覆盖其内容
+        
+        Returns:
+            BGR 图像
+        """
+        x, y, width, height = self._clip_region(region)
+        if width <= 0 or height <= 0:
+            return None
+        
+        with self._lock:
+            if not self.display:
+                raise RuntimeError("X11截图已关闭")
+            
+            shm = None
+            if self.use_shm:
+                try:
+                    shm = self._get_buffer(width, height)
+                except (RuntimeError, OSError) as e:
+                    # 共享内存不可用（例如通过网络连接的显示），之后改用 XGetImage
+                    logger.warning(f"XShm不可用，改用XGetImage: {e}")
+                    self.use_shm = False
+            
+            if shm is not None:
+                if not self._check(self._xext.XShmGetImage(self.display, self.root, shm.image, x, y, ALL_PLANES)):
+                    raise RuntimeError("XShmGetImage 失败")
+                bgra = shm.array[:, :width * 4].reshape(height, width, 4)
+                if not copy:
+                    return cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=shm.output)
+                return cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR)
+            
+            image = self._xlib.XGetImage(self.display, self.root, x, y, width, height, ALL_PLANES, Z_PIXMAP)
+            if not self._check(bool(image)):
+                if image:
+                    self._xlib.XDestroyImage(image)
+                raise RuntimeError("XGetImage 失败")
+            try:
+                contents = image.contents
+                buffer = (ctypes.c_ubyte * (contents.bytes_per_line * height)).from_address(contents.data)
+                rows = np.frombuffer(buffer, dtype=np.uint8).reshape(height, contents.bytes_per_line)
+                return cv2.cvtColor(rows[:, :width * 4].reshape(height, width, 4), cv2.COLOR_BGRA2BGR)
+            finally:
+                self._xlib.XDestroyImage(image)
+    
+    def close(self):
+        """释放共享内存并断开X服务器连接"""
+        with self._lock:
+            while self._buffers:
+                _, shm = self._buffers.popitem(last=False)
+                self._release(shm)
+            if self.display:
+                self._xlib.XCloseDisplay(self.display)
+                self.display = None
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+    
+    def _clip_region(self, region: Optional[Tuple[int, int, int, int]]) -> Tuple[int, int, int, int]:
+        """把区域裁剪到屏幕范围内"""
+        if not region:
+            return 0, 0, self.width, self.height
+        x, y, width, height = (int(value) for value in region)
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + width, self.width), min(y + height, self.height)
+        return x0, y0, x1 - x0, y1 - y0
+    
+    def _check(self, ok: bool) -> bool:
+        """同步X请求并检查是否产生了错误（调用方需持有锁）"""
+        global _last_error
+        self._xlib.XSync(self.display, 0)
+        error, _last_error = _last_error, None
+        if error is not None:
+            logger.error(f"X11请求错误: error_code={error[0]} request_code={error[1]}")
+            return False
+        return bool(ok)
+    
+    def _get_buffer(self, width: int, height: int) -> _ShmImage:
+        """获取指定尺寸的共享内存图像，按尺寸复用（调用方需持有锁）"""
+        key = (width, height)
+        shm = self._buffers.get(key)
+        if shm is not None:
+            self._buffers.move_to_end(key)
+            return shm
+        
+        info = XShmSegmentInfo()
+        image = self._xext.XShmCreateImage(self.display, self.visual, self.depth, Z_PIXMAP, None,
+                                           ctypes.byref(info), width, height)
+        if not image:
+            raise RuntimeError("XShmCreateImage 失败")
+        if image.contents.bits_per_pixel != 32:
+            self._xlib.XDestroyImage(image)
+            raise RuntimeError(f"不支持的像素格式: {image.contents.bits_per_pixel} bpp")
+        
+        size = image.contents.bytes_per_line * height
+        info.shmid = self._libc.shmget(IPC_PRIVATE, size, IPC_CREAT | 0o600)
+        if info.shmid < 0:
+            self._xlib.XDestroyImage(image)
+            raise OSError(ctypes.get_errno(), "shmget 失败")
+        
+        info.shmaddr = self._libc.shmat(info.shmid, None, 0)
+        if info.shmaddr in (None, ctypes.c_void_p(-1).value):
+            self._libc.shmctl(info.shmid, IPC_RMID, None)
+            self._xlib.XDestroyImage(image)
+            raise OSError(ctypes.get_errno(), "shmat 失败")
+        image.contents.data = info.shmaddr
+        info.readOnly = 0
+        
+        attached = self._check(self._xext.XShmAttach(self.display, ctypes.byref(info)))
+        # X服务器附加后立即标记删除，进程退出时内核自动回收共享内存段
+        self._libc.shmctl(info.shmid, IPC_RMID, None)
+        shm = _ShmImage(image, info)
+        if not attached:
+            self._release(shm, attached=False)
+            raise RuntimeError("XShmAttach 失败（X服务器可能不在本机）")
+        
+        self._buffers[key] = shm
+        while len(self._buffers) > self.max_buffers:
+            _, old = self._buffers.popitem(last=False)
+            self._release(old)
+        return shm
+    
+    def _release(self, shm: _ShmImage, attached: bool = True):
+        """分离并释放共享内存图像（调用方需持有锁）"""
+        if attached and self.display:
+            self._xext.XShmDetach(self.display, ctypes.byref(shm.info))
+            self._xlib.XSync(self.display, 0)
+        # data 指向共享内存，不能交给 XDestroyImage 释放
+        shm.image.contents.data = None
+        self._xlib.XDestroyImage(shm.image)
+        self._libc.shmdt(shm.info.shmaddr)
@@ -15,6 +15,7 @@ from loguru import logger
 sys.path.insert(0, str(Path(__file__).parent))
 
 from core import AutoScriptEngine
+from core.template_pack import build_template_pack
 from web.app import WebApp
 
 
@@ -78,6 +79,7 @@ def main():
 使用示例:
   %(prog)s                    # 启动Web界面
   %(prog)s --mode cli         # 命令行模式
+  %(prog)s --mode pack        # 编译模板包
   %(prog)s --host 0.0.0.0     # 指定监听地址
   %(prog)s --port 8080        # 指定监听端口
   %(prog)s --debug            # 启用调试模式
@@ -86,7 +88,7 @@ def main():
     
     parser.add_argument(
         '--mode', 
-        choices=['web', 'cli'],
+        choices=['web', 'cli', 'pack'],
         default='web',
         help='运行模式 (默认: web)'
     )
@@ -116,6 +118,12 @@ def main():
         help='配置文件路径 (默认: configs/config.yaml)'
     )
     
+    parser.add_argument(
+        '--templates-dir',
+        default='templates',
+        help='pack模式下要编译的模板目录 (默认: templates)'
+    )
+    
     parser.add_argument(
         '--version',
         action='version',
@@ -145,6 +153,11 @@ def main():
             # CLI模式
             logger.info("启动命令行界面...")
             run_cli_mode(args.config)
+        elif args.mode == 'pack':
+            # 编译模板包
+            logger.info(f"编译模板包: {args.templates_dir}")
+            if not build_template_pack(args.templates_dir):
+                sys.exit(1)
         
     except KeyboardInterrupt:
         logger.info("程序被用户中断")
@@ -3,10 +3,12 @@ Playwright插件
 用于网页自动化操作
 """
 import asyncio
+import threading
 from typing import Dict, Any, List, Optional
 from loguru import logger
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 from core.plugin_manager import BasePlugin
+from core.frame_source import PlaywrightFrameSource
 
 
 class PlaywrightPlugin(BasePlugin):
@@ -24,6 +26,11 @@ class PlaywrightPlugin(BasePlugin):
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
+        self._frame_source: Optional[PlaywrightFrameSource] = None
+        # 异步 Playwright 对象绑定在创建它们的事件循环上，所有调用都在同一个后台循环中执行
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
         
         self.browser_type = self.engine.get_config('plugins.playwright.browser', 'chromium')
         self.headless = self.engine.get_config('plugins.playwright.headless', False)
@@ -42,16 +49,45 @@ class PlaywrightPlugin(BasePlugin):
         """清理插件资源"""
         try:
             if self.page:
-                asyncio.run(self.page.close())
+                self._run(self.page.close())
             if self.context:
-                asyncio.run(self.context.close())
+                self._run(self.context.close())
             if self.browser:
-                asyncio.run(self.browser.close())
+                self._run(self.browser.close())
             if self.playwright:
-                asyncio.run(self.playwright.stop())
+                self._run(self.playwright.stop())
+            self.page = self.context = self.browser = self.playwright = None
             logger.info("Playwright插件资源已清理")
         except Exception as e:
             logger.error(f"清理Playwright插件资源失败: {e}")
+        finally:
+            self._stop_loop()
+    
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """获取（按需启动）在后台线程中持续运行的事件循环"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever,
+                                                     name='playwright-loop', daemon=True)
+                self._loop_thread.start()
+            return self._loop
+    
+    def _stop_loop(self):
+        """停止并关闭后台事件循环"""
+        with self._loop_lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join(timeout=5)
+            if not self._loop.is_running():
+                self._loop.close()
+            self._loop = None
+            self._loop_thread = None
+    
+    def _run(self, coro) -> Any:
+        """在插件的事件循环中执行协程并等待结果"""
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop()).result()
     
     def get_actions(self) -> List[str]:
         """获取支持的动作列表"""
@@ -86,49 +122,49 @@ class PlaywrightPlugin(BasePlugin):
         
         try:
             if action_type == 'open_browser':
-                return asyncio.run(self._open_browser(action))
+                return self._run(self._open_browser(action))
             elif action_type == 'close_browser':
-                return asyncio.run(self._close_browser(action))
+                return self._run(self._close_browser(action))
             elif action_type == 'navigate':
-                return asyncio.run(self._navigate(action))
+                return self._run(self._navigate(action))
             elif action_type == 'click':
-                return asyncio.run(self._click(action))
+                return self._run(self._click(action))
             elif action_type == 'fill':
-                return asyncio.run(self._fill(action))
+                return self._run(self._fill(action))
             elif action_type == 'select':
-                return asyncio.run(self._select(action))
+                return self._run(self._select(action))
             elif action_type == 'wait_for_element':
-                return asyncio.run(self._wait_for_element(action))
+                return self._run(self._wait_for_element(action))
             elif action_type == 'wait_for_text':
-                return asyncio.run(self._wait_for_text(action))
+                return self._run(self._wait_for_text(action))
             elif action_type == 'screenshot':
-                return asyncio.run(self._screenshot(action))
+                return self._run(self._screenshot(action))
             elif action_type == 'get_text':
-                return asyncio.run(self._get_text(action))
+                return self._run(self._get_text(action))
             elif action_type == 'get_attribute':
-                return asyncio.run(self._get_attribute(action))
+                return self._run(self._get_attribute(action))
             elif action_type == 'scroll':
-                return asyncio.run(self._scroll(action))
+                return self._run(self._scroll(action))
             elif action_type == 'keyboard':
-                return asyncio.run(self._keyboard(action))
+                return self._run(self._keyboard(action))
             elif action_type == 'mouse':
-                return asyncio.run(self._mouse(action))
+                return self._run(self._mouse(action))
             elif action_type == 'execute_script':
-                return asyncio.run(self._execute_script(action))
+                return self._run(self._execute_script(action))
             elif action_type == 'wait':
-                return asyncio.run(self._wait(action))
+                return self._run(self._wait(action))
             elif action_type == 'back':
-                return asyncio.run(self._back(action))
+                return self._run(self._back(action))
             elif action_type == 'forward':
-                return asyncio.run(self._forward(action))
+                return self._run(self._forward(action))
             elif action_type == 'refresh':
-                return asyncio.run(self._refresh(action))
+                return self._run(self._refresh(action))
             elif action_type == 'new_page':
-                return asyncio.run(self._new_page(action))
+                return self._run(self._new_page(action))
             elif action_type == 'switch_page':
-                return asyncio.run(self._switch_page(action))
+                return self._run(self._switch_page(action))
             elif action_type == 'close_page':
-                return asyncio.run(self._close_page(action))
+                return self._run(self._close_page(action))
             else:
                 raise ValueError(f"不支持的动作类型: {action_type}")
                 
@@ -136,6 +172,21 @@ class PlaywrightPlugin(BasePlugin):
             logger.error(f"执行Playwright动作失败: {action_type} - {e}")
             raise
     
+    def get_frame_source(self) -> PlaywrightFrameSource:
+        """
+        获取当前页面的画面来源，供模板匹配和OCR直接使用页面画面
+        
+        Returns:
+            页面画面来源（跟随 switch_page 切换的当前页面）
+        """
+        if not self.page:
+            raise Exception("页面未初始化，请先打开浏览器")
+        if self._frame_source is None:
+            self._frame_source = PlaywrightFrameSource(self.page, loop=self._get_loop())
+        self._frame_source.page = self.page
+        self._frame_source.loop = self._get_loop()
+        return self._frame_source
+    
     async def _open_browser(self, action: Dict[str, Any]) -> Dict[str, Any]:
         """打开浏览器"""
         try:
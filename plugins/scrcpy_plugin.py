@@ -9,6 +9,7 @@ from typing import Dict, Any, List, Optional, Tuple
 from loguru import logger
 import pyautogui
 from core.plugin_manager import BasePlugin
+from core.frame_source import AdbFrameSource
 
 
 class ScrcpyPlugin(BasePlugin):
@@ -26,6 +27,7 @@ class ScrcpyPlugin(BasePlugin):
         self.device_id = None
         self.screen_size = None
         self.scale_factor = 1.0
+        self._frame_source: Optional[AdbFrameSource] = None
         
         # 配置参数
         self.max_size = self.engine.get_config('plugins.scrcpy.max_size', 1920)
@@ -534,6 +536,21 @@ class ScrcpyPlugin(BasePlugin):
             logger.error(f"截图失败: {e}")
             raise
     
+    def get_frame_source(self, device_id: Optional[str] = None) -> AdbFrameSource:
+        """
+        获取设备的画面来源，供模板匹配和OCR直接使用设备画面
+        
+        Args:
+            device_id: 设备ID，默认为当前连接的设备
+            
+        Returns:
+            ADB画面来源
+        """
+        device_id = device_id or self.device_id
+        if self._frame_source is None or self._frame_source.device_id != device_id:
+            self._frame_source = AdbFrameSource(device_id)
+        return self._frame_source
+    
     def _install_apk(self, action: Dict[str, Any]) -> Dict[str, Any]:
         """安装APK"""
         apk_path = action.get('apk_path', '')
@@ -2,10 +2,12 @@
 Web界面应用程序
 提供可视化的操作界面和API接口
 """
+import io
 import os
 import json
 import threading
 from typing import Dict, Any, List
+import cv2
 from flask import Flask, render_template, request, jsonify, send_file
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from loguru import logger
@@ -295,11 +297,20 @@ class WebApp:
         def take_screenshot():
             """截图"""
             try:
-                import pyautogui
-                screenshot = pyautogui.screenshot()
-                screenshot_path = 'temp_screenshot.png'
-                screenshot.save(screenshot_path)
-                return send_file(screenshot_path, as_attachment=True)
+                data = request.get_json(silent=True) or {}
+                region = tuple(data['region']) if data.get('region') else None
+                
+                # 从画面来源取帧并在内存中编码，不落盘
+                source = self.engine.get_frame_source(data.get('frame_source'))
+                frame = source.grab(region)
+                if frame is None:
+                    return jsonify({'success': False, 'message': '截图失败'})
+                
+                ok, encoded = cv2.imencode('.png', frame)
+                if not ok:
+                    return jsonify({'success': False, 'message': '截图编码失败'})
+                return send_file(io.BytesIO(encoded.tobytes()), mimetype='image/png',
+                                 as_attachment=True, download_name='screenshot.png')
             except Exception as e:
                 logger.error(f"截图失败: {e}")
                 return jsonify({'success': False, 'message': str(e)})